@@ -0,0 +1,122 @@
+"""
+Incrementally maintained aggregates for the shutdown analytics dashboard
+Each event contributes a few counter keys (week / month x Event Type, Event Classification,
+Main Cluster, plus its subcluster for the Pareto). The keys of every event are remembered, so
+saving an event only subtracts its old keys and adds the new ones; the dashboard reads the
+counters and never walks the log. Versioning is the same as eventindex: follow the change
+feed, rebuild in full when shutdown.json was written by someone else.
+"""
+import threading
+from datetime import datetime
+
+DIMENSIONS = ('Event Type', 'Event Classification', 'Main Cluster')
+PERIODS = ('week', 'month')
+UNKNOWN = "(unknown)"
+
+
+def period_of(timestamp, period):
+    """'2026-01-29 09:12:00' -> '2026-W05' (ISO week) or '2026-01'"""
+    try:
+        day = datetime.strptime(str(timestamp).strip()[:10], "%Y-%m-%d")
+    except ValueError:
+        return UNKNOWN
+    if period == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    return day.strftime("%Y-%m")
+
+
+def _value(event, col):
+    return str(event.get(col) or "").strip() or UNKNOWN
+
+
+class ShutdownStats:
+    def __init__(self, key='ID'):
+        self.key = key
+        self._lock = threading.Lock()
+        self._version = None
+        self._series = {}    # (period, dimension) -> {(period value, category): count}
+        self._pareto = {}    # (main cluster, subcluster) -> count
+        self._contrib = {}   # event key -> (series keys, pareto key)
+
+    def _add(self, event):
+        series_keys = []
+        for period in PERIODS:
+            p = period_of(event.get('timestamp'), period)
+            for dim in DIMENSIONS:
+                series_keys.append(((period, dim), (p, _value(event, dim))))
+        pareto_key = (_value(event, 'Main Cluster'), _value(event, 'Subcluster'))
+        for series, bucket in series_keys:
+            counts = self._series.setdefault(series, {})
+            counts[bucket] = counts.get(bucket, 0) + 1
+        self._pareto[pareto_key] = self._pareto.get(pareto_key, 0) + 1
+        self._contrib[event.get(self.key)] = (series_keys, pareto_key)
+
+    def _remove(self, key):
+        contrib = self._contrib.pop(key, None)
+        if contrib is None:
+            return
+        series_keys, pareto_key = contrib
+        for series, bucket in series_keys:
+            counts = self._series[series]
+            counts[bucket] -= 1
+            if counts[bucket] <= 0:
+                del counts[bucket]
+        self._pareto[pareto_key] -= 1
+        if self._pareto[pareto_key] <= 0:
+            del self._pareto[pareto_key]
+
+    def rebuild(self, events, version):
+        with self._lock:
+            self._series, self._pareto, self._contrib = {}, {}, {}
+            for event in events:
+                self._add(event)
+            self._version = version
+
+    def update(self, events, changed_keys, version):
+        """Re-count only changed_keys from the saved event list (None = unknown -> rebuild)"""
+        if changed_keys is None or self._version is None:
+            self.rebuild(events, version)
+            return
+        wanted = set(changed_keys)
+        with self._lock:
+            for key in wanted:
+                self._remove(key)
+            for event in events:
+                if event.get(self.key) in wanted:
+                    self._add(event)
+            self._version = version
+
+    def _ensure(self, version, load_events):
+        if version != self._version:
+            self.rebuild(load_events(), version)
+
+    def over_time(self, period, dimension, version, load_events):
+        """[{'Period', 'Category', 'Events'}] sorted by period"""
+        self._ensure(version, load_events)
+        with self._lock:
+            counts = dict(self._series.get((period, dimension), {}))
+        return [{"Period": p, "Category": c, "Events": n} for (p, c), n in sorted(counts.items())]
+
+    def pareto(self, version, load_events):
+        """Subclusters by event count, with share and cumulative share (%)"""
+        self._ensure(version, load_events)
+        with self._lock:
+            items = sorted(self._pareto.items(), key=lambda kv: (-kv[1], kv[0]))
+        total = sum(n for _, n in items) or 1
+        rows, running = [], 0
+        for (main, sub), n in items:
+            running += n
+            rows.append({"Subcluster": sub, "Main Cluster": main, "Events": n,
+                         "Share %": round(100 * n / total, 1), "Cumulative %": round(100 * running / total, 1)})
+        return rows
+
+    def totals(self, dimension, version, load_events):
+        """{category: count} over the whole log"""
+        self._ensure(version, load_events)
+        with self._lock:
+            counts = self._series.get(('month', dimension), {})
+            out = {}
+            for (_, category), n in counts.items():
+                out[category] = out.get(category, 0) + n
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]))
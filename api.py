@@ -0,0 +1,460 @@
+"""
+Versioned REST/JSON API for the override register and the shutdown log (mounted by app.py)
+For the DCS historian integration and onshore dashboards - no more scraping Excel emails.
+
+    GET  /api/v1/overrides?page=1&page_size=100&closed=NO&module_parameter=77AT&include_archive=1
+    GET  /api/v1/overrides/{entry_no}
+    POST /api/v1/overrides/bulk        {"items": [{...}, ...]}   (no entry_no = create)
+    GET  /api/v1/shutdowns?page=1&page_size=100&event_type=ESD
+    GET  /api/v1/shutdowns/{id}
+    POST /api/v1/shutdowns/bulk        {"items": [{...}, ...]}   (no ID = create)
+
+Every call works on one asset partition: ?asset=<name> or the X-CCR-Asset header (default: the
+first asset). Override lists cover the hot register; ?include_archive=1 searches the archived
+(old closed) entries too, and a single-entry GET falls back to the archive ("archived": true,
+read-only). The list endpoints also accept ?asset=all - a federated read over every partition
+(queried in parallel, merged in asset order, each item tagged with its "asset").
+
+Authentication: HTTP Basic, checked with overrides.authenticate(); writes use the same role
+rules as the UI (can_create / can_edit; only can_edit roles may set approved / closed). Closed-set
+fields must hold one of their UI options, new entries start with the Create New form's values and
+a new event's timestamp is set by the server. Every read carries a strong ETag derived from the
+change-feed data version - a poller sending If-None-Match gets 304 before any query runs.
+"""
+import re
+import json
+import base64
+import hashlib
+
+import archive
+import assets
+import changefeed
+import metrics
+import overrides
+import shutdown_log
+
+API_PREFIX = "/api/v1"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_ITEMS = 500
+
+
+def _param_name(column):
+    """'Technical Details/Event Description' -> 'technical_details_event_description'"""
+    return re.sub(r"[^a-z0-9]+", "_", column.lower()).strip("_")
+
+
+OVERRIDE_FIELDS = {db_col: ui_col for ui_col, db_col in overrides.DB_COLUMN_MAPPING.items()}
+SHUTDOWN_FIELDS = {_param_name(col): col for col in shutdown_log.SHUTDOWN_COLUMNS}
+SHUTDOWN_FIELDS["description"] = "Technical Details/Event Description"
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+# ======================
+# AUTH, PAGING, ETAGS
+# ======================
+def _authenticate(request):
+    """Return the caller's role or raise ApiError(401)"""
+    header = request.headers.get("authorization", "")
+    if header.lower().startswith("basic "):
+        try:
+            username, _, password = base64.b64decode(header[6:]).decode("utf-8").partition(":")
+        except (ValueError, UnicodeDecodeError):
+            username, password = "", ""
+        success, role, _ = overrides.authenticate(username, password)
+        if success:
+            return username, role
+    raise ApiError(401, "Authentication required (HTTP Basic, same users as the CCR register)")
+
+
+def _paging(request):
+    try:
+        page = max(1, int(request.query_params.get("page", 1)))
+        page_size = int(request.query_params.get("page_size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(400, "page and page_size must be integers")
+    return page, min(max(1, page_size), MAX_PAGE_SIZE)
+
+
+def _filters(request, fields):
+    unknown = [k for k in request.query_params
+               if k not in fields and k not in ("page", "page_size", "asset", "include_archive")]
+    if unknown:
+        raise ApiError(400, f"Unknown filter(s): {', '.join(unknown)}", {"filters": sorted(fields)})
+    return {fields[k]: v for k, v in request.query_params.items() if k in fields and v.strip()}
+
+
+def _etag(*parts):
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _not_modified(request, etag):
+    candidates = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+    return etag in candidates or "*" in candidates
+
+
+def _json_safe(value):
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    if isinstance(value, float):
+        return None if value != value else (int(value) if value.is_integer() else value)
+    return str(value)
+
+
+# ======================
+# OVERRIDE REGISTER
+# ======================
+def _include_archive(request):
+    return request.query_params.get("include_archive", "").strip().lower() in ("1", "true", "yes")
+
+
+def _override_page(filters, page, page_size, include_archive=False):
+    return _override_rows(filters, page_size, (page - 1) * page_size, include_archive=include_archive)
+
+
+def _override_rows(filters, limit, offset, count=True, include_archive=False):
+    """(total matching, items[offset:offset + limit]) for the current asset"""
+    where, params, _, _ = overrides.build_filter_clauses(filters)
+    where_sql = "WHERE " + " AND ".join(where) if where else ""
+    with overrides.read_snapshot():  # total and items from the same instant
+        return _override_rows_in_snapshot(archive.source(include_archive), where_sql, params, limit, offset, count)
+
+
+def _override_rows_in_snapshot(table, where_sql, params, limit, offset, count):
+    conn = overrides.get_connection()
+    try:
+        with metrics.db_timer("api_overrides_page"):
+            total = conn.execute(f"SELECT COUNT(*) FROM {table} {where_sql}", params).fetchone()[0] if count else None
+            items = []
+            if limit > 0:
+                cur = conn.execute(
+                    f"SELECT {', '.join(OVERRIDE_FIELDS)} FROM {table} {where_sql} ORDER BY entry_no LIMIT ? OFFSET ?",
+                    params + [limit, offset])
+                cols = [d[0] for d in cur.description]
+                items = [dict(zip(cols, map(_json_safe, row))) for row in cur.fetchall()]
+    finally:
+        conn.close()
+    return total, items
+
+
+def _override_page_all_assets(filters, page, page_size, include_archive=False):
+    """Federated page: count every partition, then fetch only the slices the page covers (in parallel)"""
+    counts = assets.federated(lambda: _override_rows(filters, 0, 0, include_archive=include_archive)[0])
+    start, end, offset, plan = (page - 1) * page_size, page * page_size, 0, {}
+    for asset, n in counts:
+        lo, hi = max(start - offset, 0), min(end - offset, n)
+        if lo < hi:
+            plan[asset] = (hi - lo, lo)
+        offset += n
+    pages = assets.federated(lambda: _override_rows(filters, *plan.get(assets.current(), (0, 0)), count=False,
+                                                    include_archive=include_archive)[1])
+    items = [{"asset": asset, **item} for asset, rows in pages for item in rows]
+    return offset, items
+
+
+def _override_record(entry_no, include_archive=False):
+    """The entry as a dict (hot register first; with include_archive an archived one gets "archived": true)"""
+    conn = overrides.get_connection()
+    try:
+        for table in ["overrides"] + ([archive.ARCHIVE_TABLE] if include_archive else []):
+            cur = conn.execute(f"SELECT {', '.join(OVERRIDE_FIELDS)} FROM {table} WHERE entry_no = ?", (entry_no,))
+            row = cur.fetchone()
+            if row:
+                record = dict(zip([d[0] for d in cur.description], map(_json_safe, row)))
+                return {**record, "archived": True} if table == archive.ARCHIVE_TABLE else record
+        return None
+    finally:
+        conn.close()
+
+
+def _invalid_choices(values, choices):
+    """Error text for values outside their option list ({field: [allowed, ...]}), or None"""
+    bad = [f"{k} must be one of {', '.join(allowed)}" for k, allowed in choices.items()
+           if str(values.get(k, "")).strip() not in allowed]
+    return "; ".join(bad) or None
+
+
+def _bulk_save_overrides(items, username, role):
+    """Validate everything first; then write all items in one transaction"""
+    plans, errors = [], []
+    conn = overrides.get_connection()
+    try:
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({"index": i, "error": "item must be an object"})
+                continue
+            unknown = [k for k in item if k not in OVERRIDE_FIELDS]
+            if unknown:
+                errors.append({"index": i, "error": f"unknown field(s): {', '.join(unknown)}"})
+                continue
+            is_new = item.get("entry_no") in (None, "")
+            if is_new and not overrides.can_create(role):
+                errors.append({"index": i, "error": f"role '{role}' cannot create entries"})
+                continue
+            if not is_new and not overrides.can_edit(role):
+                errors.append({"index": i, "error": f"role '{role}' cannot edit entries"})
+                continue
+            locked = [k for k in ("approved", "closed") if k in item]
+            if locked and not overrides.can_edit(role):  # the UI only lets editors set these
+                errors.append({"index": i, "error": f"role '{role}' cannot set {', '.join(locked)}"})
+                continue
+            invalid = _invalid_choices({k: overrides.canonical_value(k, v) for k, v in item.items()},  # any case
+                                       {k: v for k, v in overrides.EXACT_MATCH_VALUES.items() if k in item})
+            if invalid:
+                errors.append({"index": i, "error": invalid})
+                continue
+            data = {ui: "" for ui in overrides.DISPLAY_COLUMNS}
+            if is_new:
+                data.update(overrides.new_entry_defaults())  # same starting values as the Create New form
+            else:
+                try:
+                    existing = _override_record(int(item["entry_no"]), include_archive=True)
+                except (TypeError, ValueError):
+                    existing = None
+                if existing is None or existing.get("archived"):
+                    errors.append({"index": i, "error": f"entry {item['entry_no']} "
+                                                        + ("is archived (read-only)" if existing else "not found")})
+                    continue
+                data.update({OVERRIDE_FIELDS[k]: "" if v is None else v for k, v in existing.items()})
+            data.update({OVERRIDE_FIELDS[k]: "" if v is None else str(v) for k, v in item.items()})
+            if not str(data['Module Parameter']).strip() or not str(data['Description']).strip():
+                errors.append({"index": i, "error": "module_parameter and description are required"})
+                continue
+            plans.append((i, data, is_new))
+        if errors:
+            raise ApiError(422, "No changes written: fix the listed items", {"errors": errors})
+
+        results = []
+        with metrics.db_timer("api_overrides_bulk"):
+            for i, data, is_new in plans:
+                entry_no = overrides.save_entry(data, is_new, username, conn=conn)
+                results.append({"index": i, "entry_no": entry_no, "status": "created" if is_new else "updated"})
+            conn.commit()
+        return results
+    finally:
+        conn.close()
+
+
+# ======================
+# SHUTDOWN LOG
+# ======================
+def _bulk_save_shutdowns(items, role):
+    with shutdown_log.write_lock():  # load-modify-save: shared with the UI and the other workers
+        events = shutdown_log.load_shutdown_events()
+        by_id = {e.get('ID'): e for e in events}
+        next_id = max((e['ID'] for e in events if isinstance(e.get('ID'), int)), default=0) + 1
+        results, errors, changed = [], [], []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append({"index": i, "error": "item must be an object"})
+                continue
+            unknown = [k for k in item if k not in SHUTDOWN_FIELDS]
+            if unknown:
+                errors.append({"index": i, "error": f"unknown field(s): {', '.join(unknown)}"})
+                continue
+            values = {SHUTDOWN_FIELDS[k]: v for k, v in item.items()}
+            event_id = values.pop('ID', None)
+            is_new = event_id in (None, "")
+            if not (overrides.can_create(role) if is_new else overrides.can_edit(role)):
+                errors.append({"index": i, "error": f"role '{role}' cannot {'create' if is_new else 'edit'} events"})
+                continue
+            if is_new:
+                event = {col: "" for col in shutdown_log.SHUTDOWN_COLUMNS}
+                event.update({'RCA': "Pending", 'Actions': "Pending",
+                              'Event Type': shutdown_log.EVENT_TYPE_OPTIONS[0],
+                              'Event Classification': shutdown_log.EVENT_CLASSIFICATION_OPTIONS[0]})
+            else:
+                try:
+                    event_id = int(event_id)
+                except (TypeError, ValueError):
+                    pass
+                if event_id not in by_id:
+                    errors.append({"index": i, "error": f"event {event_id} not found"})
+                    continue
+                event = dict(by_id[event_id])
+            values.pop('timestamp', None)  # set by the server: now for a new event, kept on an update
+            event.update({k: "" if v is None else str(v).strip() for k, v in values.items()})
+            event.update(shutdown_log.fixed_fields())  # organizational fields are not client-writable
+            if is_new:  # cluster defaults follow the classification, like the UI dropdowns
+                clusters = shutdown_log.MAIN_CLUSTER_OPTIONS.get(event['Event Classification'], [""])
+                event['Main Cluster'] = event['Main Cluster'] or clusters[0]
+                subclusters = shutdown_log.SUBCLUSTER_OPTIONS.get(f"{event['Event Classification']}|{event['Main Cluster']}", [""])
+                event['Subcluster'] = event['Subcluster'] or subclusters[0]
+            invalid = (is_new or any(c in values for c in ('Event Type', 'Event Classification', 'Main Cluster'))) \
+                and _invalid_choices(event, {
+                    'Event Type': shutdown_log.EVENT_TYPE_OPTIONS,
+                    'Event Classification': shutdown_log.EVENT_CLASSIFICATION_OPTIONS,
+                    'Main Cluster': shutdown_log.MAIN_CLUSTER_OPTIONS.get(event.get('Event Classification'), [])})
+            if invalid:
+                errors.append({"index": i, "error": invalid})
+                continue
+            missing = [c for c in ('Technical Details/Event Description', 'First Cause', 'Reported by')
+                       if not str(event.get(c, "")).strip()]
+            if missing:
+                errors.append({"index": i, "error": f"required: {', '.join(_param_name(c) for c in missing)}"})
+                continue
+            if is_new:
+                event['ID'] = next_id
+                event['timestamp'] = shutdown_log.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                next_id += 1
+                events.append(event)
+            else:
+                events[events.index(by_id[event_id])] = event
+            by_id[event['ID']] = event
+            changed.append(event['ID'])
+            results.append({"index": i, "id": event['ID'], "status": "created" if is_new else "updated"})
+        if errors:
+            raise ApiError(422, "No changes written: fix the listed items", {"errors": errors})
+        if changed and not shutdown_log.save_shutdown_events(events, changed_ids=changed):
+            raise ApiError(500, "Save failed. Check file permissions.")
+        return results
+
+
+# ======================
+# STARLETTE ROUTES
+# ======================
+def routes():
+    from starlette.concurrency import run_in_threadpool
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+
+    def endpoint(name, federated=False):
+        """Wrap a handler: auth, asset routing (asset=all only where federated), ApiError -> JSON error, metrics"""
+        def decorate(fn):
+            async def wrapper(request):
+                with metrics.timer("api", name):
+                    try:
+                        user = _authenticate(request)
+                        try:
+                            asset = assets.from_request(request, allow_all=federated)
+                        except ValueError as e:
+                            raise ApiError(404, str(e), {"assets": assets.names()})
+                        request.state.all_assets = asset == assets.ALL
+                        with assets.using(None if request.state.all_assets else asset):
+                            return await fn(request, *user)
+                    except ApiError as e:
+                        body = {"error": e.message, **(e.details or {})}
+                        headers = {"WWW-Authenticate": 'Basic realm="CCR"'} if e.status == 401 else None
+                        return JSONResponse(body, status_code=e.status, headers=headers)
+            return wrapper
+        return decorate
+
+    def conditional(request, etag):
+        """(headers, None) for a fresh read, or (None, 304 response) when the client is current"""
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if _not_modified(request, etag):
+            return None, Response(status_code=304, headers=headers)
+        return headers, None
+
+    @endpoint("overrides_list", federated=True)
+    async def overrides_list(request, username, role):
+        page, page_size = _paging(request)
+        filters = _filters(request, OVERRIDE_FIELDS)
+        include_archive = _include_archive(request)
+        if request.state.all_assets:
+            version = {a: v for a, v in assets.federated(lambda: changefeed.overrides_feed.version())}
+        else:
+            version = changefeed.overrides_feed.version()
+        etag = _etag("overrides", assets.current(), version, page, page_size, sorted(filters.items()), include_archive)
+        headers, not_modified = conditional(request, etag)
+        if not_modified:
+            return not_modified
+        page_fn = _override_page_all_assets if request.state.all_assets else _override_page
+        total, items = await run_in_threadpool(page_fn, filters, page, page_size, include_archive)
+        return JSONResponse({"version": version, "page": page, "page_size": page_size,
+                             "total": total, "items": items}, headers=headers)
+
+    @endpoint("overrides_get")
+    async def overrides_get(request, username, role):
+        try:
+            entry_no = int(request.path_params["entry_no"])
+        except ValueError:
+            raise ApiError(400, "entry_no must be an integer")
+        version = changefeed.overrides_feed.version()
+        headers, not_modified = conditional(request, _etag("override", assets.current(), version, entry_no))
+        if not_modified:
+            return not_modified
+        record = await run_in_threadpool(_override_record, entry_no, True)
+        if record is None:
+            raise ApiError(404, f"Entry {entry_no} not found")
+        return JSONResponse(record, headers=headers)
+
+    @endpoint("overrides_bulk")
+    async def overrides_bulk(request, username, role):
+        items = await _bulk_items(request)
+        results = await run_in_threadpool(_bulk_save_overrides, items, username, role)
+        return JSONResponse({"version": changefeed.overrides_feed.version(), "results": results})
+
+    @endpoint("shutdowns_list", federated=True)
+    async def shutdowns_list(request, username, role):
+        page, page_size = _paging(request)
+        filters = _filters(request, SHUTDOWN_FIELDS)
+        if request.state.all_assets:
+            fingerprint = {a: f for a, f in assets.federated(lambda: changefeed.shutdown_feed.fingerprint())}
+        else:
+            fingerprint = changefeed.shutdown_feed.fingerprint()
+        etag = _etag("shutdowns", assets.current(), fingerprint, page, page_size, sorted(filters.items()))
+        headers, not_modified = conditional(request, etag)
+        if not_modified:
+            return not_modified
+        if request.state.all_assets:  # oldest first within each asset, assets in registry order
+            matched = [(asset, e) for asset, events in
+                       await run_in_threadpool(assets.federated, shutdown_log.search_shutdowns, filters)
+                       for e in events[::-1]]
+        else:
+            matched = [(None, e) for e in (await run_in_threadpool(shutdown_log.search_shutdowns, filters))[::-1]]
+        items = [{**({"asset": asset} if asset else {}), **{_param_name(k): _json_safe(v) for k, v in e.items()}}
+                 for asset, e in matched[(page - 1) * page_size: page * page_size]]
+        return JSONResponse({"version": fingerprint, "page": page, "page_size": page_size,
+                             "total": len(matched), "items": items}, headers=headers)
+
+    @endpoint("shutdowns_get")
+    async def shutdowns_get(request, username, role):
+        try:
+            event_id = int(request.path_params["event_id"])
+        except ValueError:
+            raise ApiError(400, "id must be an integer")
+        headers, not_modified = conditional(
+            request, _etag("shutdown", assets.current(), changefeed.shutdown_feed.fingerprint(), event_id))
+        if not_modified:
+            return not_modified
+        found = await run_in_threadpool(shutdown_log.search_shutdowns, {}, [event_id])
+        event = found[0] if found else None
+        if event is None:
+            raise ApiError(404, f"Event {event_id} not found")
+        return JSONResponse({_param_name(k): _json_safe(v) for k, v in event.items()}, headers=headers)
+
+    @endpoint("shutdowns_bulk")
+    async def shutdowns_bulk(request, username, role):
+        items = await _bulk_items(request)
+        results = await run_in_threadpool(_bulk_save_shutdowns, items, role)
+        return JSONResponse({"version": changefeed.shutdown_feed.fingerprint(), "results": results})
+
+    async def _bulk_items(request):
+        try:
+            body = await request.json()
+        except (ValueError, json.JSONDecodeError):
+            raise ApiError(400, "Body must be JSON: {\"items\": [...]}")
+        items = body.get("items") if isinstance(body, dict) else body
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, "Body must contain a non-empty \"items\" list")
+        if len(items) > MAX_BULK_ITEMS:
+            raise ApiError(413, f"At most {MAX_BULK_ITEMS} items per request")
+        return items
+
+    return [
+        Route(f"{API_PREFIX}/overrides", overrides_list, methods=["GET"]),
+        Route(f"{API_PREFIX}/overrides/bulk", overrides_bulk, methods=["POST"]),
+        Route(f"{API_PREFIX}/overrides/{{entry_no}}", overrides_get, methods=["GET"]),
+        Route(f"{API_PREFIX}/shutdowns", shutdowns_list, methods=["GET"]),
+        Route(f"{API_PREFIX}/shutdowns/bulk", shutdowns_bulk, methods=["POST"]),
+        Route(f"{API_PREFIX}/shutdowns/{{event_id}}", shutdowns_get, methods=["GET"]),
+    ]
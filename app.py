@@ -1,38 +1,121 @@
-import gradio as gr
-import json
 import os
-import datetime
-import socket
-import tempfile
-import re
-import shutdown_log, overrides, manual
+import sys
+import time
+import signal
+import argparse
+import subprocess
+from startup import phase, startup_report
 
-with gr.Blocks() as demo:
-    overrides.demo.render()
-with demo.route("Shutdown Logs"):
-    shutdown_log.demo.render()
-with demo.route("User Manual"):
-    manual.demo.render()
+with phase("import gradio + app modules"):
+    import gradio as gr
+    import shutdown_log, overrides, manual, dashboard
+    import metrics
+    import changefeed
+    import api
+    import exportstore
+    import assets
+    import replication
+    import webassets
+    import cluster
 
+_demo = None
 
-if __name__ == "__main__":
-    # Auto-detect LAN IP address
-    local_ip = "127.0.0.1"
+def build_app():
+    """Explicit startup phase: module I/O first, then the UI (built once, on first build_app() / app.demo)"""
+    global _demo
+    if _demo is not None:
+        return _demo
+
+    overrides.startup()
+    shutdown_log.startup()
+    manual.startup()
+    with phase("static assets: optimize logos"):
+        webassets.build_images()
+    with phase("static assets: precompress Gradio bundle"):
+        cluster.when_leader("Bundle precompression", webassets.start)  # background, once per Gradio version
+
+    with phase("build UI: Main Register"):
+        # Gradio copies every downloaded file into its own cache - expire those on the same schedule
+        with gr.Blocks(delete_cache=(exportstore.SWEEP_SECONDS, exportstore.MAX_AGE_HOURS * 3600)) as demo:
+            overrides.build_demo().render()
+    # Routes are only constructed here, right before they are mounted. Not deferred to their first
+    # request: Gradio fixes the page config (every route's components) when launch() starts.
+    with phase("build UI: Shutdown Logs route"):
+        shutdown_demo = shutdown_log.build_demo()
+        with demo.route("Shutdown Logs"):
+            shutdown_demo.render()
+    with phase("build UI: Analytics route"):
+        dashboard_demo = dashboard.build_demo()
+        with demo.route("Analytics"):
+            dashboard_demo.render()
+    with phase("build UI: User Manual route"):
+        manual_demo = manual.build_demo()
+        with demo.route("User Manual"):
+            manual_demo.render()
+
+    # Handlers registered straight on the root (Main Register is built inside its context) -> asset routing
+    _demo = assets.scope_handlers(demo)
+    return demo
+
+
+def extra_routes():
+    """Plain HTTP endpoints served next to the UI (mounted ahead of Gradio's own routes)"""
+    return [*webassets.routes(), *metrics.routes(), *changefeed.routes(), *api.routes(), *replication.routes()]
+
+
+def __getattr__(name):
+    # `gradio app.py` / `from app import demo` still work - built on first access
+    if name == "demo":
+        return build_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def run_workers(workers, base_port):
+    """
+    Multi-worker mode: one app process per port (base_port, base_port + 1, ...), restarted if it dies.
+    Gradio keeps each session in one process - put a sticky proxy in front (see README).
+    The workers elect one scheduler leader between them (cluster.py).
+    """
+    def spawn(i):
+        port = base_port + i
+        print(f"🧩 Worker {i + 1}/{workers} starting on port {port}")
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__), "--workers", "1", "--port", str(port),
+                                 "--no-browser"])
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # service stop -> stop the workers too
+    procs = [spawn(i) for i in range(workers)]
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(0.1)
-        s.connect(("10.255.255.255", 1))
-        local_ip = s.getsockname()[0]
-        s.close()
-    except Exception:
-        try:
-            local_ip = socket.gethostbyname(socket.gethostname())
-            if local_ip.startswith("127.") or ":" in local_ip:
-                local_ip = "YOUR_LOCAL_IP"
-        except:
-            local_ip = "YOUR_LOCAL_IP"    
-    demo.launch(
-        server_name="0.0.0.0",
-        server_port=7860,
-        inbrowser=True,
-        )
\ No newline at end of file
+        while True:
+            time.sleep(5)
+            for i, proc in enumerate(procs):
+                if proc.poll() is not None:
+                    print(f"⚠️ Worker on port {base_port + i} exited with code {proc.returncode} - restarting")
+                    procs[i] = spawn(i)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CCR Master Override Register")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("CCR_WORKERS", "1")),
+                        help="app processes to run (one port each, starting at --port)")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--no-browser", action="store_true", help="do not open a browser tab")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        run_workers(args.workers, args.port)
+    else:
+        demo = build_app()
+        print(startup_report())
+        demo.launch(
+            server_name="0.0.0.0",
+            server_port=args.port,
+            inbrowser=not args.no_browser,
+            app_kwargs={"routes": extra_routes(), "middleware": webassets.middleware()},
+            )
@@ -0,0 +1,126 @@
+"""
+Hot / archive partitioning of the override register
+Closed entries whose Date Off is older than ARCHIVE_AFTER_DAYS are moved (same transaction:
+INSERT into ARCHIVE_TABLE, DELETE from overrides) to an archive table with the same schema in
+the same database. The register screens, lookups, filters and the API then only touch the hot
+set; the ALL_VIEW view (hot UNION ALL archive) is used where the whole history matters: the
+"Include archive" search, the full export, exposure analytics, next entry number, import
+duplicate checks and history checkpoints.
+Archived entries are read-only. The move is not an edit: it is left out of the change history
+(as_of still shows them), while the change feed sees a delete so open screens drop the rows.
+"""
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from startup import lazy_import
+import assets
+
+pd = lazy_import("pandas")
+
+ARCHIVE_TABLE = "overrides_archive"
+ALL_VIEW = "overrides_all"  # hot UNION ALL archive
+ARCHIVE_AFTER_DAYS = int(os.environ.get("CCR_ARCHIVE_AFTER_DAYS", 180))
+CHECK_HOURS = 24
+
+_thread = None
+
+
+def _columns(conn, table):
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def ensure_schema(conn):
+    """Create the archive table (copy of the overrides schema) and the ALL_VIEW view. Caller commits."""
+    create_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='overrides'").fetchone()[0]
+    conn.execute(re.sub(r"^\s*CREATE TABLE\s+(IF NOT EXISTS\s+)?\"?overrides\"?",
+                        f"CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE}", create_sql, count=1, flags=re.IGNORECASE))
+    hot = _columns(conn, "overrides")
+    archived = {name for name, _ in _columns(conn, ARCHIVE_TABLE)}
+    for name, col_type in hot:
+        if name not in archived:  # column added to overrides by a later migration
+            conn.execute(f"ALTER TABLE {ARCHIVE_TABLE} ADD COLUMN {name} {col_type}")
+    cols = ", ".join(name for name, _ in hot)
+    conn.execute(f"DROP VIEW IF EXISTS {ALL_VIEW}")
+    conn.execute(f"CREATE VIEW {ALL_VIEW} AS SELECT {cols} FROM overrides "
+                 f"UNION ALL SELECT {cols} FROM {ARCHIVE_TABLE}")
+
+
+def source(include_archive=False):
+    """Table name for a register query: the hot set, or hot + archive"""
+    return ALL_VIEW if include_archive else "overrides"
+
+
+def is_archived(conn, entry_no):
+    return conn.execute(f"SELECT 1 FROM {ARCHIVE_TABLE} WHERE entry_no = ?", (entry_no,)).fetchone() is not None
+
+
+def counts(conn):
+    """(hot rows, archived rows)"""
+    return (conn.execute("SELECT COUNT(*) FROM overrides").fetchone()[0],
+            conn.execute(f"SELECT COUNT(*) FROM {ARCHIVE_TABLE}").fetchone()[0])
+
+
+def due_entries(conn, days=ARCHIVE_AFTER_DAYS):
+    """Entry numbers of closed entries whose Date Off is more than `days` days ago"""
+    df = pd.read_sql_query("SELECT entry_no, date_off FROM overrides WHERE closed = 'YES'", conn)
+    if df.empty:
+        return []
+    date_off = pd.to_datetime(df["date_off"].replace("", None), format="mixed", errors="coerce")
+    cutoff = datetime.now() - timedelta(days=days)
+    return [int(n) for n in df.loc[date_off < cutoff, "entry_no"]]  # no / unreadable Date Off: stays hot
+
+
+def archive_closed(conn, days=ARCHIVE_AFTER_DAYS):
+    """Move the due entries in one IMMEDIATE transaction. Returns the number of entries moved."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        entry_nos = due_entries(conn, days)
+        if entry_nos:
+            cols = ", ".join(name for name, _ in _columns(conn, "overrides"))
+            for i in range(0, len(entry_nos), 500):  # stay under SQLite's bound-parameter limit
+                chunk = entry_nos[i:i + 500]
+                marks = ", ".join(["?"] * len(chunk))
+                conn.execute(f"INSERT INTO {ARCHIVE_TABLE} ({cols}) SELECT {cols} FROM overrides "
+                             f"WHERE entry_no IN ({marks})", chunk)
+                conn.execute(f"DELETE FROM overrides WHERE entry_no IN ({marks})", chunk)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(entry_nos)
+
+
+def start(connect_fn, job=None):
+    """Daemon thread: every CHECK_HOURS archive the due entries of each asset (idempotent).
+    connect_fn() opens the current asset's database."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    def due():
+        for name in assets.names():
+            with assets.using(name):
+                conn = connect_fn()
+                try:
+                    moved = archive_closed(conn)
+                    if moved:
+                        print(f"📦 Archived {moved} closed override(s) of {name} "
+                              f"(Date Off older than {ARCHIVE_AFTER_DAYS} days)")
+                except Exception as e:
+                    print(f"❌ Scheduled archiving failed ({name}): {str(e)}")
+                finally:
+                    conn.close()
+
+    run_due = job(due) if job else due
+
+    def run():
+        while True:
+            run_due()
+            time.sleep(CHECK_HOURS * 3600)
+
+    _thread = threading.Thread(target=run, name="override-archive", daemon=True)
+    _thread.start()
+    print(f"📦 Override archive: closed entries move out of the register {ARCHIVE_AFTER_DAYS} days after Date Off")
+    return _thread
@@ -0,0 +1,221 @@
+"""
+Asset partitions: one override database and one shutdown log per asset (unit / installation)
+The first asset keeps the original files (fgs_overrides.db, shutdown.json), so an existing
+install is simply a one-asset server; further assets are listed in ASSETS_FILE and stored under
+assets/<slug>/. Every DB / file function routes through the asset of the current call, held in
+a context variable:
+  - UI: scope_handlers() wraps every event handler so it runs under the asset picked in the
+    selector (kept in the COOKIE cookie, so all pages of one browser agree);
+  - REST API / change feed: ?asset=<name> or the X-CCR-Asset header (cookie as a fallback);
+  - scheduled jobs: for_each() runs the job once per asset.
+Module-level caches holding one asset's data (change feeds, filter index, dashboard counters...)
+are PerAsset proxies - one instance per asset, picked by the current asset.
+federated() runs a read on every partition in parallel for the "all assets" views.
+
+assets.json: [{"Country": "CONGO", "Company": "ENI CONGO", "Unit/Asset": "NGUYA FLNG"}, ...]
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import gradio as gr
+
+ASSETS_FILE = "assets.json"
+ASSETS_DIR = "assets"
+COOKIE = "ccr_asset"
+ALL = "all"  # API value for the federated read path
+FEDERATED_WORKERS = 8
+DEFAULT_FIELDS = {"Country": "CONGO", "Company": "ENI CONGO", "Unit/Asset": "NGUYA FLNG"}
+
+_lock = threading.Lock()
+_registry = None  # name -> organizational fields, in ASSETS_FILE order
+_current = contextvars.ContextVar("ccr_asset", default=None)
+
+
+def _load():
+    global _registry
+    with _lock:
+        if _registry is None:
+            assets = [DEFAULT_FIELDS]
+            if os.path.exists(ASSETS_FILE):
+                try:
+                    with open(ASSETS_FILE, 'r', encoding='utf-8') as f:
+                        listed = [a for a in json.load(f) if str(a.get("Unit/Asset", "")).strip()]
+                    assets = listed or assets
+                except (OSError, ValueError, AttributeError) as e:
+                    print(f"⚠️ Ignoring {ASSETS_FILE} ({e}) - single asset {DEFAULT_FIELDS['Unit/Asset']}")
+            _registry = {str(a["Unit/Asset"]).strip(): {**DEFAULT_FIELDS, **a} for a in assets}
+        return _registry
+
+
+def names():
+    return list(_load())
+
+
+def default():
+    return names()[0]
+
+
+def current():
+    """Asset of the running call (the first asset outside any scope)"""
+    return _current.get() or default()
+
+
+def is_default(name=None):
+    return (name or current()) == default()
+
+
+def resolve(name):
+    """Registered asset name (case-insensitive), or None"""
+    wanted = str(name or "").strip().lower()
+    return next((n for n in names() if n.lower() == wanted or slug(n) == wanted), None)
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def fields(name=None):
+    """Country / Company / Unit/Asset of an asset (fixed fields of its shutdown events)"""
+    registered = _load()[name or current()]
+    return {k: registered[k] for k in DEFAULT_FIELDS}
+
+
+def path(filename, name=None):
+    """Storage path of a per-asset file: unchanged for the first asset, assets/<slug>/ otherwise"""
+    name = name or current()
+    if is_default(name):
+        return filename
+    folder = os.path.join(ASSETS_DIR, slug(name))
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, os.path.basename(filename))
+
+
+def subject_tag():
+    """'[UNIT] ' prefix for email subjects once several assets share the server"""
+    return f"[{current()}] " if len(names()) > 1 else ""
+
+
+@contextlib.contextmanager
+def using(name):
+    token = _current.set(name or default())
+    try:
+        yield name
+    finally:
+        _current.reset(token)
+
+
+# ======================
+# PER-ASSET STATE
+# ======================
+class PerAsset:
+    """One instance per asset, created on first use; attribute access goes to the current asset's"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def get(self, name=None):
+        name = name or current()
+        with self._lock:
+            if name not in self._instances:
+                self._instances[name] = self._factory()
+            return self._instances[name]
+
+    def __getattr__(self, attr):
+        return getattr(self.get(), attr)
+
+
+def for_each(fn):
+    """Job wrapper: run fn once per asset (sequentially, each under its own asset)"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        results = []
+        for name in names():
+            with using(name):
+                results.append(fn(*args, **kwargs))
+        return results[0] if len(results) == 1 else results
+    return wrapper
+
+
+def federated(fn, *args, **kwargs):
+    """Run a read on every partition in parallel: [(asset, result), ...] in registry order"""
+    def run(name):
+        with using(name):
+            return fn(*args, **kwargs)
+
+    all_names = names()
+    if len(all_names) == 1:
+        return [(all_names[0], run(all_names[0]))]
+    with ThreadPoolExecutor(max_workers=min(FEDERATED_WORKERS, len(all_names))) as pool:
+        return list(zip(all_names, pool.map(run, all_names)))
+
+
+# ======================
+# REQUEST ROUTING
+# ======================
+def from_request(request, allow_all=False):
+    """Asset named by ?asset=, X-CCR-Asset or the selector cookie; raises ValueError if unknown"""
+    if request is None:
+        return default()
+    query = getattr(request, "query_params", None) or {}
+    headers = getattr(request, "headers", None) or {}
+    cookies = getattr(request, "cookies", None) or {}
+    wanted = query.get("asset") or headers.get("x-ccr-asset")
+    if allow_all and str(wanted or "").strip().lower() == ALL:
+        return ALL
+    if wanted:
+        name = resolve(wanted)
+        if name is None:
+            raise ValueError(f"Unknown asset '{wanted}' (known: {', '.join(names())})")
+        return name
+    return resolve(cookies.get(COOKIE)) or default()
+
+
+def _scoped(fn):
+    """Handler wrapper: Gradio injects the request (first parameter) -> run fn under its asset"""
+    if fn is None or getattr(fn, "_asset_scoped", False):
+        return fn
+    signature = inspect.signature(fn)
+    request_param = inspect.Parameter("asset_request", inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                                      annotation=gr.Request)
+
+    @functools.wraps(fn)
+    def wrapper(asset_request, *args, **kwargs):
+        try:
+            name = from_request(asset_request)
+        except ValueError:
+            name = default()  # stale or hand-edited URL: fall back rather than break the page
+        with using(name):
+            return fn(*args, **kwargs)
+
+    wrapper.__signature__ = signature.replace(parameters=[request_param, *signature.parameters.values()])
+    wrapper.__annotations__ = {**getattr(fn, "__annotations__", {}), "asset_request": gr.Request}
+    wrapper._asset_scoped = True
+    return wrapper
+
+
+def scope_handlers(demo):
+    """Route every event handler of a built Blocks to the selected asset (call at the end of build_demo)"""
+    for block_fn in demo.fns.values():
+        block_fn.fn = _scoped(block_fn.fn)
+    return demo
+
+
+def selector(demo):
+    """Asset dropdown (hidden on a one-asset server); picking an asset reloads the page under it"""
+    dropdown = gr.Dropdown([(n, slug(n)) for n in names()], value=slug(default()), label="🏭 Asset",
+                           interactive=True, visible=len(names()) > 1, scale=0, min_width=220)
+    demo.load(lambda: slug(current()), outputs=dropdown, queue=False, show_progress="hidden")
+    dropdown.input(None, inputs=dropdown, js=f"""(asset) => {{
+        document.cookie = "{COOKIE}=" + asset + "; path=/; max-age=31536000; SameSite=Lax";
+        window.location.reload();
+    }}""")
+    return dropdown
@@ -0,0 +1,142 @@
+"""
+Size-budgeted email attachments for the report emails
+Every report email goes out over the FLNG VSAT link, and SMTP base64-encodes binary parts
+(+33%, plus line breaks). This module decides what to attach within a per-message budget:
+- each attachment slot lists alternatives best-first (e.g. full Excel, then a PDF summary);
+  the first one that still fits the budget is used, so the summary is only generated and sent
+  when the full export is too large
+- the chosen files go in one zip bundle when deflate actually saves bytes (formats that are
+  already compressed, like xlsx, are stored, not recompressed)
+- the encoded size of every sent message is logged per report (report_traffic.log, /metrics)
+"""
+import os
+import zlib
+import zipfile
+import mimetypes
+from datetime import datetime
+from email import encoders
+from email.mime.base import MIMEBase
+
+import metrics
+import exportstore
+
+MESSAGE_BUDGET_BYTES = 4 * 1024 * 1024   # encoded attachment bytes per message
+MIN_ZIP_SAVING = 0.05                    # bundle only when zipping saves at least 5%
+ZIP_ENTRY_OVERHEAD = 100                 # local header + central directory record (+ 2x name)
+PRECOMPRESSED = {".xlsx", ".zip", ".gz", ".png", ".jpg", ".jpeg"}
+TRAFFIC_LOG = "report_traffic.log"
+
+
+def wire_size(n):
+    """Encoded bytes for an n-byte attachment: base64 in 76-character lines + CRLF"""
+    encoded = 4 * ((n + 2) // 3)
+    return encoded + 2 * ((encoded + 75) // 76)
+
+
+def _deflated_size(path):
+    z = zlib.compressobj(9, zlib.DEFLATED, -15)  # raw deflate, as stored in a zip entry
+    n = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            n += len(z.compress(chunk))
+    return n + len(z.flush())
+
+
+def _packed_size(path, name):
+    size = os.path.getsize(path)
+    if os.path.splitext(name)[1].lower() in PRECOMPRESSED:
+        return size
+    return min(size, _deflated_size(path))
+
+
+def plan(slots, bundle_name, budget=MESSAGE_BUDGET_BYTES):
+    """
+    Choose one alternative per slot and pack the result.
+    slots: [[(filename, path or callable returning a path), ...], ...] - slots in priority
+    order, alternatives best-first. Callables are only run when the previous alternative
+    did not fit. Returns a dict: files [(path, filename)], included, omitted, raw_bytes,
+    packed_bytes, temp (generated files the caller must delete).
+    """
+    chosen, omitted, temp = [], [], []
+    used = 0
+    for alternatives in slots:
+        for name, source in alternatives:
+            path = source() if callable(source) else source
+            if callable(source) and path:
+                temp.append(path)
+            if not path or not os.path.exists(path):
+                continue
+            size = _packed_size(path, name) + ZIP_ENTRY_OVERHEAD + 2 * len(name)
+            if wire_size(used + size) <= budget:
+                if not callable(source):
+                    exportstore.touch(path)  # an existing export reused for this email
+                chosen.append((path, name))
+                used += size
+                break
+        else:
+            omitted.append(alternatives[0][0])
+
+    raw = sum(os.path.getsize(p) for p, _ in chosen)
+    files = chosen
+    if chosen and used < raw * (1 - MIN_ZIP_SAVING):
+        bundle_path = exportstore.new_path("email_bundle", os.path.splitext(bundle_name)[0], "zip")
+        with zipfile.ZipFile(bundle_path, "w") as zf:
+            for path, name in chosen:
+                if os.path.splitext(name)[1].lower() in PRECOMPRESSED:
+                    zf.write(path, name, compress_type=zipfile.ZIP_STORED)
+                else:
+                    zf.write(path, name, compress_type=zipfile.ZIP_DEFLATED, compresslevel=9)
+        temp.append(bundle_path)
+        files = [(bundle_path, bundle_name)]
+    packed = sum(os.path.getsize(p) for p, _ in files)
+    return {"files": files, "included": [n for _, n in chosen], "omitted": omitted,
+            "raw_bytes": raw, "packed_bytes": packed, "temp": temp}
+
+
+def attach(message, packed):
+    """Add the planned files to a MIMEMultipart message; returns attached filenames"""
+    names = []
+    for path, name in packed["files"]:
+        ctype, _ = mimetypes.guess_type(name)
+        maintype, subtype = (ctype or 'application/octet-stream').split('/', 1)
+        with open(path, 'rb') as fp:
+            part = MIMEBase(maintype, subtype)
+            part.set_payload(fp.read())
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', 'attachment', filename=name)
+        message.attach(part)
+        names.append(name)
+    return names
+
+
+def describe(packed):
+    """Attachment section for the email body"""
+    lines = [f"{i}. {name}" for i, name in enumerate(packed["included"], 1)]
+    if len(packed["files"]) == 1 and packed["files"][0][1] not in packed["included"]:
+        lines.append(f"   (zipped as {packed['files'][0][1]}: {_kb(packed['raw_bytes'])} -> {_kb(packed['packed_bytes'])})")
+    for name in packed["omitted"]:
+        lines.append(f"- {name} NOT ATTACHED (over the {_kb(MESSAGE_BUDGET_BYTES)} email budget) - download it from the CCR app")
+    return "\n".join(lines)
+
+
+def _kb(n):
+    return f"{n / 1024:,.0f} KB"
+
+
+def cleanup(packed):
+    for path in packed["temp"]:
+        exportstore.discard(path)
+
+
+def record(report, recipients, packed, message_bytes):
+    """Log what one sent message cost on the link"""
+    metrics.add_bytes("report_email", report, message_bytes)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        with open(TRAFFIC_LOG, "a", encoding="utf-8") as log:
+            log.write(f"{timestamp} | {report} | {len(recipients)} recipients | {message_bytes} bytes sent | "
+                      f"attachments raw {packed['raw_bytes']} -> packed {packed['packed_bytes']} | "
+                      f"{', '.join(packed['included']) or '-'}"
+                      f"{' | omitted: ' + ', '.join(packed['omitted']) if packed['omitted'] else ''}\n")
+    except OSError as e:
+        print(f"⚠️ Could not write {TRAFFIC_LOG}: {str(e)}")
@@ -0,0 +1,279 @@
+"""
+Online backups of the override database (one folder per asset under BACKUP_DIR)
+SQLite's online backup API copies PAGES_PER_STEP pages at a time and pauses STEP_PAUSE between
+steps, so the source is only read-locked for one short step at a time. Writers keep going; a
+write from another connection makes SQLite restart the copy (counted as "restarts") - after
+MAX_RESTARTS the copy is redone in one step (one read transaction: under WAL writers still
+proceed, they just are not in this copy).
+Duration and the longest step (= longest lock hold) go to the manifest, the Admin Panel
+and /metrics. Each copy is written to a .partial file, switched out of WAL, checked with PRAGMA
+integrity_check and only then renamed into place. Rotation keeps the KEEP_RECENT newest copies
+plus the newest copy of each of the last KEEP_DAYS days.
+Restore takes a safety copy of the live database first, then copies the chosen backup back
+into it through the same API (other connections simply see a new version).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+import assets
+import metrics
+
+BACKUP_DIR = "backups"
+INTERVAL_HOURS = 6       # scheduled backup when the newest copy is older than this
+CHECK_SECONDS = 300
+PAGES_PER_STEP = 256     # 1 MB per step with 4 KB pages
+STEP_PAUSE = 0.02        # seconds between steps (writers get the database in between)
+MAX_RESTARTS = 3        # then finish in one step: a single read transaction (never blocks writers under WAL)
+KEEP_RECENT = 8
+KEEP_DAYS = 14
+MANIFEST = "manifest.json"
+STAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+_lock = threading.Lock()
+_thread = None
+
+
+class _KeepsRestarting(Exception):
+    pass
+
+
+def folder():
+    """Backup folder of the current asset"""
+    path = os.path.join(BACKUP_DIR, assets.slug(assets.current()))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _load_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path, manifest):
+    tmp = os.path.join(path, f"{MANIFEST}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def integrity(path):
+    """'ok' or the first problem reported by PRAGMA integrity_check"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# ======================
+# BACKUP
+# ======================
+def backup_now(db_path, label=""):
+    """Copy db_path into the current asset's folder. Returns the manifest entry (with 'file')."""
+    out_dir = folder()
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    stamp = datetime.now().strftime(STAMP_FORMAT)
+    name = f"{stem}_{stamp}{'_' + label if label else ''}.db"
+    n = 1
+    while os.path.exists(os.path.join(out_dir, name)):  # two copies within one second
+        n += 1
+        name = f"{stem}_{stamp}_{n}{'_' + label if label else ''}.db"
+    partial = os.path.join(out_dir, name + ".partial")
+    stats = {"steps": 0, "restarts": 0, "max_lock_ms": 0.0}
+    last = {"end": None, "remaining": None}
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        stats["steps"] += 1
+        stats["max_lock_ms"] = max(stats["max_lock_ms"], (now - last["end"]) * 1000)
+        if last["remaining"] is not None and remaining > last["remaining"]:
+            stats["restarts"] += 1  # source written by another connection -> SQLite starts over
+            if stats["restarts"] > MAX_RESTARTS:
+                raise _KeepsRestarting()
+        last["remaining"] = remaining
+        time.sleep(STEP_PAUSE)
+        last["end"] = time.perf_counter()
+
+    with _lock:
+        started = time.perf_counter()
+        src = sqlite3.connect(db_path, timeout=30)
+        dst = sqlite3.connect(partial)
+        try:
+            last["end"] = time.perf_counter()
+            try:
+                src.backup(dst, pages=PAGES_PER_STEP, progress=progress)
+            except _KeepsRestarting:
+                # Busy register: steps never catch up with the writes - copy in one step instead
+                step_start = time.perf_counter()
+                src.backup(dst)
+                stats["steps"] += 1
+                stats["max_lock_ms"] = max(stats["max_lock_ms"], (time.perf_counter() - step_start) * 1000)
+            dst.execute("PRAGMA journal_mode=DELETE")  # a standalone file, no -wal/-shm beside it
+        finally:
+            dst.close()
+            src.close()
+        duration = time.perf_counter() - started
+        metrics.observe("job", "database_backup", duration)
+        metrics.observe("db", "backup_longest_step", stats["max_lock_ms"] / 1000)  # source lock hold
+        check = integrity(partial)
+        if check != "ok":
+            os.remove(partial)
+            raise RuntimeError(f"integrity check failed on the copy: {check}")
+        final = os.path.join(out_dir, name)
+        os.replace(partial, final)
+
+        entry = {"taken_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                 "size": os.path.getsize(final), "duration_s": round(duration, 3),
+                 "max_lock_ms": round(stats["max_lock_ms"], 1), "steps": stats["steps"],
+                 "restarts": stats["restarts"], "integrity": check}
+        manifest = _load_manifest(out_dir)
+        manifest[name] = entry
+        removed = _rotate(out_dir, manifest)
+        _save_manifest(out_dir, manifest)
+    print(f"💾 Backup {name} ({assets.current()}): {entry['size'] / 1024 / 1024:.1f} MB in {duration:.2f} s, "
+          f"{stats['steps']} step(s), longest lock {entry['max_lock_ms']} ms"
+          + (f", {removed} old copy(ies) rotated out" if removed else ""))
+    return {"file": name, **entry}
+
+
+def _rotate(out_dir, manifest):
+    """Keep KEEP_RECENT newest + newest per day for KEEP_DAYS days (caller holds _lock)"""
+    files = sorted((f for f in os.listdir(out_dir) if f.endswith(".db")), reverse=True)  # names sort by time
+    keep = set(files[:KEEP_RECENT])
+    cutoff = (datetime.now() - timedelta(days=KEEP_DAYS)).strftime("%Y%m%d")
+    seen_days = set()
+    for f in files:
+        day = _stamp(f)[:8]
+        if day and day >= cutoff and day not in seen_days:
+            seen_days.add(day)
+            keep.add(f)
+    removed = 0
+    for f in files:
+        if f not in keep:
+            try:
+                os.remove(os.path.join(out_dir, f))
+                removed += 1
+            except OSError:
+                continue
+            manifest.pop(f, None)
+    for f in list(manifest):
+        if f not in files:
+            manifest.pop(f)
+    return removed
+
+
+def _stamp(filename):
+    parts = os.path.splitext(filename)[0].split("_")
+    for i in range(len(parts) - 1):
+        if len(parts[i]) == 8 and parts[i].isdigit() and len(parts[i + 1]) == 6 and parts[i + 1].isdigit():
+            return parts[i] + parts[i + 1]
+    return ""
+
+
+def list_backups():
+    """Admin Panel rows for the current asset, newest first"""
+    out_dir = folder()
+    manifest = _load_manifest(out_dir)
+    rows = []
+    for f in sorted((f for f in os.listdir(out_dir) if f.endswith(".db")), reverse=True):
+        m = manifest.get(f, {})
+        rows.append({"File": f, "Taken": m.get("taken_at", ""),
+                     "Size (MB)": round(os.path.getsize(os.path.join(out_dir, f)) / 1024 / 1024, 2),
+                     "Duration (s)": m.get("duration_s", ""), "Longest lock (ms)": m.get("max_lock_ms", ""),
+                     "Steps": m.get("steps", ""), "Restarts": m.get("restarts", ""),
+                     "Integrity": m.get("integrity", "")})
+    return rows
+
+
+def newest_age_hours():
+    files = sorted((f for f in os.listdir(folder()) if f.endswith(".db")), reverse=True)
+    if not files:
+        return None
+    return (time.time() - os.path.getmtime(os.path.join(folder(), files[0]))) / 3600
+
+
+# ======================
+# RESTORE
+# ======================
+def restore(db_path, filename, after_copy=None):
+    """
+    Replace the live database content with a backup of the current asset.
+    The backup is first copied to a staging file and after_copy(conn) runs there (overrides uses
+    it to move the change feed on); only then is the prepared copy put over the live database,
+    in one step. If anything before that step fails, the live database is unchanged.
+    Returns (safety copy name, seconds).
+    """
+    source = os.path.join(folder(), os.path.basename(filename))
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"backup {filename} not found")
+    check = integrity(source)
+    if check != "ok":
+        raise RuntimeError(f"backup {filename} fails the integrity check: {check}")
+    safety = backup_now(db_path, label="pre_restore")
+    staging_path = f"{db_path}.restoring"
+    with _lock:
+        started = time.perf_counter()
+        src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        staging = sqlite3.connect(staging_path)
+        try:
+            src.backup(staging)
+            if after_copy is not None:
+                after_copy(staging)
+                staging.commit()
+            dst = sqlite3.connect(db_path, timeout=30)
+            try:
+                staging.backup(dst)  # one step: writers wait for the (short) copy, readers see old or new
+                dst.execute("PRAGMA journal_mode=WAL")
+            finally:
+                dst.close()
+        finally:
+            staging.close()
+            src.close()
+            for leftover in (staging_path, f"{staging_path}-wal", f"{staging_path}-shm", f"{staging_path}-journal"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+    seconds = time.perf_counter() - started
+    print(f"♻️ Restored {filename} into {db_path} ({assets.current()}) in {seconds:.2f} s "
+          f"(previous content saved as {safety['file']})")
+    return safety["file"], seconds
+
+
+# ======================
+# SCHEDULE
+# ======================
+def start(db_path_fn, job=None):
+    """Daemon thread: every CHECK_SECONDS back up each asset whose newest copy is older than
+    INTERVAL_HOURS (idempotent). db_path_fn() gives the current asset's database."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    def due():
+        for name in assets.names():
+            with assets.using(name):
+                age = newest_age_hours()
+                if age is None or age >= INTERVAL_HOURS:
+                    try:
+                        backup_now(db_path_fn())
+                    except Exception as e:
+                        print(f"❌ Scheduled backup failed ({name}): {str(e)}")
+
+    run_due = job(due) if job else due
+
+    def run():
+        while True:
+            run_due()
+            time.sleep(CHECK_SECONDS)
+
+    _thread = threading.Thread(target=run, name="db-backup", daemon=True)
+    _thread.start()
+    print(f"💾 Database backups every {INTERVAL_HOURS} h into {BACKUP_DIR}/ "
+          f"(keep {KEEP_RECENT} newest + 1/day for {KEEP_DAYS} days)")
+    return _thread
@@ -0,0 +1,352 @@
+"""
+Benchmark suite for the CCR Override Register + Shutdown Log
+Generates a synthetic register / shutdown log of realistic shape, times the hot paths
+and saves the results as JSON so runs can be compared.
+
+Usage:
+    python benchmark.py --rows 10000
+    python benchmark.py --rows 100000 --events 20000 --compare bench_results/<previous>.json
+    python benchmark.py --generate-only --rows 50000 --workdir ./synthetic   # data only
+
+All data lives in a scratch directory - the real fgs_overrides.db / shutdown.json are never touched.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+
+# ======================
+# SYNTHETIC DATA GENERATOR
+# ======================
+# FGS/ESD tag prefixes seen on the register (module + device type)
+TAG_PREFIXES = ["77ATFZP01", "77ATFZP02", "77ATFZLPG1", "36S", "41GD", "52FD", "63HD", "71ESD", "82PSD", "90FZ"]
+DEVICES = ["gas detector", "flame detector", "heat detector", "smoke detector", "level transmitter",
+           "pressure transmitter", "ESD valve", "deluge valve", "manual call point", "beacon"]
+AREAS = ["P01 flare vent header", "LPG storage", "turret area", "liquefaction train", "compressor deck",
+         "power generation module", "accommodation HVAC", "condensate stabilisation", "seawater lift", "cargo tank"]
+REASONS = ["bypass (forced in logic)", "inhibited for maintenance", "override during calibration",
+           "bypass - faulty reading", "suppressed during hot work", "forced healthy pending replacement"]
+STATUS_TEXT = ["risk assessment ongoing", "MOS active - fire watch in place", "waiting spare parts",
+               "vendor troubleshooting", "second event - risk assessment ongoing", "permit to work issued",
+               "awaiting shutdown window", "compensating measures verified by OIM"]
+REQUESTERS = ["OIM", "CCR Supervisor", "Instrument Team", "Production Supervisor", "HSE Advisor",
+              "Maintenance Lead", "CSU INST", "Mechanical Team"]
+PRIORITIES = [("critical", 0.45), ("high", 0.3), ("medium", 0.18), ("low", 0.07)]
+
+
+def _weighted(rng, pairs):
+    r = rng.random()
+    acc = 0.0
+    for value, weight in pairs:
+        acc += weight
+        if r <= acc:
+            return value
+    return pairs[-1][0]
+
+
+def _sentence(rng, min_words, max_words):
+    words = []
+    pool = (AREAS + DEVICES + STATUS_TEXT + REASONS)
+    while len(words) < rng.randint(min_words, max_words):
+        words.extend(rng.choice(pool).split())
+    return " ".join(words)
+
+
+def generate_override_rows(n, seed=42):
+    """Yield n override rows as tuples in DB column order (entry_no ... removal_requested_by)"""
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    for entry_no in range(1, n + 1):
+        on = start + datetime.timedelta(minutes=entry_no * 7 + rng.randint(0, 300))
+        approved = "YES" if rng.random() < 0.85 else "NO"
+        closed = "YES" if approved == "YES" and rng.random() < 0.8 else "NO"
+        off = on + datetime.timedelta(hours=rng.randint(1, 24 * 60))
+        tag = f"{rng.choice(TAG_PREFIXES)}-{rng.randint(1, 999):03d}"
+        yield (
+            entry_no, approved, closed,
+            on.strftime("%m/%d/%y %H:%M"),
+            tag,
+            f"{rng.choice(AREAS)} {rng.choice(DEVICES)} {rng.choice(REASONS)}",
+            rng.choice(["FGS bypass", "ESD bypass", "PSD inhibit", ""]),
+            rng.choice(["MOS active", "", "Fire watch", "Permit"]),
+            _weighted(rng, PRIORITIES),
+            _sentence(rng, 3, 30),
+            on.strftime("%m/%d/%y"),
+            rng.choice(REQUESTERS),
+            off.strftime("%m/%d/%y") if closed == "YES" else "",
+            rng.choice(REQUESTERS) if closed == "YES" else "",
+        )
+
+
+def generate_override_db(db_path, n, seed=42):
+    """Create a fresh override database with n synthetic rows (same schema as init_database)"""
+    import overrides
+    import archive
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    overrides.DB_PATH = db_path
+    overrides.EXCEL_PATH = os.path.join(os.path.dirname(db_path), "__no_seed_excel__.xlsx")
+    overrides.init_database()
+    conn = sqlite3.connect(db_path)
+    archive.ensure_schema(conn)
+    conn.execute("DELETE FROM overrides")
+    conn.executemany('''
+        INSERT INTO overrides (
+            entry_no, approved, closed, time_in, module_parameter, description, alarm, message,
+            priority, status, date_on, requested_by, date_off, removal_requested_by
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', generate_override_rows(n, seed))
+    conn.commit()
+    conn.close()
+
+
+def generate_shutdown_events(n, seed=7):
+    """Return n shutdown events using the real classification tree (GENUINE/SPURIOUS mix ~ 35/65)"""
+    import shutdown_log
+    rng = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    events = []
+    for i in range(1, n + 1):
+        classification = "GENUINE" if rng.random() < 0.35 else "SPURIOUS"
+        cluster = rng.choice(shutdown_log.MAIN_CLUSTER_OPTIONS[classification])
+        sub = rng.choice(shutdown_log.SUBCLUSTER_OPTIONS.get(f"{classification}|{cluster}", ["TBD"]))
+        ts = start + datetime.timedelta(hours=i * 3 + rng.randint(0, 2))
+        events.append({
+            'ID': i,
+            'timestamp': ts.strftime("%Y-%m-%d %H:%M:%S"),
+            **shutdown_log.fixed_fields(),
+            'Event Type': "ESD" if rng.random() < 0.2 else "PSD",
+            'Event Classification': classification,
+            'Main Cluster': cluster,
+            'Subcluster': sub,
+            'Technical Details/Event Description': _sentence(rng, 15, 120),
+            'First Cause': f"{rng.choice(TAG_PREFIXES)}-{rng.choice(DEVICES)} {rng.choice(['trip', 'voting trip', 'high-high', 'low-low', 'fault'])}",
+            'RCA': "Pending" if rng.random() < 0.4 else _sentence(rng, 10, 60),
+            'Actions': "Pending" if rng.random() < 0.3 else _sentence(rng, 5, 40),
+            'Action by': rng.choice(REQUESTERS),
+            'Reported by': rng.choice(REQUESTERS),
+        })
+    return events
+
+
+def generate_import_workbook(path, n, start_no, seed=11):
+    """Write an .xlsx in the import template layout (13 title rows, then header + rows)"""
+    import pandas as pd
+    cols = ['No', 'Approved', 'Closed', 'Time In', 'Module Parameter', 'Description', 'Alarm', 'Message',
+            'Priority', 'Status', 'Date On', 'Requested By', 'Date Off', 'Removal Requested By']
+    rows = [(r[0] + start_no,) + r[1:] for r in generate_override_rows(n, seed)]
+    df = pd.DataFrame(rows, columns=cols)
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        pd.DataFrame([["SYNTHETIC IMPORT"]] + [[""]] * 12).to_excel(writer, index=False, header=False)
+        df.to_excel(writer, startrow=13, index=False)
+
+# ======================
+# TIMING HELPERS
+# ======================
+def _cleanup(result):
+    """Delete export files produced by a benchmarked call (the export store points into the workdir)"""
+    import exportstore
+    store = os.path.abspath(exportstore.EXPORT_DIR) + os.sep
+    paths = result if isinstance(result, (tuple, list)) else [result]
+    for p in paths:
+        if isinstance(p, str) and os.path.abspath(p).startswith(store) and os.path.isfile(p):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+def time_call(name, fn, repeat, results, setup=None):
+    """Run fn `repeat` times (+1 traced run for peak memory) and record stats"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t = time.perf_counter()
+        out = fn()
+        samples.append(time.perf_counter() - t)
+        _cleanup(out)
+    if setup:
+        setup()
+    tracemalloc.start()
+    out = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    _cleanup(out)
+    results[name] = {
+        "runs": repeat,
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "min_ms": round(min(samples) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+        "peak_alloc_mb": round(peak / 1e6, 2),
+    }
+    print(f"  {name:<44} median {results[name]['median_ms']:>10.1f} ms   peak {results[name]['peak_alloc_mb']:>8.1f} MB")
+
+
+def measure_import_time():
+    """Cold `import app` in a fresh interpreter (what every restart pays)"""
+    code = "import time; t=time.perf_counter(); import app; print(time.perf_counter()-t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return round(float(out.stdout.strip().splitlines()[-1]) * 1000, 1)
+    except (ValueError, IndexError):
+        return None
+
+
+def _max_rss_mb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(rss / (1e6 if sys.platform == "darwin" else 1e3), 1)
+    except ImportError:  # Windows
+        return None
+
+# ======================
+# BENCHMARK RUN
+# ======================
+def run(args):
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="ccr_bench_"))
+    os.makedirs(workdir, exist_ok=True)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import overrides
+    import shutdown_log
+    import exportstore
+
+    db_path = os.path.join(workdir, "fgs_overrides.db")
+    shutdown_path = os.path.join(workdir, "shutdown.json")
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rows": args.rows,
+        "events": args.events,
+        "repeat": args.repeat,
+        "import_app_ms": None,
+        "generate": {},
+        "results": {},
+    }
+
+    print(f"📦 Generating {args.rows:,} overrides + {args.events:,} shutdown events in {workdir}")
+    t = time.perf_counter()
+    generate_override_db(db_path, args.rows)
+    report["generate"]["overrides_s"] = round(time.perf_counter() - t, 2)
+    t = time.perf_counter()
+    with open(shutdown_path, "w") as f:
+        json.dump(generate_shutdown_events(args.events), f, indent=2)
+    report["generate"]["shutdown_s"] = round(time.perf_counter() - t, 2)
+    report["generate"]["db_mb"] = round(os.path.getsize(db_path) / 1e6, 2)
+    report["generate"]["shutdown_json_mb"] = round(os.path.getsize(shutdown_path) / 1e6, 2)
+    if args.generate_only:
+        print(f"✅ Data written to {workdir}")
+        return report
+
+    overrides.DB_PATH = db_path
+    shutdown_log.SHUTDOWN_FILE = shutdown_path
+    exportstore.EXPORT_DIR = os.path.join(workdir, "exports")  # never the app's real export store
+    results = report["results"]
+    r = args.repeat
+
+    print("⏱️  Override register")
+    full_df = overrides.get_filtered_data({})
+    time_call("get_filtered_data (no filter)", lambda: overrides.get_filtered_data({}), r, results)
+    time_call("get_filtered_data (tag prefix)", lambda: overrides.get_filtered_data({"Module Parameter": "77ATFZ"}), r, results)
+    time_call("get_filtered_data (3 filters)", lambda: overrides.get_filtered_data(
+        {"Closed": "NO", "Priority": "critical", "Description": "gas"}), r, results)
+    time_call("get_filtered_data (include archive)", lambda: overrides.get_filtered_data(
+        {"Module Parameter": "77ATFZ"}, include_archive=True), r, results)
+    time_call("style_dataframe_for_display (full)",
+              # Styler is lazy - _compute() applies the row styles like a render would
+              lambda: overrides.style_dataframe_for_display(full_df)._compute(), r, results)
+    pdf_df = full_df.head(args.pdf_rows)
+    time_call(f"print_current_table_to_pdf ({len(pdf_df)} rows)",
+              lambda: overrides.print_current_table_to_pdf(pdf_df, "admin"), r, results)
+    time_call("export_entire_database", lambda: overrides.export_entire_database("admin"), r, results)
+
+    import_rows = min(args.rows, args.import_rows)
+    xlsx_path = os.path.join(workdir, "import.xlsx")
+    generate_import_workbook(xlsx_path, import_rows, start_no=args.rows)
+
+    def reset_import():
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM overrides WHERE entry_no > ?", (args.rows,))
+        conn.commit()
+        conn.close()
+    time_call(f"import_excel_data ({import_rows} rows)",
+              lambda: overrides.import_excel_data(xlsx_path, "admin"), r, results, setup=reset_import)
+
+    print("⏱️  Shutdown log")
+    time_call("load_shutdown_events", shutdown_log.load_shutdown_events, r, results)
+    time_call("get_filtered_shutdowns (no filter)", lambda: shutdown_log.get_filtered_shutdowns({}), r, results)
+    time_call("get_filtered_shutdowns (2 filters)", lambda: shutdown_log.get_filtered_shutdowns(
+        {"Event Classification": "SPURIOUS", "First Cause": "trip"}), r, results)
+    time_call("export_shutdown_excel", shutdown_log.export_shutdown_excel, r, results)
+
+    report["import_app_ms"] = measure_import_time()
+    report["max_rss_mb"] = _max_rss_mb()
+    print(f"  {'import app (cold, fresh interpreter)':<44} {report['import_app_ms']} ms")
+    print(f"  {'process max RSS':<44} {report['max_rss_mb']} MB")
+
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def compare(current, previous_path):
+    """Print median deltas against a previous results file"""
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\n📊 Comparison with {previous_path} ({previous.get('rows')} rows)")
+    for name, cur in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old:
+            print(f"  {name:<44} (new)")
+            continue
+        delta = (cur["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0
+        print(f"  {name:<44} {old['median_ms']:>10.1f} → {cur['median_ms']:>10.1f} ms  ({delta:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CCR register benchmark suite")
+    parser.add_argument("--rows", type=int, default=10000, help="synthetic override rows (10k-500k)")
+    parser.add_argument("--events", type=int, default=None, help="synthetic shutdown events (default rows/10)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pdf-rows", type=int, default=2000, help="rows in the 'current view' PDF")
+    parser.add_argument("--import-rows", type=int, default=5000, help="rows in the import workbook")
+    parser.add_argument("--workdir", default=None, help="scratch directory (default: temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated data")
+    parser.add_argument("--generate-only", action="store_true", help="only write the synthetic data")
+    parser.add_argument("--output", default=None, help="results JSON path (default bench_results/<ts>.json)")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    args = parser.parse_args()
+    if args.events is None:
+        args.events = max(100, args.rows // 10)
+    if args.generate_only:
+        args.keep = True
+
+    report = run(args)
+    if args.generate_only:
+        return
+
+    out = args.output or os.path.join("bench_results", f"bench_{args.rows}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results saved to {out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
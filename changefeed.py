@@ -0,0 +1,247 @@
+"""
+Cheap change feed for the override register and the shutdown log
+Open CCR screens poll a data version (or listen on /changes/stream) and only re-fetch the rows
+that changed, instead of re-querying the whole table every few seconds.
+
+Override register: triggers append (seq, entry_no, op) to override_changes; the version is
+MAX(seq), re-read only when SQLite's PRAGMA data_version on a long-lived watcher connection
+reports a commit from another connection - so an idle poll costs one pragma, not a query.
+Shutdown log: in-process write counter + file mtime check (catches edits from other processes).
+One feed per asset partition (see assets.py); the HTTP endpoints take ?asset=<name>.
+"""
+import os
+import json
+import sqlite3
+import asyncio
+import threading
+import assets
+
+RETAIN_CHANGES = 20000  # rows kept in override_changes (older pollers get a full refresh)
+
+
+# ======================
+# OVERRIDE REGISTER FEED (SQLite)
+# ======================
+def ensure_schema(conn):
+    """Change table + triggers (idempotent)"""
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS override_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_no INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_overrides_changes_ins AFTER INSERT ON overrides
+        BEGIN INSERT INTO override_changes (entry_no, op) VALUES (NEW.entry_no, 'I'); END;
+        CREATE TRIGGER IF NOT EXISTS trg_overrides_changes_upd AFTER UPDATE ON overrides
+        BEGIN INSERT INTO override_changes (entry_no, op) VALUES (NEW.entry_no, 'U'); END;
+        CREATE TRIGGER IF NOT EXISTS trg_overrides_changes_del AFTER DELETE ON overrides
+        BEGIN INSERT INTO override_changes (entry_no, op) VALUES (OLD.entry_no, 'D'); END;
+    ''')
+    conn.commit()
+
+
+def version_of(conn):
+    """Register version as conn sees it (inside a read transaction: the version of that snapshot)"""
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM override_changes").fetchone()[0]
+
+
+class OverrideFeed:
+    def __init__(self):
+        self.db_path = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._version = 0
+
+    def attach(self, db_path):
+        """Open the watcher connection (called from overrides.startup)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+            self.db_path = db_path
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            ensure_schema(self._conn)
+            self._data_version = None
+
+    def version(self):
+        """Current register version - one PRAGMA when nothing changed"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            dv = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if dv != self._data_version:
+                self._data_version = dv
+                self._version = version_of(self._conn)
+            return self._version
+
+    def changes_since(self, since):
+        """Return (version, changed_entry_nos, deleted_entry_nos, full_refresh)"""
+        current = self.version()
+        if since is None or since >= current:
+            return current, [], [], since is None
+        with self._lock:
+            oldest = self._conn.execute("SELECT COALESCE(MIN(seq), 0) FROM override_changes").fetchone()[0]
+            if since < oldest - 1:
+                return current, [], [], True  # history pruned past this client
+            rows = self._conn.execute(
+                "SELECT entry_no, op FROM override_changes WHERE seq > ? AND seq <= ? ORDER BY seq",
+                (since, current)
+            ).fetchall()
+        last_op = {}
+        for entry_no, op in rows:
+            last_op[entry_no] = op
+        changed = [n for n, op in last_op.items() if op != 'D']
+        deleted = [n for n, op in last_op.items() if op == 'D']
+        return current, changed, deleted, False
+
+    def prune(self):
+        """Bound the change table (run from the writer side occasionally)"""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM override_changes WHERE seq <= (SELECT MAX(seq) FROM override_changes) - ?",
+                (RETAIN_CHANGES,)
+            )
+            self._conn.commit()
+
+
+def rebase(conn, floor):
+    """After a restore: restart the change log above `floor` (the pre-restore version) so every
+    open screen and poller does a full refresh (caller commits)"""
+    conn.execute("DELETE FROM override_changes")
+    if not conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'override_changes'", (floor + 1,)).rowcount:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('override_changes', ?)", (floor + 1,))
+    conn.execute("INSERT INTO override_changes (entry_no, op) VALUES (0, 'R')")
+
+
+overrides_feed = assets.PerAsset(OverrideFeed)
+
+
+# ======================
+# SHUTDOWN LOG FEED (JSON file)
+# ======================
+class ShutdownFeed:
+    def __init__(self):
+        self.path = None
+        self._lock = threading.Lock()
+        self._version = 0
+        self._mtime = None
+        self._changed = {}  # event ID -> version of its last write
+        self._full_refresh_at = 0  # version of the last write with an unknown change set
+
+    def attach(self, path):
+        self.path = path
+        self._mtime = self._stat()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    def mark_written(self, changed_ids=None):
+        """Called after every successful save_shutdown_events()"""
+        with self._lock:
+            self._version += 1
+            self._mtime = self._stat()
+            for event_id in changed_ids or []:
+                self._changed[event_id] = self._version
+            if changed_ids is None:
+                self._changed.clear()  # unknown change set -> clients do a full refresh
+                self._full_refresh_at = self._version
+
+    def version(self):
+        """Write counter; an mtime change we did not cause counts as a full-refresh write"""
+        mtime = self._stat()
+        if mtime != self._mtime:
+            self.mark_written(None)
+        return self._version
+
+    def fingerprint(self):
+        """Version that survives restarts (the write counter alone starts at 0 in every process)"""
+        version = self.version()
+        return f"{self._mtime or 0:x}-{version}"
+
+    def changes_since(self, since):
+        """Return (version, changed_ids, full_refresh)"""
+        current = self.version()
+        if since is None or since >= current:
+            return current, [], since is None
+        with self._lock:
+            if since < self._full_refresh_at:
+                return current, [], True
+            return current, [i for i, v in self._changed.items() if v > since], False
+
+
+shutdown_feed = assets.PerAsset(ShutdownFeed)
+
+
+# ======================
+# HTTP ENDPOINTS (polling + Server-Sent Events)
+# ======================
+def versions():
+    return {"overrides": overrides_feed.version(), "shutdowns": shutdown_feed.version()}
+
+
+def routes():
+    """/changes/version (poll), /changes/overrides?since=N, /changes/shutdowns?since=N, /changes/stream (SSE)
+    - all take ?asset=<name> (default: the first asset)"""
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+    from starlette.exceptions import HTTPException
+
+    def asset_of(request):
+        try:
+            return assets.from_request(request)
+        except ValueError as e:
+            raise HTTPException(404, str(e))
+
+    async def version_endpoint(request):
+        with assets.using(asset_of(request)):
+            body = versions()
+        etag = f'"{body["overrides"]}-{body["shutdowns"]}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(body, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    def _since(request):
+        try:
+            return int(request.query_params.get("since"))
+        except (TypeError, ValueError):
+            return None
+
+    async def overrides_changes(request):
+        with assets.using(asset_of(request)):
+            version, changed, deleted, full = overrides_feed.changes_since(_since(request))
+        return JSONResponse({"version": version, "changed": changed, "deleted": deleted, "full_refresh": full})
+
+    async def shutdown_changes(request):
+        with assets.using(asset_of(request)):
+            version, changed, full = shutdown_feed.changes_since(_since(request))
+        return JSONResponse({"version": version, "changed": changed, "full_refresh": full})
+
+    async def stream(request):
+        asset = asset_of(request)
+
+        async def events():
+            last = None
+            while not await request.is_disconnected():
+                with assets.using(asset):
+                    current = versions()
+                if current != last:
+                    last = current
+                    yield f"event: version\ndata: {json.dumps(current)}\n\n"
+                else:
+                    yield ": keep-alive\n\n"
+                await asyncio.sleep(2)
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    return [
+        Route("/changes/version", version_endpoint, methods=["GET"]),
+        Route("/changes/overrides", overrides_changes, methods=["GET"]),
+        Route("/changes/shutdowns", shutdown_changes, methods=["GET"]),
+        Route("/changes/stream", stream, methods=["GET"]),
+    ]
@@ -0,0 +1,213 @@
+"""
+Multi-worker mode: several app processes on one host sharing the same data files
+  - scheduler leader: a lease row in CLUSTER_DB, renewed every RENEW_SECONDS by the holder.
+    Only the leader starts the email schedulers; when it dies the lease expires after
+    LEASE_SECONDS and the next worker to renew takes over (a clean exit releases it at once).
+  - claim(): run-once record per (job, slot) in the same database, so a report is sent once
+    per schedule slot even across a failover (replaces the per-process LAST_SENT_TRACKER).
+  - file_lock(): cross-process lock for load-modify-save on the shutdown JSON files.
+A single process is simply a one-worker cluster: it wins the lease on its first attempt.
+"""
+import atexit
+import contextlib
+import functools
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+CLUSTER_DB = "cluster.db"
+LEASE_NAME = "scheduler"
+LEASE_SECONDS = 30   # a dead leader is replaced after at most this long
+RENEW_SECONDS = 10
+CLAIM_RETENTION_DAYS = 30
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_lock = threading.Lock()
+_leader_until = 0.0   # monotonic deadline of our lease (0 = not leader)
+_elected = []         # [(name, fn)] started the first time this worker becomes leader
+_started = set()
+_thread = None
+
+
+def _connect():
+    conn = sqlite3.connect(CLUSTER_DB, timeout=10, isolation_level=None)
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            holder TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS job_runs (
+            job TEXT NOT NULL,
+            slot TEXT NOT NULL,
+            holder TEXT NOT NULL,
+            claimed_at TEXT NOT NULL,
+            PRIMARY KEY (job, slot)
+        );
+    ''')
+    return conn
+
+
+# ======================
+# LEADER LEASE
+# ======================
+def _try_lease():
+    """Take or renew the lease (one IMMEDIATE transaction). True if this worker holds it."""
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (LEASE_NAME,)).fetchone()
+        if row is None or row[0] == WORKER_ID or row[1] < now:
+            conn.execute("INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?, ?, ?)",
+                         (LEASE_NAME, WORKER_ID, now + LEASE_SECONDS))
+            conn.execute("COMMIT")
+            if row is not None and row[0] != WORKER_ID:
+                print(f"👑 Scheduler leadership taken over from {row[0]} (lease expired)")
+            return True
+        conn.execute("ROLLBACK")
+        return False
+    finally:
+        conn.close()
+
+
+def _renew():
+    """One election round; starts the leader-only services on (first) election"""
+    global _leader_until
+    started = time.monotonic()
+    try:
+        won = _try_lease()
+    except sqlite3.Error as e:
+        print(f"⚠️ Scheduler lease error: {str(e)}")
+        won = False
+    with _lock:
+        was_leader = is_leader()
+        # Keep a safety margin: stop acting as leader one renew period before the lease can expire
+        _leader_until = started + LEASE_SECONDS - RENEW_SECONDS if won else 0.0
+        pending = [(n, fn) for n, fn in _elected if n not in _started] if won else []
+        _started.update(n for n, _ in pending)
+    if was_leader and not won:
+        print(f"⚠️ Scheduler leadership lost ({WORKER_ID}) - jobs paused on this worker")
+    for name, fn in pending:
+        try:
+            fn()
+        except Exception as e:
+            print(f"❌ {name} failed to start on the leader: {str(e)}")
+
+
+def is_leader():
+    return time.monotonic() < _leader_until
+
+
+def leader():
+    """Current lease holder (worker id) or None"""
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (LEASE_NAME,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row and row[1] >= time.time() else None
+
+
+def _release():
+    global _leader_until
+    _leader_until = 0.0
+    try:
+        conn = _connect()
+        conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (LEASE_NAME, WORKER_ID))
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def start_election():
+    """Join the election (idempotent): first round now, then a renew thread"""
+    global _thread
+    with _lock:
+        if _thread is not None:
+            return
+        _thread = threading.Thread(target=_run, name="scheduler-lease", daemon=True)
+    _renew()
+    _thread.start()
+    atexit.register(_release)
+
+
+def _run():
+    while True:
+        time.sleep(RENEW_SECONDS)
+        _renew()
+
+
+def when_leader(name, fn):
+    """Start fn (a scheduler) now if this worker leads, otherwise as soon as it is elected"""
+    start_election()
+    with _lock:
+        _elected.append((name, fn))
+        run_now = is_leader() and name not in _started
+        if run_now:
+            _started.add(name)
+    if run_now:
+        fn()
+    else:
+        print(f"⏸️ {name} on standby - leader is {leader() or 'being elected'} ({WORKER_ID})")
+
+
+def leader_only(fn):
+    """Job wrapper: skip the run on a worker that is not (or no longer) the leader"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_leader():
+            print(f"⏸️ Skipped {fn.__name__}: {WORKER_ID} is not the scheduler leader")
+            return None
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+# ======================
+# RUN-ONCE CLAIMS
+# ======================
+def claim(job, slot):
+    """True for the first worker claiming (job, slot), False if it already ran"""
+    conn = _connect()
+    try:
+        cur = conn.execute("INSERT OR IGNORE INTO job_runs (job, slot, holder, claimed_at) VALUES (?, ?, ?, ?)",
+                           (job, slot, WORKER_ID, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        if cur.rowcount:
+            cutoff = (datetime.now() - timedelta(days=CLAIM_RETENTION_DAYS)).strftime("%Y-%m-%d %H:%M:%S")
+            conn.execute("DELETE FROM job_runs WHERE claimed_at < ?", (cutoff,))
+        return cur.rowcount == 1
+    finally:
+        conn.close()
+
+
+# ======================
+# CROSS-PROCESS FILE LOCK
+# ======================
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive lock on <path>.lock, held across processes for the duration of the block"""
+    with open(f"{path}.lock", "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10 s, then raises
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,82 @@
+"""
+Analytics page (mounted as the "Analytics" route by app.py)
+Shutdown log: event counts per week / month by type, classification and cluster, and a Pareto
+of subclusters - read from the incrementally maintained counters in aggregates.py, so the page
+costs the same however long the log gets. Shows the asset picked in the selector.
+"""
+import gradio as gr
+from startup import lazy_import
+import metrics
+import changefeed
+import aggregates
+import shutdown_log
+import assets
+
+pd = lazy_import("pandas")
+
+REFRESH_SECONDS = 30   # open dashboards re-read the counters only when the data version moved
+PARETO_LABEL = 40      # subcluster characters shown on the chart axis
+
+SERIES_COLUMNS = ["Period", "Category", "Events"]
+PARETO_COLUMNS = ["Subcluster", "Main Cluster", "Events", "Share %", "Cumulative %"]
+
+
+def shutdown_dashboard(period, dimension):
+    """Summary, counts over time, Pareto chart data, Pareto table, data version"""
+    version = changefeed.shutdown_feed.version()
+    stats, load = shutdown_log.shutdown_stats, shutdown_log.load_shutdown_events
+    series = pd.DataFrame(stats.over_time(period, dimension, version, load), columns=SERIES_COLUMNS)
+    pareto = pd.DataFrame(stats.pareto(version, load), columns=PARETO_COLUMNS)
+    chart = pareto.assign(Label=[s if len(s) <= PARETO_LABEL else s[:PARETO_LABEL - 1] + "…"
+                                 for s in pareto["Subcluster"]])
+    types = stats.totals('Event Type', version, load)
+    classes = stats.totals('Event Classification', version, load)
+    summary = (f"### {sum(types.values())} shutdown events\n"
+               f"**By type:** {' · '.join(f'{k} {v}' for k, v in types.items()) or '-'}  \n"
+               f"**By classification:** {' · '.join(f'{k} {v}' for k, v in classes.items()) or '-'}")
+    return summary, series, chart, pareto, version
+
+
+def build_demo():
+    """Build the Analytics page (call shutdown_log.startup() first)"""
+    with gr.Blocks(title="📊 Analytics") as demo:
+        with gr.Row():
+            assets.selector(demo)
+        with gr.Tabs():
+            with gr.Tab("🛑 Shutdown Events"):
+                with gr.Row():
+                    sd_period = gr.Radio([("Week", "week"), ("Month", "month")], value="month", label="Period")
+                    sd_dimension = gr.Dropdown(list(aggregates.DIMENSIONS), value=aggregates.DIMENSIONS[0],
+                                               label="Break down by", interactive=True)
+                    sd_refresh_btn = gr.Button("🔄 Refresh", variant="secondary")
+                sd_summary = gr.Markdown()
+                sd_series_plot = gr.BarPlot(x="Period", y="Events", color="Category",
+                                            title="Shutdown events over time", height=320)
+                sd_pareto_plot = gr.BarPlot(x="Label", y="Events", sort="-y", x_label_angle=-30,
+                                            title="Pareto of subclusters", x_title="Subcluster", height=360)
+                sd_pareto_table = gr.Dataframe(headers=PARETO_COLUMNS, interactive=False, wrap=True,
+                                               label="Subcluster Pareto")
+                sd_version_state = gr.State(None)
+                sd_timer = gr.Timer(REFRESH_SECONDS)
+
+        sd_outputs = [sd_summary, sd_series_plot, sd_pareto_plot, sd_pareto_table, sd_version_state]
+
+        def poll_shutdown_dashboard(known_version, period, dimension):
+            if changefeed.shutdown_feed.version() == known_version:
+                return gr.skip()
+            return shutdown_dashboard(period, dimension)
+
+        gr.on(
+            triggers=[demo.load, sd_refresh_btn.click, sd_period.change, sd_dimension.change],
+            fn=metrics.instrument(shutdown_dashboard),
+            inputs=[sd_period, sd_dimension],
+            outputs=sd_outputs
+        )
+        sd_timer.tick(
+            metrics.instrument(poll_shutdown_dashboard),
+            inputs=[sd_version_state, sd_period, sd_dimension],
+            outputs=sd_outputs,
+            queue=False,
+            show_progress="hidden"
+        )
+    return assets.scope_handlers(demo)
@@ -0,0 +1,88 @@
+"""
+HTML digest body for the scheduled report emails
+The plain-text note is kept as the text/plain alternative; the text/html alternative adds
+compact inline tables (open / pending overrides, shift changes, longest open bypasses, recent
+shutdown events) so a report can be read on a phone without opening any attachment. The data
+comes from what the report already holds or from the cached aggregates (exposure cache,
+shutdown counters); the Jinja2 template is compiled once per process.
+Attachments are optional: with ATTACH_EXPORTS off (CCR_REPORT_ATTACHMENTS=0) the scheduled
+emails carry the digest only and the exports stay on demand in the app.
+"""
+import os
+import threading
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+ATTACH_EXPORTS = os.environ.get("CCR_REPORT_ATTACHMENTS", "1").strip().lower() not in ("0", "no", "false", "off")
+TABLE_ROWS = 15    # rows per inline table; the rest is counted ("15 of 42")
+CELL_CHARS = 90    # free-text cells are cut to this length
+
+_TEMPLATE = """<!DOCTYPE html>
+<html><body style="margin:0;padding:8px;font-family:Arial,Helvetica,sans-serif;font-size:13px;color:#222">
+<div style="background:#1f4e79;color:#fff;padding:10px 12px;border-radius:4px">
+<div style="font-size:16px;font-weight:bold">{{ title }}</div>
+<div style="font-size:12px;opacity:.9">{{ subtitle }}</div></div>
+{% if stats %}<table role="presentation" style="border-collapse:collapse;margin:10px 0"><tr>
+{% for label, value in stats %}<td style="padding:6px 12px;border:1px solid #d0d7de;text-align:center">
+<div style="font-size:18px;font-weight:bold">{{ value }}</div><div style="font-size:11px;color:#555">{{ label }}</div></td>
+{% endfor %}</tr></table>{% endif %}
+{% for s in sections %}
+<div style="font-size:14px;font-weight:bold;margin:14px 0 4px">{{ s.title }}{% if s.total > s.rows|length %}
+<span style="font-weight:normal;color:#555">({{ s.rows|length }} of {{ s.total }})</span>{% endif %}</div>
+{% if s.rows %}<table style="border-collapse:collapse;width:100%;font-size:12px">
+<tr>{% for c in s.columns %}<th style="background:#e6e6fa;border:1px solid #d0d7de;padding:3px 5px;text-align:left">{{ c }}</th>{% endfor %}</tr>
+{% for row in s.rows %}<tr style="background:{{ row.color or loop.cycle('#ffffff', '#f6f8fa') }}">
+{% for v in row.cells %}<td style="border:1px solid #d0d7de;padding:3px 5px;vertical-align:top">{{ v }}</td>{% endfor %}</tr>
+{% endfor %}</table>{% else %}<div style="color:#555">{{ s.empty }}</div>{% endif %}
+{% endfor %}
+{% if attachments %}<div style="font-size:14px;font-weight:bold;margin:14px 0 4px">Attachments</div>
+<pre style="font-family:inherit;margin:0">{{ attachments }}</pre>{% endif %}
+<div style="margin-top:14px;font-size:11px;color:#666">{{ footer }}</div>
+</body></html>"""
+
+_lock = threading.Lock()
+_compiled = None
+
+
+def _template():
+    """The digest template, compiled on first use and kept for the life of the process"""
+    global _compiled
+    with _lock:
+        if _compiled is None:
+            import jinja2
+            _compiled = jinja2.Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True).from_string(_TEMPLATE)
+        return _compiled
+
+
+def _cell(value):
+    text = "" if value is None or (isinstance(value, float) and value != value) else str(value).strip()
+    return text if len(text) <= CELL_CHARS else text[:CELL_CHARS - 1] + "…"
+
+
+def section(title, columns, rows, total=None, empty="None", colors=None):
+    """One inline table: rows are value lists (cut to TABLE_ROWS); colors: optional row backgrounds"""
+    rows = list(rows)
+    total = len(rows) if total is None else total
+    colors = colors or [None] * len(rows)
+    return {"title": title, "columns": columns, "total": total, "empty": empty,
+            "rows": [{"cells": [_cell(v) for v in row], "color": color}
+                     for row, color in list(zip(rows, colors))[:TABLE_ROWS]]}
+
+
+def render(title, subtitle, stats=(), sections=(), attachments="", footer=""):
+    """HTML body: stats = [(label, value)], sections from section()"""
+    return _template().render(title=title, subtitle=subtitle, stats=list(stats), sections=list(sections),
+                              attachments=attachments, footer=footer)
+
+
+def message(text, html=None):
+    """Mixed message whose body is text/plain (+ text/html when given); attach files after it"""
+    msg = MIMEMultipart()
+    if html is None:
+        msg.attach(MIMEText(text, 'plain'))
+    else:
+        body = MIMEMultipart('alternative')
+        body.attach(MIMEText(text, 'plain'))
+        body.attach(MIMEText(html, 'html'))
+        msg.attach(body)
+    return msg
@@ -0,0 +1,112 @@
+"""
+In-memory inverted index for the shutdown log filters
+Every column value is normalized (lowercase) and broken into 1..3-character n-grams; each
+n-gram maps to the set of event IDs containing it. A filter value is looked up as literal
+text: its n-grams' posting sets are intersected (smallest first) and only the surviving
+candidates are checked with a plain substring test - no regex, no scan of the whole log.
+
+The index holds the events themselves, so filtering never re-reads shutdown.json. It follows
+the change-feed version: save_shutdown_events() re-indexes just the saved events, and any
+write we did not make (mtime change) triggers a full rebuild.
+"""
+import threading
+from collections import defaultdict
+
+GRAM = 3  # longest n-gram indexed; longer filter values use their trigrams
+
+
+def normalize(value):
+    return "" if value is None else str(value).lower()
+
+
+def _grams(text, n_max=GRAM):
+    grams = set()
+    for n in range(1, n_max + 1):
+        grams.update(text[i:i + n] for i in range(len(text) - n + 1))
+    return grams
+
+
+def _query_grams(text):
+    return {text} if len(text) <= GRAM else {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class EventIndex:
+    def __init__(self, columns, key='ID'):
+        self.columns = list(columns)
+        self.key = key
+        self._lock = threading.Lock()
+        self._version = None
+        self._events = {}                                              # key -> event
+        self._texts = {col: {} for col in self.columns}                # col -> key -> normalized text
+        self._postings = {col: defaultdict(set) for col in self.columns}  # col -> gram -> keys
+
+    def _add(self, event):
+        key = event.get(self.key)
+        self._events[key] = dict(event)
+        for col in self.columns:
+            text = normalize(event.get(col))
+            self._texts[col][key] = text
+            postings = self._postings[col]
+            for gram in _grams(text):
+                postings[gram].add(key)
+
+    def _remove(self, key):
+        if self._events.pop(key, None) is None:
+            return
+        for col in self.columns:
+            postings = self._postings[col]
+            for gram in _grams(self._texts[col].pop(key, "")):
+                keys = postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del postings[gram]
+
+    def rebuild(self, events, version):
+        with self._lock:
+            self._events = {}
+            self._texts = {col: {} for col in self.columns}
+            self._postings = {col: defaultdict(set) for col in self.columns}
+            for event in events:
+                self._add(event)
+            self._version = version
+
+    def update(self, events, changed_keys, version):
+        """Re-index only changed_keys from the saved event list (None = unknown -> rebuild)"""
+        if changed_keys is None or self._version is None:
+            self.rebuild(events, version)
+            return
+        wanted = set(changed_keys)
+        with self._lock:
+            for key in wanted:
+                self._remove(key)
+            for event in events:
+                if event.get(self.key) in wanted:
+                    self._add(event)
+            self._version = version
+
+    def search(self, filters, version, load_events, keys=None):
+        """Events matching every filter (case-insensitive literal substring), as dict copies"""
+        if version != self._version:
+            self.rebuild(load_events(), version)
+        with self._lock:
+            candidates = set(self._events) if keys is None else {k for k in keys if k in self._events}
+            for col, val in filters.items():
+                needle = normalize(val)
+                if col not in self._postings or not needle.strip():
+                    continue
+                postings = self._postings[col]
+                lists = sorted((postings.get(g, ()) for g in _query_grams(needle)), key=len)
+                lists.insert(0, candidates)
+                lists.sort(key=len)
+                candidates = set(lists[0])
+                for posting in lists[1:]:
+                    candidates.intersection_update(posting)
+                    if not candidates:
+                        return []
+                if len(needle) > GRAM:  # trigrams can match out of order - confirm the substring
+                    texts = self._texts[col]
+                    candidates = {k for k in candidates if needle in texts[k]}
+                if not candidates:
+                    return []
+            return [dict(self._events[k]) for k in candidates]
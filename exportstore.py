@@ -0,0 +1,134 @@
+"""
+Managed export directory for Excel / PDF / CSV exports and email bundles
+Exports used to land in tempfile.gettempdir() with second-resolution names (two users
+exporting in the same second got the same file) and UI downloads were never deleted.
+Now every export gets a unique path under exports/<kind>/, and a background sweeper evicts
+files past the age limit, then least-recently-used files while the store is over its size cap.
+"""
+import os
+import time
+import uuid
+import functools
+import threading
+from datetime import datetime
+
+EXPORT_DIR = "exports"
+MAX_TOTAL_BYTES = 512 * 1024 * 1024   # size cap for the whole store
+MAX_AGE_HOURS = 24                    # exports older than this are always removed
+MIN_AGE_SECONDS = 300                 # never evict a file younger than this (download/email in progress)
+SWEEP_SECONDS = 600                   # background sweeper interval
+
+_LOCK = threading.Lock()
+_sweeper = None
+
+
+def new_path(kind, prefix, ext):
+    """Unique path for a new export: exports/<kind>/<prefix>_<timestamp>_<token>.<ext>"""
+    folder = os.path.join(EXPORT_DIR, kind)
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.abspath(os.path.join(folder, f"{prefix}_{stamp}_{uuid.uuid4().hex[:8]}.{ext.lstrip('.')}"))
+
+
+def touch(path):
+    """Mark an export as used - handed to a user or reused for an email (LRU order is file mtime)"""
+    if not path or not os.path.abspath(path).startswith(os.path.abspath(EXPORT_DIR) + os.sep):
+        return
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def served(fn):
+    """Wrap a UI export handler: touch() the file it returns (first value) as it is handed out"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        result = fn(*args, **kwargs)
+        touch(result[0] if isinstance(result, tuple) else result)
+        return result
+    return wrapper
+
+
+def discard(path):
+    """Delete an export right away (email attachments once sent)"""
+    try:
+        if path and os.path.exists(path):
+            os.remove(path)
+    except OSError as e:
+        print(f"⚠️ Export cleanup warning for {path}: {str(e)}")
+
+
+def _scan():
+    """[(mtime, size, path, kind)] for every file in the store"""
+    files = []
+    if not os.path.isdir(EXPORT_DIR):
+        return files
+    for kind in os.listdir(EXPORT_DIR):
+        folder = os.path.join(EXPORT_DIR, kind)
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            if entry.is_file():
+                st = entry.stat()
+                files.append((st.st_mtime, st.st_size, entry.path, kind))
+    return files
+
+
+def sweep(now=None):
+    """Evict expired files, then LRU files until under the size cap. Returns (files, bytes) freed."""
+    now = now or time.time()
+    removed, freed = 0, 0
+    with _LOCK:
+        files = sorted(_scan())  # oldest mtime first = least recently used
+        total = sum(f[1] for f in files)
+        for mtime, size, path, _ in files:
+            age = now - mtime
+            if age < MIN_AGE_SECONDS:
+                break
+            if age > MAX_AGE_HOURS * 3600 or total > MAX_TOTAL_BYTES:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                freed += size
+                total -= size
+    if removed:
+        print(f"🧹 Export store: evicted {removed} file(s), {freed / 1024 / 1024:.1f} MB freed")
+    return removed, freed
+
+
+def stats():
+    """Disk use per export type (Admin Panel)"""
+    now = time.time()
+    by_kind = {}
+    for mtime, size, _, kind in _scan():
+        s = by_kind.setdefault(kind, {"Export type": kind, "Files": 0, "Size (MB)": 0.0, "Oldest (h)": 0.0})
+        s["Files"] += 1
+        s["Size (MB)"] += size / 1024 / 1024
+        s["Oldest (h)"] = max(s["Oldest (h)"], (now - mtime) / 3600)
+    rows = sorted(by_kind.values(), key=lambda r: -r["Size (MB)"])
+    for r in rows:
+        r["Size (MB)"] = round(r["Size (MB)"], 2)
+        r["Oldest (h)"] = round(r["Oldest (h)"], 1)
+    return rows
+
+
+def start_sweeper():
+    """Daemon thread running sweep() every SWEEP_SECONDS (idempotent)"""
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return _sweeper
+
+    def run():
+        while True:
+            try:
+                sweep()
+            except Exception as e:
+                print(f"⚠️ Export sweeper error: {str(e)}")
+            time.sleep(SWEEP_SECONDS)
+
+    _sweeper = threading.Thread(target=run, name="export-sweeper", daemon=True)
+    _sweeper.start()
+    return _sweeper
@@ -0,0 +1,115 @@
+"""
+Override exposure analytics: how long safety functions stay bypassed
+Vectorized durations (date_on / time_in -> date_off, or -> now while still open), rolled up by
+module-tag prefix, priority and requester, plus the age distribution of open overrides and the
+longest-standing ones. Results are cached per change-feed version (and refreshed when they get
+older than CACHE_MAX_AGE_MINUTES, since open overrides keep ageing), so the scheduled report and
+the UI share one computation.
+"""
+import threading
+from datetime import datetime, timedelta
+from startup import lazy_import
+import assets
+
+pd = lazy_import("pandas")
+
+CACHE_MAX_AGE_MINUTES = 15
+LONGEST_LIMIT = 15
+AGE_BINS = [0, 1, 7, 30, 90, float("inf")]             # days
+AGE_LABELS = ["< 1 day", "1-7 days", "7-30 days", "30-90 days", "> 90 days"]
+ROLLUPS = {"Tag prefix": "tag_prefix", "Priority": "priority", "Requested by": "requested_by"}
+ROLLUP_COLUMNS = ["Overrides", "Open", "Bypass hours", "Avg hours", "Max hours"]
+
+
+def _parse(series):
+    return pd.to_datetime(series.replace("", None), format="mixed", errors="coerce")
+
+
+def durations(df, now):
+    """Add start, end, hours, is_open and tag_prefix columns to a raw overrides frame (db column names)"""
+    df = df.copy()
+    time_in, date_on = _parse(df["time_in"]), _parse(df["date_on"])
+    # date_on is when the bypass went on; time_in carries the time of day when it is the same day
+    start = date_on.where(time_in.dt.normalize() != date_on, time_in).fillna(time_in)
+    is_open = df["closed"].fillna("").str.upper() != "YES"
+    end = _parse(df["date_off"]).where(~is_open, now)
+    hours = (end - start).dt.total_seconds() / 3600
+    df["start"], df["end"], df["is_open"] = start, end, is_open
+    df["hours"] = hours.where(hours >= 0)  # end before start = data entry error, left out of the sums
+    df["tag_prefix"] = df["module_parameter"].fillna("").str.extract(r"^\s*(\d+)", expand=False).fillna("(other)")
+    df["priority"] = df["priority"].fillna("").replace("", "(none)")
+    df["requested_by"] = df["requested_by"].fillna("").str.strip().replace("", "(unknown)")
+    return df
+
+
+def rollup(df, by):
+    grouped = df.groupby(by, dropna=False)
+    out = pd.DataFrame({
+        "Overrides": grouped.size(),
+        "Open": grouped["is_open"].sum(),
+        "Bypass hours": grouped["hours"].sum().round(1),
+        "Avg hours": grouped["hours"].mean().round(1),
+        "Max hours": grouped["hours"].max().round(1),
+    })
+    return out.sort_values("Bypass hours", ascending=False).reset_index()
+
+
+def compute(df, now=None):
+    """All exposure statistics for a raw overrides frame"""
+    now = now or datetime.now()
+    df = durations(df, now)
+    open_df = df[df["is_open"] & df["hours"].notna()]
+    ages = pd.cut(open_df["hours"] / 24, AGE_BINS, labels=AGE_LABELS, right=False)
+    age_dist = ages.value_counts().reindex(AGE_LABELS, fill_value=0)
+    longest = (open_df.nlargest(LONGEST_LIMIT, "hours")
+               .assign(**{"Open days": lambda d: (d["hours"] / 24).round(1),
+                          "Since": lambda d: d["start"].dt.strftime("%Y-%m-%d %H:%M")}))
+    return {
+        "computed_at": now,
+        "total_hours": round(float(df["hours"].sum()), 1),
+        "open_count": int(df["is_open"].sum()),
+        "open_hours": round(float(open_df["hours"].sum()), 1),
+        "undated": int(df["hours"].isna().sum()),
+        "rollups": {name: rollup(df, col) for name, col in ROLLUPS.items()},
+        "age_distribution": pd.DataFrame({"Age": AGE_LABELS, "Open overrides": age_dist.values}),
+        "longest": longest[["entry_no", "module_parameter", "description", "priority", "requested_by", "Since", "Open days"]]
+                   .rename(columns={"entry_no": "No", "module_parameter": "Module Parameter", "description": "Description",
+                                    "priority": "Priority", "requested_by": "Requested By"}),
+    }
+
+
+def summary_text(stats):
+    """Plain-text block for emails and the UI header"""
+    ages = dict(zip(stats["age_distribution"]["Age"], stats["age_distribution"]["Open overrides"]))
+    top = stats["longest"].head(3)
+    lines = [
+        f"  • Open overrides: {stats['open_count']} ({stats['open_hours']:,.0f} bypass-hours and counting)",
+        f"  • Total bypass-hours (all overrides): {stats['total_hours']:,.0f}",
+        "  • Open age: " + " | ".join(f"{k}: {v}" for k, v in ages.items()),
+    ]
+    lines += [f"  • Longest open: #{r['No']} {r['Module Parameter']} - {r['Open days']} days" for _, r in top.iterrows()]
+    if stats["undated"]:
+        lines.append(f"  • {stats['undated']} override(s) without usable dates left out of the hours")
+    return "\n".join(lines)
+
+
+class ExposureCache:
+    """One computation per data version (recomputed when older than CACHE_MAX_AGE_MINUTES)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._stats = None
+
+    def stats(self, version, load_frame):
+        with self._lock:
+            now = datetime.now()
+            stale = (self._stats is None or self._key != version
+                     or now - self._stats["computed_at"] > timedelta(minutes=CACHE_MAX_AGE_MINUTES))
+            if stale:
+                self._stats = compute(load_frame(), now)
+                self._key = version
+            return self._stats
+
+
+exposure_cache = assets.PerAsset(ExposureCache)  # one cache per asset partition
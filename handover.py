@@ -0,0 +1,121 @@
+"""
+Shift-handover delta reports
+The scheduled emails list what happened since the last successful send instead of attaching
+the whole register every time. Each report keeps a high-water mark in MARKS_FILE, moved
+forward only after the email went out:
+  - overrides: the last override_history seq reported (see history.py), so created / approved /
+    closed entries are read straight from the change log;
+  - shutdown log: a short fingerprint per event ID, so added and edited events are found by
+    comparing against the previous send.
+A report without a mark yet (first run) falls back to the full export and sets the baseline.
+Marks are kept per asset partition (see assets.py).
+"""
+import hashlib
+import json
+import os
+import threading
+import assets
+
+MARKS_FILE = "report_marks.json"
+LIST_LIMIT = 40   # changed items listed in the email body; the delta attachment has them all
+
+_lock = threading.Lock()
+
+
+def _load_all():
+    try:
+        with open(MARKS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _key(report):
+    return report if assets.is_default() else f"{report}@{assets.slug(assets.current())}"
+
+
+def load_mark(report):
+    """Persisted mark of one report (current asset), or None before its first successful send"""
+    with _lock:
+        return _load_all().get(_key(report))
+
+
+def save_mark(report, mark, sent_at):
+    """Store the mark after a successful send (atomic replace - a crash never leaves half a file)"""
+    with _lock:
+        marks = _load_all()
+        marks[_key(report)] = {**mark, "sent_at": sent_at}
+        tmp = f"{MARKS_FILE}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(marks, f, indent=1)
+        os.replace(tmp, MARKS_FILE)
+
+
+def clear_mark(report):
+    """Forget a report's mark (next send is a full report) - e.g. after the data was restored"""
+    with _lock:
+        marks = _load_all()
+        if marks.pop(_key(report), None) is not None:
+            tmp = f"{MARKS_FILE}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(marks, f, indent=1)
+            os.replace(tmp, MARKS_FILE)
+
+
+# ======================
+# OVERRIDES (from the change history)
+# ======================
+def _is_yes(value):
+    return str(value or "").strip().upper() == "YES"
+
+
+def override_changes(conn, since_seq):
+    """
+    Changes after history row since_seq: (last seq, dict of entry_no lists created / approved /
+    closed / edited / deleted). An entry created and approved in the same shift is in both.
+    """
+    rows = conn.execute("SELECT seq, entry_no, op, changes FROM override_history WHERE seq > ? ORDER BY seq",
+                        (since_seq,)).fetchall()
+    delta = {"created": [], "approved": [], "closed": [], "edited": [], "deleted": []}
+    last = since_seq
+    for seq, entry_no, op, changes in rows:
+        last = seq
+        changes = json.loads(changes)
+        if op == 'I':
+            bucket = ["created"]
+        elif op == 'D':
+            bucket = ["deleted"]
+        else:
+            bucket = [name for name, col in (("approved", 'approved'), ("closed", 'closed'))
+                      if col in changes and _is_yes(changes[col])] or ["edited"]
+        for name in bucket:
+            if entry_no not in delta[name]:
+                delta[name].append(entry_no)
+    return last, delta
+
+
+# ======================
+# SHUTDOWN LOG (fingerprints)
+# ======================
+def fingerprints(events, key='ID'):
+    """{str(event ID): short content hash}"""
+    return {str(e.get(key)): hashlib.sha1(json.dumps(e, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+            for e in events}
+
+
+def event_changes(current, previous):
+    """(added IDs, edited IDs, removed count) between two fingerprint maps"""
+    added = [k for k in current if k not in previous]
+    edited = [k for k in current if k in previous and previous[k] != current[k]]
+    removed = sum(1 for k in previous if k not in current)
+    return added, edited, removed
+
+
+def listing(title, lines):
+    """Email body section, capped at LIST_LIMIT lines"""
+    if not lines:
+        return f"{title}: none"
+    out = [f"{title} ({len(lines)}):"] + [f"  • {line}" for line in lines[:LIST_LIMIT]]
+    if len(lines) > LIST_LIMIT:
+        out.append(f"  ... and {len(lines) - LIST_LIMIT} more (see attachment)")
+    return "\n".join(out)
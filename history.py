@@ -0,0 +1,171 @@
+"""
+Field-level change history for the override register
+Every insert / update / delete made through the app appends one row to override_history with
+only the fields that changed (JSON), the user and the local timestamp - in the same transaction
+as the write itself. Every CHECKPOINT_EVERY changes a full, zlib-compressed snapshot of the
+register is stored in override_checkpoints, so "the register as it was at 05:00" is rebuilt
+from the nearest earlier checkpoint plus the few changes after it, not by replaying everything.
+
+History starts at the first checkpoint (taken at startup when none exists yet): earlier
+points in time cannot be reconstructed.
+"""
+import json
+import zlib
+from datetime import datetime
+
+import archive
+
+CHECKPOINT_EVERY = 200   # history rows between full snapshots
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+RECORD_COLUMNS = ['entry_no', 'approved', 'closed', 'time_in', 'module_parameter', 'description', 'alarm',
+                  'message', 'priority', 'status', 'date_on', 'requested_by', 'date_off', 'removal_requested_by']
+
+
+def ensure_schema(conn):
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS override_history (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_no INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_by TEXT,
+            changed_at TEXT NOT NULL,
+            changes TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_override_history_entry ON override_history(entry_no, seq);
+        CREATE INDEX IF NOT EXISTS idx_override_history_time ON override_history(changed_at);
+        CREATE TABLE IF NOT EXISTS override_checkpoints (
+            seq INTEGER PRIMARY KEY,
+            taken_at TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            snapshot BLOB NOT NULL
+        );
+    ''')
+    conn.commit()
+
+
+def _now():
+    return datetime.now().strftime(TIME_FORMAT)
+
+
+def _value(v):
+    return "" if v is None else str(v)
+
+
+def current_record(conn, entry_no):
+    """{db column: value} for one entry, or None"""
+    cur = conn.execute(f"SELECT {', '.join(RECORD_COLUMNS)} FROM overrides WHERE entry_no = ?", (entry_no,))
+    row = cur.fetchone()
+    return dict(zip(RECORD_COLUMNS, row)) if row else None
+
+
+def record(conn, entry_no, op, changed_by, before, after):
+    """Append one change (op: 'I', 'U', 'D'); unchanged fields are not stored. Caller commits."""
+    if op == 'D':
+        changes = {}
+    else:
+        before = before or {}
+        changes = {c: after.get(c) for c in RECORD_COLUMNS
+                   if c in after and (op == 'I' or _value(after.get(c)) != _value(before.get(c)))}
+        if op == 'U' and not changes:
+            return None  # saved without edits - nothing to audit
+    cur = conn.execute(
+        "INSERT INTO override_history (entry_no, op, changed_by, changed_at, changes) VALUES (?, ?, ?, ?, ?)",
+        (entry_no, op, changed_by, _now(), json.dumps(changes, ensure_ascii=False)))
+    seq = cur.lastrowid
+    last = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM override_checkpoints").fetchone()[0]
+    if seq - last >= CHECKPOINT_EVERY:
+        checkpoint(conn, seq)
+    return seq
+
+
+def record_many(conn, records, changed_by):
+    """Bulk inserts (Excel import): records = [{db column: value}, ...]"""
+    for rec in records:
+        record(conn, int(rec['entry_no']), 'I', changed_by, None, rec)
+
+
+def checkpoint(conn, seq=None):
+    """Store a full snapshot of the register as of history row `seq`, archived entries included (caller commits)"""
+    if seq is None:
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM override_history").fetchone()[0]
+    rows = conn.execute(f"SELECT {', '.join(RECORD_COLUMNS)} FROM {archive.ALL_VIEW}").fetchall()
+    snapshot = zlib.compress(json.dumps([list(r) for r in rows], ensure_ascii=False).encode("utf-8"), 6)
+    conn.execute("INSERT OR REPLACE INTO override_checkpoints (seq, taken_at, rows, snapshot) VALUES (?, ?, ?, ?)",
+                 (seq, _now(), len(rows), snapshot))
+    return seq
+
+
+def ensure_baseline(conn):
+    """First checkpoint = the register as it was when history tracking started"""
+    ensure_schema(conn)
+    if conn.execute("SELECT 1 FROM override_checkpoints LIMIT 1").fetchone() is None:
+        checkpoint(conn)
+        conn.commit()
+
+
+def history_start(conn):
+    row = conn.execute("SELECT MIN(taken_at) FROM override_checkpoints").fetchone()
+    return row[0] if row else None
+
+
+def _apply(state, op, entry_no, changes):
+    if op == 'D':
+        state.pop(entry_no, None)
+    elif op == 'I':
+        state[entry_no] = {c: changes.get(c) for c in RECORD_COLUMNS}
+        state[entry_no]['entry_no'] = entry_no
+    else:
+        state.setdefault(entry_no, {c: None for c in RECORD_COLUMNS} | {'entry_no': entry_no}).update(changes)
+
+
+def state_at_seq(conn, seq):
+    """{entry_no: record} after history row `seq`: nearest checkpoint <= seq, then replay forward"""
+    cp = conn.execute("SELECT seq, snapshot FROM override_checkpoints WHERE seq <= ? ORDER BY seq DESC LIMIT 1",
+                      (seq,)).fetchone()
+    if cp is None:
+        return None, 0
+    cp_seq, blob = cp
+    state = {}
+    for row in json.loads(zlib.decompress(blob).decode("utf-8")):
+        rec = dict(zip(RECORD_COLUMNS, row))
+        state[rec['entry_no']] = rec
+    replayed = conn.execute(
+        "SELECT entry_no, op, changes FROM override_history WHERE seq > ? AND seq <= ? ORDER BY seq",
+        (cp_seq, seq)).fetchall()
+    for entry_no, op, changes in replayed:
+        _apply(state, op, entry_no, json.loads(changes))
+    return state, len(replayed)
+
+
+def as_of(conn, when):
+    """
+    Register as it was at `when` ('YYYY-MM-DD HH:MM[:SS]').
+    Returns (records sorted by entry_no, info message); records is None when `when` is before
+    history tracking started.
+    """
+    when = when.strip()
+    if len(when) == 16:
+        when += ":59"
+    start = history_start(conn)
+    if start is None or when < start:
+        return None, f"❌ History starts at {start or 'the next startup'} - earlier states cannot be rebuilt"
+    seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM override_history WHERE changed_at <= ?",
+                       (when,)).fetchone()[0]
+    state, replayed = state_at_seq(conn, seq)
+    if state is None:
+        return None, "❌ No checkpoint found before that time"
+    records = [state[k] for k in sorted(state)]
+    return records, f"✅ {len(records)} entries as of {when} (rebuilt from checkpoint + {replayed} change(s))"
+
+
+def entry_history(conn, entry_no):
+    """Audit trail of one entry: [{When, By, Action, Changes}]"""
+    rows = conn.execute(
+        "SELECT changed_at, changed_by, op, changes FROM override_history WHERE entry_no = ? ORDER BY seq",
+        (entry_no,)).fetchall()
+    actions = {'I': "created", 'U': "updated", 'D': "deleted"}
+    return [{"When": at, "By": by or "", "Action": actions.get(op, op),
+             "Changes": "; ".join(f"{k} = {v}" for k, v in json.loads(changes).items() if k != 'entry_no')}
+            for at, by, op, changes in rows]
+
@@ -0,0 +1,204 @@
+"""
+Adaptive index advisor for the override register
+Records which filter-column combinations the CCR actually uses (and how long they take) from
+apply_filters, recommends composite / partial indexes that SQLite can use for them, and lets
+the admin create or drop them with a before/after timing comparison.
+
+Only sargable terms benefit from an index: exact matches on the flag/priority columns
+(see overrides.EXACT_MATCH_VALUES). Substring filters (`LIKE '%...%'`) always scan.
+"""
+import re
+import time
+import threading
+from datetime import datetime
+
+ADVISOR_PREFIX = "idx_adv_"
+MIN_CALLS = 3          # combinations seen fewer times are not worth an index
+TIMING_RUNS = 5        # repetitions for before/after comparisons
+
+FLUSH_SECONDS = 60     # usage buffered in memory, written at most this often per database
+
+_LOCK = threading.Lock()
+_pending = {}          # database key -> {columns: (exact_terms, calls, total_ms, max_ms, last_rows, last_used)}
+_flushed_at = {}       # database key -> time.monotonic() of the last write
+
+
+def ensure_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS filter_usage (
+            columns TEXT PRIMARY KEY,
+            exact_terms TEXT,
+            calls INTEGER DEFAULT 0,
+            total_ms REAL DEFAULT 0,
+            max_ms REAL DEFAULT 0,
+            last_rows INTEGER DEFAULT 0,
+            last_used TEXT
+        )
+    ''')
+
+
+def record(key, connect, like_cols, exact_terms, elapsed_ms, rows):
+    """Buffer one observation. like_cols: substring-filtered columns; exact_terms: {col: value}.
+    key: the database's path; connect() opens it. The buffer is written in one transaction at
+    most every FLUSH_SECONDS per database, not on every (as-you-type) filter call."""
+    cols = sorted(set(like_cols) | set(exact_terms))
+    columns = ",".join(cols) or "(no filter)"
+    exact = ",".join(f"{c}={v}" for c, v in sorted(exact_terms.items()))
+    now = time.monotonic()
+    with _LOCK:
+        usage = _pending.setdefault(key, {})
+        calls, total_ms, max_ms = usage.get(columns, (None, 0, 0, 0))[1:4]
+        usage[columns] = (exact, calls + 1, total_ms + elapsed_ms, max(max_ms, elapsed_ms), rows,
+                          datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        due = now - _flushed_at.get(key, 0) >= FLUSH_SECONDS
+        if due:
+            _flushed_at[key] = now
+    if due:
+        conn = connect()
+        try:
+            flush(key, conn)
+        finally:
+            conn.close()
+
+
+def flush(key, conn):
+    """Write the buffered observations of database `key` (call before reading filter_usage)"""
+    with _LOCK:
+        usage = _pending.pop(key, {})
+        ensure_schema(conn)
+        if usage:
+            conn.executemany('''
+                INSERT INTO filter_usage (columns, exact_terms, calls, total_ms, max_ms, last_rows, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(columns) DO UPDATE SET
+                    exact_terms = excluded.exact_terms,
+                    calls = calls + excluded.calls,
+                    total_ms = total_ms + excluded.total_ms,
+                    max_ms = MAX(max_ms, excluded.max_ms),
+                    last_rows = excluded.last_rows,
+                    last_used = excluded.last_used
+            ''', [(columns, *values) for columns, values in usage.items()])
+        conn.commit()
+
+
+def _parse_exact(exact_terms):
+    return dict(t.split("=", 1) for t in exact_terms.split(",") if "=" in t) if exact_terms else {}
+
+
+def _index_name(cols, partial=None):
+    name = ADVISOR_PREFIX + "_".join(cols)
+    if partial:
+        name += "_where_" + "_".join(f"{c}_{v}".lower() for c, v in partial.items())
+    return re.sub(r"[^a-z0-9_]", "", name.lower())
+
+
+def recommend(conn, exact_match_values):
+    """Build recommendations from observed usage. Returns list of dicts (best first)."""
+    ensure_schema(conn)
+    rows = conn.execute(
+        "SELECT columns, exact_terms, calls, total_ms, max_ms, last_rows FROM filter_usage ORDER BY total_ms DESC"
+    ).fetchall()
+    existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    # Cardinality decides column order inside a composite index (most selective first)
+    distinct = {c: conn.execute(f"SELECT COUNT(DISTINCT {c}) FROM overrides").fetchone()[0]
+                for c in exact_match_values}
+    recs = []
+    for columns, exact_terms, calls, total_ms, max_ms, last_rows in rows:
+        exact = _parse_exact(exact_terms)
+        like_cols = [c for c in columns.split(",") if c and c not in exact and c != "(no filter)"]
+        avg = total_ms / calls if calls else 0
+        rec = {"Filter columns": columns, "Calls": calls, "Avg ms": round(avg, 2), "Max ms": round(max_ms, 1),
+               "Rows (last)": last_rows, "Recommendation": "", "Index": "", "SQL": ""}
+        if not exact:
+            rec["Recommendation"] = ("Substring search only - not indexable (full scan)" if like_cols
+                                     else "Unfiltered view - served by entry_no index")
+        elif calls < MIN_CALLS:
+            rec["Recommendation"] = f"Observe more (needs {MIN_CALLS}+ calls)"
+        else:
+            partial = {c: v for c, v in exact.items() if c == "closed" and v == "NO"}
+            keys = sorted((c for c in exact if c not in partial), key=lambda c: -distinct.get(c, 0))
+            if partial:
+                # Day-to-day CCR work is on open overrides: small partial index, ordered by entry_no
+                cols = keys + ["entry_no"]
+                where = " AND ".join(f"{c}='{v}'" for c, v in partial.items())
+                name = _index_name(keys or ["open"], partial)
+                sql = f"CREATE INDEX IF NOT EXISTS {name} ON overrides({', '.join(cols)}) WHERE {where}"
+                kind = "Partial index"
+            else:
+                cols = keys + ["entry_no"]
+                name = _index_name(keys)
+                sql = f"CREATE INDEX IF NOT EXISTS {name} ON overrides({', '.join(cols)})"
+                kind = "Composite index" if len(keys) > 1 else "Index"
+            state = "✅ exists" if name in existing else "recommended"
+            rec.update({"Recommendation": f"{kind} ({state})" + (f"; {', '.join(like_cols)} still substring-filtered" if like_cols else ""),
+                        "Index": name, "SQL": sql})
+        recs.append(rec)
+    return recs
+
+
+def advisor_indexes(conn):
+    """Indexes created by the advisor (only these may be dropped from the Admin Panel)"""
+    return [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE ? ORDER BY name", (ADVISOR_PREFIX + "%",))]
+
+
+def _time_query(conn, sql, params):
+    samples = []
+    for _ in range(TIMING_RUNS):
+        t = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - t) * 1000)
+    samples.sort()
+    plan = " / ".join(r[-1] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+    return samples[len(samples) // 2], plan
+
+
+def _sample_query(exact_terms, columns):
+    """Representative query for a usage row (substring terms use a neutral '%' pattern)"""
+    exact = _parse_exact(exact_terms)
+    where, params = [], []
+    for c in columns.split(","):
+        if not c or c == "(no filter)":
+            continue
+        if c in exact:
+            where.append(f"{c} = '{exact[c]}'")  # literal: lets SQLite match partial indexes
+        else:
+            where.append(f"{c} LIKE ?")
+            params.append("%")
+    where_sql = "WHERE " + " AND ".join(where) if where else ""
+    return f"SELECT * FROM overrides {where_sql} ORDER BY entry_no ASC", params
+
+
+def apply_index(conn, index_name, exact_match_values, drop=False):
+    """Create (or drop) an advisor index and report query timings before/after"""
+    if not index_name or not index_name.startswith(ADVISOR_PREFIX):
+        return "❌ Only advisor-managed indexes (idx_adv_*) can be changed here."
+    recs = recommend(conn, exact_match_values)
+    rec = next((r for r in recs if r["Index"] == index_name), None)
+    if rec is None and not drop:
+        return f"❌ No recommendation named {index_name}"
+    if rec is not None:
+        usage = conn.execute("SELECT exact_terms, columns FROM filter_usage WHERE columns = ?",
+                             (rec["Filter columns"],)).fetchone()
+        sql, params = _sample_query(*usage)
+    else:
+        sql, params = "SELECT * FROM overrides ORDER BY entry_no ASC", []
+
+    before_ms, before_plan = _time_query(conn, sql, params)
+    t = time.perf_counter()
+    if drop:
+        conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+    else:
+        conn.execute(rec["SQL"])
+    conn.execute("ANALYZE overrides")
+    conn.commit()
+    ddl_ms = (time.perf_counter() - t) * 1000
+    after_ms, after_plan = _time_query(conn, sql, params)
+
+    action = "Dropped" if drop else "Created"
+    change = ((after_ms - before_ms) / before_ms * 100) if before_ms else 0
+    return (f"✅ {action} {index_name} in {ddl_ms:.1f} ms\n"
+            f"Query: {sql}\n"
+            f"Before: {before_ms:.2f} ms | {before_plan}\n"
+            f"After:  {after_ms:.2f} ms | {after_plan}\n"
+            f"Change: {change:+.1f}%")
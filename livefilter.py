@@ -0,0 +1,91 @@
+"""
+As-you-type filtering for the override register and the shutdown log
+- debounce_js(): client-side debounce for a Gradio `js=` hook - keystrokes superseded within
+  the delay are never sent to the server
+- LatestOnly: per-session request generations; a result computed for an older keystroke is
+  dropped instead of overwriting a newer one
+- is_refinement() / refine(): when the new filter only narrows the previous one (characters
+  appended), filter the previous result set in memory instead of re-querying
+"""
+import re
+import threading
+from collections import OrderedDict
+
+DEBOUNCE_MS = 300
+MAX_CACHED_ROWS = 20000  # larger result sets are not kept per session
+MAX_SESSIONS = 500       # generation counters kept (oldest sessions forgotten first)
+
+LIKE_WILDCARDS = "%_"              # SQLite LIKE
+
+
+def debounce_js(key, delay_ms=DEBOUNCE_MS):
+    """Resolve only the last call within delay_ms; earlier calls never resolve (never submitted)"""
+    return f"""(...args) => new Promise((resolve) => {{
+        window.__ccrDebounce = window.__ccrDebounce || {{}};
+        clearTimeout(window.__ccrDebounce["{key}"]);
+        window.__ccrDebounce["{key}"] = setTimeout(() => resolve(args), {delay_ms});
+    }})"""
+
+
+class LatestOnly:
+    """Tracks the newest request per (session, view)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = OrderedDict()
+
+    def begin(self, key):
+        with self._lock:
+            ticket = self._latest.pop(key, 0) + 1
+            self._latest[key] = ticket
+            while len(self._latest) > MAX_SESSIONS:
+                self._latest.popitem(last=False)
+            return ticket
+
+    def is_stale(self, key, ticket):
+        with self._lock:
+            return self._latest.get(key) != ticket
+
+
+def is_refinement(old, new, exact=None, special_chars=LIKE_WILDCARDS):
+    """True when every row matching `new` also matches `old` (same semantics as the query)"""
+    exact = exact or {}
+    for col in set(old) | set(new):
+        o, n = old.get(col) or "", new.get(col) or ""
+        if any(c in special_chars for c in o + n):
+            return False
+        if not o.strip():
+            continue
+        if o.strip().upper() in exact.get(col, {}):
+            if n.strip().upper() != o.strip().upper():
+                return False
+        elif o.lower() not in n.lower():
+            return False
+    return True
+
+
+def refine(df, filters, exact=None, regex=False):
+    """Apply filters to an in-memory result set. exact: {col: {UPPER: stored value}}"""
+    exact = exact or {}
+    for col, val in filters.items():
+        if not val or not val.strip():
+            continue
+        allowed = exact.get(col, {})
+        if val.strip().upper() in allowed:
+            df = df[df[col].astype(str) == allowed[val.strip().upper()]]
+        else:
+            df = df[df[col].fillna("").astype(str).str.contains(val if regex else re.escape(val),
+                                                                 case=False, regex=True, na=False)]
+    return df.reset_index(drop=True)
+
+
+def cache_entry(filters, version, df):
+    """Value for the per-session gr.State holding the previous result set"""
+    if len(df) > MAX_CACHED_ROWS:
+        return None
+    return {"filters": dict(filters), "version": version, "df": df}
+
+
+def reusable(cache, filters, version, exact=None, special_chars=LIKE_WILDCARDS):
+    return bool(cache) and cache["version"] == version and is_refinement(
+        cache["filters"], filters, exact, special_chars)
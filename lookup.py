@@ -0,0 +1,145 @@
+"""
+Autocomplete lookups for the entry / event selectors
+The selectors no longer receive every ID ever created: they start with a small recent-items
+list and ask the server for the top-N matches (number, tag or description prefix) as the
+user types.
+
+Override register: prefix searches on SQLite indexes - entry_no ranges on the UNIQUE index,
+NOCASE indexes on module_parameter (tag) and description.
+Shutdown log: an in-memory sorted prefix index, rebuilt when the change-feed version moves.
+"""
+import bisect
+import itertools
+import threading
+import assets
+
+LOOKUP_LIMIT = 10   # matches returned per keystroke
+RECENT_LIMIT = 8    # items shown before anything is typed
+LABEL_TEXT = 48     # description characters shown in a choice label
+
+
+def choice_label(number, tag, text):
+    text = " ".join(str(text or "").split())
+    if len(text) > LABEL_TEXT:
+        text = text[:LABEL_TEXT - 1] + "…"
+    return " · ".join(str(p) for p in (number, tag, text) if p)
+
+
+def _like_prefix(q):
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def remember(recent, choice):
+    """Most-recently-used list kept in a per-session gr.State: [(label, value), ...]"""
+    recent = [c for c in (recent or []) if c[1] != choice[1]]
+    return [choice] + recent[:RECENT_LIMIT - 1]
+
+
+def merge(*groups, limit=LOOKUP_LIMIT):
+    """Concatenate choice lists, first occurrence of each value wins"""
+    seen, merged = set(), []
+    for group in groups:
+        for label, value in group:
+            if value not in seen:
+                seen.add(value)
+                merged.append((label, value))
+    return merged[:limit]
+
+
+# ======================
+# OVERRIDE REGISTER (SQLite)
+# ======================
+def ensure_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_overrides_tag_nocase ON overrides(module_parameter COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_overrides_desc_nocase ON overrides(description COLLATE NOCASE)")
+    conn.commit()
+
+
+def _number_ranges(prefix, max_no):
+    """Entry numbers starting with `prefix` as index-friendly BETWEEN ranges (12 -> 12, 120-129, ...)"""
+    lo = hi = int(prefix)
+    ranges = []
+    while lo <= max_no:
+        ranges.append((lo, hi))
+        lo, hi = lo * 10, hi * 10 + 9
+        if lo == 0:
+            break
+    return ranges
+
+
+def override_choices(conn, q, limit=LOOKUP_LIMIT):
+    """Top-N entries whose number, tag or description starts with q (newest entries if q is empty)"""
+    q = (q or "").strip()
+    cols = "entry_no, module_parameter, description"
+    if not q:
+        rows = conn.execute(f"SELECT {cols} FROM overrides ORDER BY entry_no DESC LIMIT ?", (limit,)).fetchall()
+        return [(choice_label(*r), str(r[0])) for r in rows]
+
+    groups = []
+    if q.isdigit():
+        max_no = conn.execute("SELECT COALESCE(MAX(entry_no), 0) FROM overrides").fetchone()[0]
+        ranges = _number_ranges(q, max_no)
+        if ranges:
+            where = " OR ".join(["entry_no BETWEEN ? AND ?"] * len(ranges))
+            params = [v for r in ranges for v in r]
+            groups.append(conn.execute(f"SELECT {cols} FROM overrides WHERE {where} ORDER BY entry_no LIMIT ?",
+                                       params + [limit]).fetchall())
+    pattern = _like_prefix(q)
+    for col in ("module_parameter", "description"):
+        groups.append(conn.execute(
+            f"SELECT {cols} FROM overrides WHERE {col} LIKE ? ESCAPE '\\' ORDER BY {col} COLLATE NOCASE LIMIT ?",
+            (pattern, limit)).fetchall())
+    return merge(*[[(choice_label(*r), str(r[0])) for r in g] for g in groups], limit=limit)
+
+
+# ======================
+# SHUTDOWN LOG (in-memory prefix index)
+# ======================
+class ShutdownLookup:
+    """Sorted (key, id) lists for ID, first cause (usually starts with the tag) and description"""
+
+    FIELDS = ("First Cause", "Technical Details/Event Description")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._keys = []      # sorted [(lowercase text, -id)] - newest first within equal keys
+        self._labels = {}    # id -> label
+        self._ids = []       # ids, newest first
+
+    def _rebuild(self, events, version):
+        keys, labels = [], {}
+        for e in events:
+            try:
+                event_id = int(e.get('ID'))
+            except (TypeError, ValueError):
+                continue
+            labels[event_id] = choice_label(event_id, e.get('Event Type'), e.get('Technical Details/Event Description'))
+            keys.append((str(event_id), -event_id))
+            for field in self.FIELDS:
+                text = " ".join(str(e.get(field) or "").split()).lower()
+                if text:
+                    keys.append((text, -event_id))
+        keys.sort()
+        self._keys, self._labels = keys, labels
+        self._ids = sorted(labels, reverse=True)
+        self._version = version
+
+    def choices(self, q, version, load_events, limit=LOOKUP_LIMIT):
+        with self._lock:
+            if version != self._version or self._version is None:
+                self._rebuild(load_events(), version)
+            q = " ".join((q or "").split()).lower()
+            if not q:
+                return [(self._labels[i], str(i)) for i in self._ids[:limit]]
+            matches = []
+            start = bisect.bisect_left(self._keys, (q,))
+            for key, neg_id in itertools.islice(self._keys, start, None):
+                if not key.startswith(q) or len(matches) >= limit * 4:
+                    break
+                matches.append(-neg_id)
+            ids = sorted(set(matches), key=lambda i: (str(i) != q, not str(i).startswith(q), -i))[:limit]
+            return [(self._labels[i], str(i)) for i in ids]
+
+
+shutdown_lookup = assets.PerAsset(ShutdownLookup)  # one prefix index per asset partition
@@ -0,0 +1,173 @@
+"""
+Lightweight in-process metrics (no external dependency)
+Call counts, error counts and latency histograms for Gradio handlers, DB queries and
+scheduler jobs - exposed in Prometheus text format at /metrics.
+"""
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+# Prometheus default latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_LOCK = threading.Lock()
+_STARTED = time.time()
+
+# Metric families: kind -> (help, label name, {label_value: series})
+FAMILIES = {
+    "handler": ("Gradio event handler", "handler", {}),
+    "db": ("SQLite query", "query", {}),
+    "job": ("Scheduler job", "job", {}),
+    "api": ("REST API request", "endpoint", {}),
+}
+
+# Byte counters: kind -> (help, label name, {label_value: bytes})
+BYTE_COUNTERS = {
+    "report_email": ("Encoded report email bytes sent", "report", {}),
+}
+
+
+class _Series:
+    """Counters + cumulative histogram for one labelled series"""
+    __slots__ = ("calls", "errors", "in_flight", "buckets", "total")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+
+
+def _series(kind, name):
+    series = FAMILIES[kind][2]
+    if name not in series:
+        series[name] = _Series()
+    return series[name]
+
+
+def observe(kind, name, seconds, error=False):
+    """Record one completed call"""
+    with _LOCK:
+        s = _series(kind, name)
+        s.calls += 1
+        s.total += seconds
+        if error:
+            s.errors += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                s.buckets[i] += 1
+
+
+def _is_error_result(result):
+    """Handlers report failures as '❌ ...' status strings rather than raising"""
+    if isinstance(result, str):
+        return result.startswith("❌")
+    if isinstance(result, dict):
+        return any(_is_error_result(v) for v in result.values() if isinstance(v, str))
+    if isinstance(result, (tuple, list)):
+        return any(_is_error_result(v) for v in result if isinstance(v, str))
+    return False
+
+
+@contextmanager
+def timer(kind, name):
+    """Time a block: `with metrics.timer("db", "get_filtered_data"): ...`"""
+    with _LOCK:
+        _series(kind, name).in_flight += 1
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        with _LOCK:
+            _series(kind, name).in_flight -= 1
+        observe(kind, name, time.perf_counter() - start, error)
+
+
+def instrument(fn, kind="handler", name=None):
+    """Wrap a handler/job; functools.wraps keeps the signature Gradio inspects"""
+    name = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _LOCK:
+            _series(kind, name).in_flight += 1
+        start = time.perf_counter()
+        error = True
+        try:
+            result = fn(*args, **kwargs)
+            error = _is_error_result(result)
+            return result
+        finally:
+            with _LOCK:
+                _series(kind, name).in_flight -= 1
+            observe(kind, name, time.perf_counter() - start, error)
+    return wrapper
+
+
+def db_timer(name):
+    return timer("db", name)
+
+
+def add_bytes(kind, name, n):
+    with _LOCK:
+        series = BYTE_COUNTERS[kind][2]
+        series[name] = series.get(name, 0) + n
+
+# ======================
+# PROMETHEUS TEXT EXPOSITION
+# ======================
+def _esc(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus():
+    """Return all metrics in Prometheus text format 0.0.4"""
+    out = [
+        "# HELP ccr_process_uptime_seconds Seconds since the metrics module was loaded",
+        "# TYPE ccr_process_uptime_seconds gauge",
+        f"ccr_process_uptime_seconds {time.time() - _STARTED:.3f}",
+    ]
+    with _LOCK:
+        for kind, (help_text, label, series) in FAMILIES.items():
+            base = f"ccr_{kind}"
+            items = sorted(series.items())
+            out += [f"# HELP {base}_calls_total {help_text} calls",
+                    f"# TYPE {base}_calls_total counter"]
+            out += [f'{base}_calls_total{{{label}="{_esc(n)}"}} {s.calls}' for n, s in items]
+            out += [f"# HELP {base}_errors_total {help_text} calls that raised or returned an error status",
+                    f"# TYPE {base}_errors_total counter"]
+            out += [f'{base}_errors_total{{{label}="{_esc(n)}"}} {s.errors}' for n, s in items]
+            out += [f"# HELP {base}_in_flight {help_text} calls currently running",
+                    f"# TYPE {base}_in_flight gauge"]
+            out += [f'{base}_in_flight{{{label}="{_esc(n)}"}} {s.in_flight}' for n, s in items]
+            out += [f"# HELP {base}_latency_seconds {help_text} latency",
+                    f"# TYPE {base}_latency_seconds histogram"]
+            for n, s in items:
+                lbl = f'{label}="{_esc(n)}"'
+                for bound, count in zip(LATENCY_BUCKETS, s.buckets):
+                    out.append(f'{base}_latency_seconds_bucket{{{lbl},le="{bound}"}} {count}')
+                out.append(f'{base}_latency_seconds_bucket{{{lbl},le="+Inf"}} {s.calls}')
+                out.append(f'{base}_latency_seconds_sum{{{lbl}}} {s.total:.6f}')
+                out.append(f'{base}_latency_seconds_count{{{lbl}}} {s.calls}')
+        for kind, (help_text, label, series) in BYTE_COUNTERS.items():
+            base = f"ccr_{kind}_bytes_total"
+            out += [f"# HELP {base} {help_text}", f"# TYPE {base} counter"]
+            out += [f'{base}{{{label}="{_esc(n)}"}} {v}' for n, v in sorted(series.items())]
+    return "\n".join(out) + "\n"
+
+
+def routes():
+    """Starlette routes to mount on the Gradio FastAPI app (see app.py)"""
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    async def metrics_endpoint(request):
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return [Route("/metrics", metrics_endpoint, methods=["GET"])]
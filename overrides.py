@@ -1,62 +1,49 @@
 import gradio as gr
 import sqlite3
-import pandas as pd
 import os
 import datetime
-import socket
 import io
 from pathlib import Path
 import base64  # ADD THIS WITH OTHER IMPORTS
-import tempfile  # ADD THIS WITH OTHER IMPORTS
-import json
+import contextlib
+import contextvars
 # ======================
 # EMAIL CONFIGURATION & HELPERS
 # ======================
-import os
 import re
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-import mimetypes
-
-
-# GET IP ADDRESS TO DISPLAY IN EMAILS
-def get_IP():
-    # Auto-detect LAN IP address
-    local_ip = "127.0.0.1"
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(0.1)
-        s.connect(("10.255.255.255", 1))
-        local_ip = s.getsockname()[0]
-        s.close()
-        return local_ip
-    except Exception:
-        try:
-            local_ip = socket.gethostbyname(socket.gethostname())
-            if local_ip.startswith("127.") or ":" in local_ip:
-                local_ip = "YOUR_LOCAL_IP"
-                return local_ip
-        except:
-            local_ip = "YOUR_LOCAL_IP"    
-            return local_ip
-
-MYLOCALIP = get_IP()
+from startup import lazy_import, phase, get_IP, load_gmail_password
+import metrics
+import sqltrace
+import index_advisor
+import changefeed
+import livefilter
+import lookup
+import attachments
+import exportstore
+import exposure
+import history
+import handover
+import assets
+import cluster
+import backup
+import archive
+import digest
+import replication
+import webassets
+
+# Heavy libraries are imported on first use (see startup.py)
+pd = lazy_import("pandas")
+
+# IP ADDRESS TO DISPLAY IN EMAILS (resolved once in startup())
+MYLOCALIP = "127.0.0.1"
 GMAIL_APP_PASSWORD = None
 # SECURITY: Load credentials from environment variables ONLY (NEVER hardcode)
 SENDER_EMAIL = "fabio.matricardi@gmail.com"
 SECRETFILE = "secret.json"
 
-try:
-    with open(SECRETFILE) as f:
-        GMAIL_APP_PASSWORD = json.load(f)['secret_code']
-        #print(secret_code)
-except FileNotFoundError:
-    print("Error: JSON file not found")
-except (json.JSONDecodeError, KeyError) as e:
-    print(f"Error reading secret_code: {e}")
 MANAGER_EMAILS_FILE = "emails.txt"  # File with manager emails (one per line)
 
 def read_manager_emails():
@@ -80,6 +67,18 @@ def read_manager_emails():
     except Exception as e:
         return [], f"❌ Error reading email file: {str(e)}"
 
+def open_overrides_summary_pdf(role):
+    """Smaller stand-in for the full Excel export when it does not fit the email budget"""
+    pdf_path, _ = print_current_table_to_pdf(get_filtered_data({'Closed': 'NO'}), role)
+    return pdf_path
+
+def override_report_slots(role, excel_path, pdf_path, excel_name, pdf_name):
+    """Attachment slots for attachments.plan(): full register (or open-overrides PDF summary), current view"""
+    return [
+        [(excel_name, excel_path), ("OPEN_OVERRIDES_SUMMARY.pdf", lambda: open_overrides_summary_pdf(role))],
+        [(pdf_name, pdf_path)],
+    ]
+
 def send_email_with_exports(recipients, role, excel_path, pdf_path, custom_note=""):
     """Send email with export attachments - returns status message"""
     if not GMAIL_APP_PASSWORD:
@@ -91,6 +90,14 @@ def send_email_with_exports(recipients, role, excel_path, pdf_path, custom_note=
     # Generate timestamp for subject/body
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    # Pick attachments within the per-message budget (VSAT link)
+    packed = attachments.plan(
+        override_report_slots(role, excel_path, pdf_path, "FULL_DATABASE_EXPORT.xlsx", "CURRENT_VIEW_PRINTOUT.pdf"),
+        "FGS_OVERRIDE_EXPORT.zip")
+    if not packed["files"]:
+        attachments.cleanup(packed)
+        return f"❌ Failed to attach required files (missing or over the email budget): {', '.join(packed['omitted'])}"
+    
     # Build email content
     subject = f"FGS Override Register Export - {timestamp}"
     body = f"""FGS Override Register Export
@@ -99,8 +106,7 @@ Timestamp: {timestamp}
 {('Note: ' + custom_note) if custom_note else ''}
 
 Attachments:
-1. FULL_DATABASE_EXPORT.xlsx - Complete override register
-2. CURRENT_VIEW_PRINTOUT.pdf - Filtered table as displayed
+{attachments.describe(packed)}
 
 ⚠️ CONFIDENTIAL: This document contains operational safety data.
 Do not forward outside Congo FLNG personnel.
@@ -117,62 +123,86 @@ IP ADDRESS: {MYLOCALIP}
     message['To'] = ', '.join(recipients[:3]) + (f" + {len(recipients)-3} more" if len(recipients) > 3 else "")
     
     message.attach(MIMEText(body, 'plain'))
-    
-    # Attach files
-    attachments = []
-    for filepath, name in [(excel_path, "FULL_DATABASE_EXPORT.xlsx"), (pdf_path, "CURRENT_VIEW_PRINTOUT.pdf")]:
-        if os.path.exists(filepath):
-            try:
-                ctype, _ = mimetypes.guess_type(filepath)
-                maintype, subtype = (ctype or 'application/octet-stream').split('/', 1)
-                
-                with open(filepath, 'rb') as fp:
-                    part = MIMEBase(maintype, subtype)
-                    part.set_payload(fp.read())
-                encoders.encode_base64(part)
-                part.add_header('Content-Disposition', 'attachment', filename=name)
-                message.attach(part)
-                attachments.append(name)
-            except Exception as e:
-                print(f"⚠️  Attachment error ({name}): {str(e)}")
-    
-    if len(attachments) < 2:
-        return f"❌ Failed to attach required files. Attached: {', '.join(attachments)}"
+    attached = attachments.attach(message, packed)
     
     # Send email
     try:
         with smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=30) as server:
             server.login(SENDER_EMAIL, GMAIL_APP_PASSWORD)
             server.send_message(message, to_addrs=recipients)
-        return f"✅ Email sent to {len(recipients)} recipient(s)! ({', '.join(attachments)})"
+        attachments.record("overrides_export", recipients, packed, len(message.as_bytes()))
+        return f"✅ Email sent to {len(recipients)} recipient(s)! ({', '.join(attached)})"
     except smtplib.SMTPAuthenticationError:
         return "❌ EMAIL AUTH FAILED: Invalid GMAIL_APP_PASSWORD. Contact administrator."
     except Exception as e:
         return f"❌ Email failed: {str(e)[:100]}"
+    finally:
+        attachments.cleanup(packed)
 
 
 
 # ======================
 # DATABASE SETUP
 # ======================
-DB_PATH = "fgs_overrides.db"
+DB_PATH = "fgs_overrides.db"  # first asset; other assets get their own copy (see assets.py)
+LIVE_REFRESH_SECONDS = 5  # open screens check the change feed this often (near-free when idle)
+BACKUP_COLUMNS = ["File", "Taken", "Size (MB)", "Duration (s)", "Longest lock (ms)", "Steps", "Restarts", "Integrity"]
 EXCEL_PATH = "20260129_CCR_BPO_register_FGS_consolidated.xlsx"
 
-manual_file = "manual.md"  # ✅ Fixed typo
-try:
-    with open(manual_file, 'r', encoding='utf-8') as f:
-        usermanual = f.read()
-except FileNotFoundError:
-    # ✅ Fallback content if file missing (prevents startup crash)
-    usermanual = """# 📘 FGS Master Override Register - User Manual
-⚠️ **manual.md not found**  
-Place your user manual in Markdown format at `manual.md` in the application directory.
-"""
+def db_path():
+    """Override database of the current asset"""
+    return assets.path(DB_PATH)
+
+def get_connection():
+    """Open the current asset's override database (statement tracing applied when enabled - see sqltrace.py);
+    inside read_snapshot() every caller gets the snapshot's connection"""
+    snap = _snapshot.get()
+    if snap is not None and snap[0] == db_path():
+        return snap[1]
+    return sqltrace.connect(db_path())
+
+# ======================
+# READ SNAPSHOTS (reports / exports)
+# ======================
+_snapshot = contextvars.ContextVar("overrides_snapshot", default=None)  # (db path, connection, taken at)
+
+class _SnapshotConnection(sqltrace.TracingConnection):
+    """Shared by all reads inside read_snapshot(): close() is deferred to the end of the snapshot"""
+    def close(self):
+        pass
+
+@contextlib.contextmanager
+def read_snapshot():
+    """
+    Every override read in the block sees the register as of one instant: one read transaction
+    on a WAL database, so writers keep committing meanwhile. Use it around all the reads of one
+    report (Excel + PDF + counts); read-only - nested blocks share the outer snapshot.
+    """
+    path = db_path()
+    outer = _snapshot.get()
+    if outer is not None and outer[0] == path:
+        yield
+        return
+    conn = sqlite3.connect(path, factory=_SnapshotConnection, check_same_thread=False)
+    conn.execute("BEGIN")
+    conn.execute("SELECT COUNT(*) FROM overrides").fetchone()  # the snapshot is fixed at this first read
+    token = _snapshot.set((path, conn, datetime.datetime.now()))
+    try:
+        yield
+    finally:
+        _snapshot.reset(token)
+        conn.rollback()
+        sqlite3.Connection.close(conn)
+
+def snapshot_time():
+    """Instant the current snapshot reflects (now outside read_snapshot) - printed on the exports"""
+    snap = _snapshot.get()
+    return snap[2] if snap is not None else datetime.datetime.now()
 
 def init_database():
-    """Initialize SQLite database from Excel file if not exists"""
-    if os.path.exists(DB_PATH):
-        conn = sqlite3.connect(DB_PATH)
+    """Initialize SQLite database from Excel file if not exists (a new asset starts empty)"""
+    if os.path.exists(db_path()):
+        conn = get_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='overrides'")
         if cursor.fetchone():
@@ -180,7 +210,7 @@ def init_database():
             return
         conn.close()
     
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS overrides (
@@ -215,6 +245,12 @@ def init_database():
         cursor.execute("UPDATE overrides SET closed = 'NO' WHERE closed IS NULL")
 
     
+    if not assets.is_default():
+        conn.commit()
+        conn.close()
+        print(f"Database initialized for asset {assets.current()} (empty register)")
+        return
+
     try:
         if os.path.exists(EXCEL_PATH):
             df = pd.read_excel(EXCEL_PATH, skiprows=13, header=0)
@@ -328,23 +364,86 @@ DB_COLUMN_MAPPING = {
 }
 reverse_mapping = {v: k for k, v in DB_COLUMN_MAPPING.items()}
 
-def get_filtered_data(filters, sort_col="entry_no", sort_asc=True):
-    """Fetch filtered data with SQL injection protection"""
-    conn = sqlite3.connect(DB_PATH)
-    
+# Columns with a closed set of stored values: an exact filter value becomes an indexable
+# equality term (inlined literal from this whitelist, so partial indexes can match)
+EXACT_MATCH_VALUES = {
+    'approved': ["YES", "NO"],
+    'closed': ["YES", "NO"],
+    'priority': ["critical", "high", "medium", "low"],
+}
+
+def new_entry_defaults():
+    """Field values a new entry starts with (Create New form and API creates)"""
+    now = datetime.datetime.now()
+    return {
+        'Approved': 'NO',
+        'Closed': 'NO',
+        'Time In': now.strftime("%m/%d/%y %H:%M"),
+        'Alarm': "FGS bypass",
+        'Message': "MOS active",
+        'Priority': "critical",
+        'Date On': now.strftime("%m/%d/%y"),
+    }
+
+def canonical_value(db_col, value):
+    """Stored spelling of a closed-set value ('High' -> 'high', ' yes' -> 'YES'); anything else unchanged.
+    Exact filters compare with '=', so every write path stores this form."""
+    allowed = {v.upper(): v for v in EXACT_MATCH_VALUES.get(db_col, [])}
+    return allowed.get(str(value if value is not None else "").strip().upper(), value)
+
+def normalize_exact_values(conn):
+    """One-off fix-up of rows saved before canonical_value() (e.g. imported 'Critical'). Returns rows changed."""
+    changed = 0
+    for table in ("overrides", archive.ARCHIVE_TABLE):
+        for db_col, values in EXACT_MATCH_VALUES.items():
+            for value in values:
+                changed += conn.execute(f"UPDATE {table} SET {db_col} = ? WHERE upper(trim({db_col})) = ? AND {db_col} <> ?",
+                                        (value, value.upper(), value)).rowcount
+    conn.commit()
+    return changed
+
+def build_filter_clauses(filters):
+    """Return (where_clauses, params, like_cols, exact_terms) for the UI filter boxes"""
     where_clauses = []
     params = []
+    like_cols = []
+    exact_terms = {}
     for col, val in filters.items():
         if val and val.strip():
             db_col = DB_COLUMN_MAPPING.get(col, col.replace(" ", "_").lower())
-            where_clauses.append(f"{db_col} LIKE ?")
-            params.append(f"%{val}%")
+            allowed = {v.upper(): v for v in EXACT_MATCH_VALUES.get(db_col, [])}
+            if val.strip().upper() in allowed:
+                exact_terms[db_col] = allowed[val.strip().upper()]
+                where_clauses.append(f"{db_col} = '{exact_terms[db_col]}'")
+            else:
+                like_cols.append(db_col)
+                where_clauses.append(f"{db_col} LIKE ?")
+                params.append(f"%{val}%")
+    return where_clauses, params, like_cols, exact_terms
+
+# Exact-match values per display column, in the form livefilter.refine() expects
+LIVE_EXACT_VALUES = {
+    col: {v.upper(): v for v in EXACT_MATCH_VALUES[db_col]}
+    for col, db_col in DB_COLUMN_MAPPING.items() if db_col in EXACT_MATCH_VALUES
+}
+LIVE_FILTER_REQUESTS = livefilter.LatestOnly()
+
+def get_filtered_data(filters, sort_col="entry_no", sort_asc=True, entry_nos=None, include_archive=False):
+    """Fetch filtered data with SQL injection protection (entry_nos: restrict to these rows;
+    include_archive: search the archived entries too - see archive.py)"""
+    conn = get_connection()
+    
+    where_clauses, params, _, _ = build_filter_clauses(filters)
+    if entry_nos is not None:
+        where_clauses.append(f"entry_no IN ({', '.join(['?'] * len(entry_nos))})" if entry_nos else "0")
+        params += [int(n) for n in entry_nos]
     
     where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
     order_sql = f"ORDER BY {sort_col} {'ASC' if sort_asc else 'DESC'}"
     
-    query = f"SELECT * FROM overrides {where_sql} {order_sql}"
-    df = pd.read_sql_query(query, conn, params=params)
+    query = f"SELECT * FROM {archive.source(include_archive)} {where_sql} {order_sql}"
+    with metrics.db_timer("get_filtered_data"):
+        df = pd.read_sql_query(query, conn, params=params)
     conn.close()
     
     df = df.rename(columns=reverse_mapping)
@@ -355,10 +454,19 @@ def get_filtered_data(filters, sort_col="entry_no", sort_asc=True):
     
     return df[DISPLAY_COLUMNS] if not df.empty else pd.DataFrame(columns=DISPLAY_COLUMNS)
 
-def get_entry_by_no(entry_no):
+def get_filtered_data_all_assets(filters, sort_col="entry_no", sort_asc=True):
+    """Federated read: the same filtered query on every asset partition (in parallel), merged"""
+    frames = [df.assign(Asset=asset) for asset, df in assets.federated(get_filtered_data, filters, sort_col, sort_asc)]
+    merged = pd.concat([f for f in frames if not f.empty], ignore_index=True) if any(not f.empty for f in frames) \
+        else pd.DataFrame(columns=["Asset"] + DISPLAY_COLUMNS)
+    return merged[["Asset"] + DISPLAY_COLUMNS]
+
+def get_entry_by_no(entry_no, include_archive=False):
     """Fetch single entry details"""
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM overrides WHERE entry_no = ?", conn, params=(entry_no,))
+    conn = get_connection()
+    with metrics.db_timer("get_entry_by_no"):
+        df = pd.read_sql_query(f"SELECT * FROM {archive.source(include_archive)} WHERE entry_no = ?", conn,
+                               params=(entry_no,))
     conn.close()
     if df.empty:
         return None
@@ -366,17 +474,21 @@ def get_entry_by_no(entry_no):
     record = df.iloc[0].to_dict()
     return {reverse_mapping.get(k, k): v for k, v in record.items()}
 
-def save_entry(data, is_new, current_user):
-    """Insert or update entry"""
-    conn = sqlite3.connect(DB_PATH)
+def save_entry(data, is_new, current_user, conn=None):
+    """Insert or update entry (pass conn to batch several saves in one transaction)"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
     cursor = conn.cursor()
     
     fields = {}
     for ui_col, db_col in DB_COLUMN_MAPPING.items():
-        fields[db_col] = data.get(ui_col, "")
+        fields[db_col] = canonical_value(db_col, data.get(ui_col, ""))
     
     if is_new:
-        cursor.execute("SELECT MAX(entry_no) FROM overrides")
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")  # hold the write lock from MAX() to INSERT (other workers)
+        cursor.execute(f"SELECT MAX(entry_no) FROM {archive.ALL_VIEW}")  # archived numbers are never reused
         max_no = cursor.fetchone()[0] or 0
         entry_no = max_no + 1
         fields['entry_no'] = entry_no
@@ -386,26 +498,39 @@ def save_entry(data, is_new, current_user):
     if not fields['requested_by'] and is_new:
         fields['requested_by'] = current_user
     
-    if is_new:
-        cols = ', '.join(fields.keys())
-        placeholders = ', '.join(['?'] * len(fields))
-        query = f"INSERT INTO overrides ({cols}) VALUES ({placeholders})"
-        cursor.execute(query, list(fields.values()))
-    else:
-        set_clause = ', '.join([f"{k} = ?" for k in fields.keys() if k != 'entry_no'])
-        query = f"UPDATE overrides SET {set_clause} WHERE entry_no = ?"
-        cursor.execute(query, [fields[k] for k in fields.keys() if k != 'entry_no'] + [entry_no])
-    
-    conn.commit()
-    conn.close()
+    with metrics.db_timer("save_entry"):
+        before = None if is_new else history.current_record(conn, entry_no)
+        if is_new:
+            cols = ', '.join(fields.keys())
+            placeholders = ', '.join(['?'] * len(fields))
+            query = f"INSERT INTO overrides ({cols}) VALUES ({placeholders})"
+            cursor.execute(query, list(fields.values()))
+        else:
+            set_clause = ', '.join([f"{k} = ?" for k in fields.keys() if k != 'entry_no'])
+            query = f"UPDATE overrides SET {set_clause} WHERE entry_no = ?"
+            cursor.execute(query, [fields[k] for k in fields.keys() if k != 'entry_no'] + [entry_no])
+            if cursor.rowcount == 0 and archive.is_archived(conn, entry_no):
+                if own_conn:
+                    conn.rollback()
+                    conn.close()
+                raise ValueError(f"entry #{entry_no} is archived (read-only)")
+        history.record(conn, entry_no, 'I' if is_new else 'U', current_user, before, {**fields, 'entry_no': entry_no})
+        
+        if own_conn:
+            conn.commit()
+    if own_conn:
+        conn.close()
     return entry_no
 
-def delete_entry(entry_no):
-    """Delete entry by number"""
-    conn = sqlite3.connect(DB_PATH)
+def delete_entry(entry_no, current_user=None):
+    """Delete entry by number (the deletion stays in the change history)"""
+    conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM overrides WHERE entry_no = ?", (entry_no,))
-    conn.commit()
+    with metrics.db_timer("delete_entry"):
+        cursor.execute("DELETE FROM overrides WHERE entry_no = ?", (entry_no,))
+        if cursor.rowcount:
+            history.record(conn, int(entry_no), 'D', current_user, None, None)
+        conn.commit()
     conn.close()
 
 # ======================
@@ -417,18 +542,16 @@ def export_entire_database(role):
         return None, "❌ Not authenticated. Please login first."
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query("SELECT * FROM overrides", conn)
+        conn = get_connection()
+        with metrics.db_timer("export_entire_database"):
+            df = pd.read_sql_query(f"SELECT * FROM {archive.ALL_VIEW} ORDER BY entry_no", conn)
         conn.close()
         
         df = df.rename(columns=reverse_mapping)
         df = df[[col for col in DISPLAY_COLUMNS if col in df.columns]]
         
-        # Create temporary file with proper cleanup
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"FGS_Export_{timestamp}.xlsx"
-        temp_dir = tempfile.gettempdir()
-        filepath = os.path.join(temp_dir, filename)
+        # Unique file in the managed export store (evicted by age/size - see exportstore.py)
+        filepath = exportstore.new_path("override_excel", "FGS_Export", "xlsx")
         
         # Write Excel file
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
@@ -437,7 +560,7 @@ def export_entire_database(role):
                 writer, sheet_name='Overrides', index=False, header=False
             )
             # Timestamp row
-            pd.DataFrame([[f"Exported on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"]]).to_excel(
+            pd.DataFrame([[f"Exported on: {snapshot_time().strftime('%Y-%m-%d %H:%M:%S')}"]]).to_excel(
                 writer, sheet_name='Overrides', startrow=1, index=False, header=False
             )
             # Data rows
@@ -458,11 +581,9 @@ def print_current_table_to_pdf(table_df, role):
         return None, "❌ PDF library not installed. Run: pip install fpdf2"
     
     try:
-        # Create temp file path (Gradio 4.x compatible)
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        filename = f"FGS_Printout_A3_{timestamp}.pdf"
-        temp_dir = tempfile.gettempdir()
-        filepath = os.path.join(temp_dir, filename)
+        # Unique file in the managed export store (evicted by age/size - see exportstore.py)
+        filepath = exportstore.new_path("override_pdf", "FGS_Printout_A3", "pdf")
+        timestamp = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')  # document ID on the printout
         
         # A3 LANDSCAPE: 420mm width × 297mm height (vs A4's 297×210)
         pdf = FPDF(orientation='L', unit='mm', format='A3')
@@ -473,7 +594,7 @@ def print_current_table_to_pdf(table_df, role):
         pdf.cell(0, 12, text="CCR MASTER OVERRIDE REGISTER - OFFICIAL PRINTOUT", 
                  new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
         pdf.set_font("Helvetica", "", 11)
-        gen_timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        gen_timestamp = snapshot_time().strftime("%Y-%m-%d %H:%M:%S")
         pdf.cell(0, 9, text=f"Generated on: {gen_timestamp} | User: {role} | Format: A3 Landscape", 
                  new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
         pdf.ln(8)
@@ -602,21 +723,26 @@ def import_excel_data(file_path, role):
                 df[col] = ""
         
         df = df[required_cols].copy()
+        df['priority'] = df['priority'].apply(lambda v: canonical_value('priority', "" if pd.isna(v) else v))
         df['entry_no'] = pd.to_numeric(df['entry_no'], errors='coerce').fillna(0).astype(int)
         df = df[df['entry_no'] > 0].drop_duplicates(subset=['entry_no'])
         
         if df.empty:
             return "❌ No valid entries found in file. Check format matches original database."
         
-        conn = sqlite3.connect(DB_PATH)
-        existing_nos = pd.read_sql_query("SELECT entry_no FROM overrides", conn)['entry_no'].tolist()
+        conn = get_connection()
+        with metrics.db_timer("import_existing_entry_nos"):
+            existing_nos = pd.read_sql_query(f"SELECT entry_no FROM {archive.ALL_VIEW}", conn)['entry_no'].tolist()
         new_entries = df[~df['entry_no'].isin(existing_nos)]
         
         if new_entries.empty:
             conn.close()
             return "ℹ️ All entries already exist in database. No new entries added."
         
-        new_entries.to_sql('overrides', conn, if_exists='append', index=False)
+        with metrics.db_timer("import_append"):
+            new_entries.to_sql('overrides', conn, if_exists='append', index=False)
+            history.record_many(conn, new_entries.to_dict('records'), "import (admin)")
+            conn.commit()
         conn.close()
         
         return f"✅ Import successful! Added {len(new_entries)} new entries. ({len(df) - len(new_entries)} duplicates skipped.)"
@@ -649,19 +775,30 @@ def style_dataframe_for_display(df):
     return df.style.apply(row_styler, axis=1)
 
 
+def view_in_snapshot(table_df):
+    """Rows of the on-screen table re-read from the database (same order) - inside read_snapshot()
+    this makes the current-view PDF match the full export"""
+    if table_df is None or table_df.empty or 'No' not in table_df.columns:
+        return table_df
+    order = [int(n) for n in pd.to_numeric(table_df['No'], errors='coerce').dropna()]
+    fresh = get_filtered_data({}, entry_nos=order, include_archive=True)
+    fresh.index = pd.to_numeric(fresh['No'], errors='coerce').astype(int)
+    return fresh.reindex([n for n in order if n in fresh.index]).reset_index(drop=True)
+
 def generate_email_exports(role, table_df):
     """
     Generate fresh Excel + PDF exports for email (without UI updates)
     Returns: (excel_path, pdf_path, error_message)
     """
     try:
-        # Generate Excel export (FULL database)
-        excel_path, _ = export_entire_database(role)
-        if excel_path is None:
-            return None, None, "❌ Excel export failed"
-        
-        # Generate PDF export (CURRENT filtered view)
-        pdf_path, _ = print_current_table_to_pdf(table_df, role)
+        with read_snapshot():
+            # Generate Excel export (FULL database)
+            excel_path, _ = export_entire_database(role)
+            if excel_path is None:
+                return None, None, "❌ Excel export failed"
+            
+            # Generate PDF export (CURRENT filtered view, re-read from the same snapshot)
+            pdf_path, _ = print_current_table_to_pdf(view_in_snapshot(table_df), role)
         if pdf_path is None:
             # Cleanup Excel if PDF fails
             try: os.remove(excel_path) 
@@ -673,10 +810,31 @@ def generate_email_exports(role, table_df):
         return None, None, f"❌ Export generation failed: {str(e)}"
 
 
+def get_exposure():
+    """Time-in-bypass statistics, computed once per register version (see exposure.py)"""
+    def load_frame():
+        conn = get_connection()
+        try:
+            with metrics.db_timer("exposure_frame"):
+                return pd.read_sql_query(
+                    "SELECT entry_no, closed, time_in, module_parameter, description, priority, "
+                    f"date_on, requested_by, date_off FROM {archive.ALL_VIEW}", conn)
+        finally:
+            conn.close()
+    if _snapshot.get() is not None:
+        conn = get_connection()
+        try:
+            version = changefeed.version_of(conn)  # the snapshot's own version: its data is cached under it
+        finally:
+            conn.close()
+    else:
+        version = changefeed.overrides_feed.version()
+    return exposure.exposure_cache.stats(version, load_frame)
+
+
 # ======================
 # SCHEDULER SECTION
 # ======================
-import schedule
 import threading
 import time
 import pytz
@@ -688,23 +846,54 @@ T2 = "10:00"
 T1tracker = f"{T1}"
 T2tracker = f"{T2}"
 SCHEDULER_TIMEZONE = pytz.timezone('Africa/Brazzaville')  # Congo Republic timezone
-LAST_SENT_TRACKER = {T1tracker: None, T2tracker: None}  # Prevent duplicate sends on restart
+SCHEDULED_REPORT_MODE = "delta"  # "delta": only changes since the last send | "full": whole register every time
+REPORT_MARK = "overrides_scheduled"  # high-water mark name in handover.MARKS_FILE
+DIGEST_COLUMNS = ["No", "Module Parameter", "Description", "Priority", "Requested By", "Date On"]
+DIGEST_FIELDS = "entry_no, module_parameter, description, priority, requested_by, date_on"
+
+def override_digest(timestamp, report_title, active, changed_rows, exposure_stats, attachments_text):
+    """HTML digest of a scheduled report (call inside its read_snapshot: the tables match the counts)"""
+    conn = get_connection()
+    try:
+        open_total, pending_total = conn.execute(
+            "SELECT COUNT(*), COUNT(CASE WHEN approved = 'NO' THEN 1 END) FROM overrides WHERE closed = 'NO'").fetchone()
+        open_rows = conn.execute(
+            f"SELECT {DIGEST_FIELDS}, approved FROM overrides WHERE closed = 'NO' "
+            f"ORDER BY approved = 'YES', entry_no DESC LIMIT ?", (digest.TABLE_ROWS,)).fetchall()
+    finally:
+        conn.close()
+    sections = [digest.section(
+        "Open overrides (pending approval first)", DIGEST_COLUMNS, [r[:-1] for r in open_rows], total=open_total,
+        colors=["#fff7b3" if r[-1] == 'NO' else "#dff5df" for r in open_rows], empty="No open overrides")]
+    for title, rows in changed_rows:
+        sections.append(digest.section(title, DIGEST_COLUMNS, rows))
+    longest = exposure_stats["longest"]
+    sections.append(digest.section(
+        "Longest open bypasses", ["No", "Module Parameter", "Description", "Priority", "Since", "Open days"],
+        longest[["No", "Module Parameter", "Description", "Priority", "Since", "Open days"]].values.tolist()))
+    return digest.render(
+        f"{assets.subject_tag()}CCR Override Register - {report_title}",
+        f"{assets.current()} | {timestamp} (Congo FLNG Time) | schedule {T1} and {T2}",
+        stats=[("Active", active), ("Awaiting approval", pending_total), ("Open bypass-hours", f"{exposure_stats['open_hours']:,.0f}")],
+        sections=sections, attachments=attachments_text,
+        footer=f"CONFIDENTIAL - operational safety data, do not forward outside Congo FLNG personnel. "
+               f"Full register on demand: CCR app at {MYLOCALIP}")
 
 def send_scheduled_email():
-    """Automated daily email to managers with FULL exports (Overrides + Shutdown Logs)"""
+    """Automated daily email to managers: overrides created / approved / closed since the last send"""
     try:
         now = dt.now(SCHEDULER_TIMEZONE)
         timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
         schedule_time = T1 if now.hour < 12 else T2
         
         today = now.date()
-        if LAST_SENT_TRACKER[schedule_time] == today:
-            print(f"[SCHEDULER] Skipped duplicate send for {schedule_time} on {today}")
+        # Run-once per slot across all workers (and across a leader failover) - see cluster.py
+        if not cluster.claim(f"{REPORT_MARK}@{assets.current()}", f"{today} {schedule_time}"):
+            print(f"[SCHEDULER] Skipped duplicate send for {schedule_time} on {today} ({assets.current()})")
             return
-        LAST_SENT_TRACKER[schedule_time] = today
         
         print(f"\n{'='*60}")
-        print(f"[SCHEDULER] 📧 Sending INTEGRATED REPORT at {timestamp} ({schedule_time})")
+        print(f"[SCHEDULER] 📧 Sending INTEGRATED REPORT at {timestamp} ({schedule_time}) - {assets.current()}")
         print(f"{'='*60}")
         
         managers, error = read_manager_emails()
@@ -715,31 +904,111 @@ def send_scheduled_email():
             print("[SCHEDULER] ❌ No valid manager emails found")
             return
         
-        # ===== GENERATE OVERRIDE EXPORTS =====
-        excel_path, _ = export_entire_database(role="system")
-        if not excel_path:
-            raise Exception("Override Excel export failed")
-        
-        full_df = get_filtered_data({})
-        pdf_path, _ = print_current_table_to_pdf(full_df, role="system")
-        if not pdf_path:
-            os.remove(excel_path)
-            raise Exception("Override PDF export failed")
-        
-        
-        # ===== BUILD INTEGRATED EMAIL =====
-        custom_note = (
-            f"AUTOMATED SCHEDULED REPORT\n"
-            f"Generated at: {timestamp} (Congo FLNG Time)\n"
-            f"Schedule: Daily at {T1} and {T2}\n"
-            f"-----------------------------------\n"
-            f"IP ADDRESS: {MYLOCALIP}\n"
-            f"\nOVERRIDES SUMMARY:\n"
-            f"  • Total Active: {len(full_df[full_df['Closed'] == 'NO'])}\n"
-            f"  • Pending Approvals (Yellow): {len(full_df[full_df['Approved'] == 'NO'])}\n"
-        )
+        # One read snapshot for the whole report: counts, delta, Excel and PDF agree (see read_snapshot)
+        with read_snapshot():
+            # ===== WHAT CHANGED SINCE THE LAST SUCCESSFUL SEND (see handover.py) =====
+            mark = handover.load_mark(REPORT_MARK) if SCHEDULED_REPORT_MODE == "delta" else None
+            conn = get_connection()
+            try:
+                if mark:
+                    last_seq, delta = handover.override_changes(conn, mark["seq"])
+                else:
+                    last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM override_history").fetchone()[0]
+                active, pending = conn.execute(
+                    "SELECT COUNT(CASE WHEN closed = 'NO' THEN 1 END), COUNT(CASE WHEN approved = 'NO' THEN 1 END) "
+                    "FROM overrides").fetchone()
+            finally:
+                conn.close()
+        
+            generated = []
+            if mark:
+                # ===== SHIFT DELTA: only created / approved / closed overrides =====
+                listed = sorted(set(delta["created"] + delta["approved"] + delta["closed"]))
+                delta_df = get_filtered_data({}, entry_nos=listed, include_archive=True)
+                rows = {int(r['No']): r for _, r in delta_df.iterrows()}
+            
+                def lines(entry_nos):
+                    return [f"#{n} {rows[n]['Module Parameter']} - {str(rows[n]['Description'])[:60]} "
+                            f"(priority {rows[n]['Priority'] or '-'}, requested by {rows[n]['Requested By'] or '-'})"
+                            for n in entry_nos if n in rows]
+            
+                changes_text = "\n".join([
+                    handover.listing("NEW OVERRIDES", lines(delta["created"])),
+                    handover.listing("APPROVED", lines(delta["approved"])),
+                    handover.listing("CLOSED", lines(delta["closed"])),
+                ])
+                if delta["edited"] or delta["deleted"]:
+                    changes_text += (f"\nOther edits: {len(delta['edited'])} override(s)"
+                                     + (f" | Deleted: {', '.join(f'#{n}' for n in delta['deleted'])}" if delta["deleted"] else ""))
+                changed_rows = [(title, [[n] + [rows[n][c] for c in DIGEST_COLUMNS[1:]] for n in delta[key] if n in rows])
+                                for title, key in (("New overrides", "created"), ("Approved", "approved"),
+                                                   ("Closed", "closed"))]
+                slots = []
+                if not delta_df.empty and digest.ATTACH_EXPORTS:
+                    pdf_path, _ = print_current_table_to_pdf(delta_df, role="system")
+                    generated.append(pdf_path)
+                    slots.append([("OVERRIDES_SHIFT_CHANGES.pdf", pdf_path)])
+                report_title = f"CHANGES SINCE LAST REPORT ({mark['sent_at']})"
+                subject = f"{assets.subject_tag()}CCR SHIFT HANDOVER - Overrides changes ({timestamp})"
+            else:
+                # ===== FIRST REPORT (no mark yet) or full mode: whole register =====
+                slots, changed_rows = [], []
+                if digest.ATTACH_EXPORTS:
+                    excel_path, _ = export_entire_database(role="system")
+                    if not excel_path:
+                        raise Exception("Override Excel export failed")
+                    generated.append(excel_path)
+                
+                    full_df = get_filtered_data({})
+                    pdf_path, _ = print_current_table_to_pdf(full_df, role="system")
+                    if not pdf_path:
+                        os.remove(excel_path)
+                        raise Exception("Override PDF export failed")
+                    generated.append(pdf_path)
+                    slots = override_report_slots("system", excel_path, pdf_path,
+                                                  "OVERRIDES_FULL_DATABASE.xlsx", "OVERRIDES_CURRENT_VIEW.pdf")
+                changes_text = ("Full register attached" if digest.ATTACH_EXPORTS else "Full register on demand in the CCR app") \
+                    + (" (first report - later reports list only the changes)" if SCHEDULED_REPORT_MODE == "delta" else "")
+                report_title = "FULL REGISTER"
+                subject = f"{assets.subject_tag()}CCR INTEGRATED REPORT - Overrides Log ({timestamp})"
+        
+            # ===== BUILD INTEGRATED EMAIL =====
+            exposure_stats = get_exposure()
+            custom_note = (
+                f"AUTOMATED SCHEDULED REPORT\n"
+                f"Generated at: {timestamp} (Congo FLNG Time)\n"
+                f"Schedule: Daily at {T1} and {T2}\n"
+                f"-----------------------------------\n"
+                f"IP ADDRESS: {MYLOCALIP}\n"
+                f"\nOVERRIDES SUMMARY:\n"
+                f"  • Total Active: {active}\n"
+                f"  • Pending Approvals (Yellow): {pending}\n"
+                f"\n{report_title}:\n"
+                f"{changes_text}\n"
+                f"\nBYPASS EXPOSURE:\n"
+                f"{exposure.summary_text(exposure_stats)}\n"
+            )
+        
+            # Pick attachments within the per-message budget (VSAT link)
+            packed = attachments.plan(slots, "OVERRIDES_REPORT.zip")
+            no_attachment = ('(none - no overrides created, approved or closed)' if digest.ATTACH_EXPORTS
+                             else '(none - exports are on demand in the CCR app)')
+            html = override_digest(timestamp, report_title, active, changed_rows, exposure_stats,
+                                   attachments.describe(packed) or no_attachment)
+        generated += packed["temp"]
+        
+        def cleanup_files():
+            for filepath in generated:
+                try:
+                    if filepath and os.path.exists(filepath):
+                        os.remove(filepath)
+                except Exception as e:
+                    print(f"[SCHEDULER] Cleanup warning: {str(e)}")
+        
+        if slots and not packed["files"]:
+            cleanup_files()
+            raise Exception(f"Failed to attach required files (missing or over the email budget): {', '.join(packed['omitted'])}")
         
-        subject = f"CCR INTEGRATED REPORT - Overrides Log ({timestamp})"
         body = f"""CCR OPERATOR SYSTEM AUTOMATED REPORT
 Generated by: System Scheduler
 Timestamp: {timestamp} (Congo FLNG Time)
@@ -747,9 +1016,9 @@ Schedule: Daily at {T1} and {T2} Congo Time
 
 {custom_note}
 
-📎 ATTACHMENTS (2 FILES):
-1. OVERRIDES_FULL_DATABASE.xlsx - Complete override register
-2. OVERRIDES_CURRENT_VIEW.pdf - Filtered table (A3 Landscape)
+📎 ATTACHMENTS:
+{attachments.describe(packed) or no_attachment}
+Full database export on demand: CCR app at {MYLOCALIP} -> 📋 Main Register (export) or 📧 Custom Email
 
 ⚠️ CONFIDENTIAL: Contains operational safety data. Do not forward outside Congo FLNG personnel.
 ---
@@ -757,41 +1026,11 @@ Automated message from CCR Master Override Register System
 IP ADDRESS: {MYLOCALIP}
 """
         
-        # Create message with all 4 attachments
-        message = MIMEMultipart()
+        message = digest.message(body, html)  # plain text + HTML digest alternatives
         message['Subject'] = subject
         message['From'] = SENDER_EMAIL
         message['To'] = ', '.join(managers[:3]) + (f" + {len(managers)-3} more" if len(managers) > 3 else "")
-        message.attach(MIMEText(body, 'plain'))
-        
-        all_attachments = [
-            (excel_path, "OVERRIDES_FULL_DATABASE.xlsx"),
-            (pdf_path, "OVERRIDES_CURRENT_VIEW.pdf"),
-        ]
-        
-        attached_names = []
-        for filepath, name in all_attachments:
-            if os.path.exists(filepath):
-                try:
-                    ctype, _ = mimetypes.guess_type(filepath)
-                    maintype, subtype = (ctype or 'application/octet-stream').split('/', 1)
-                    with open(filepath, 'rb') as fp:
-                        part = MIMEBase(maintype, subtype)
-                        part.set_payload(fp.read())
-                    encoders.encode_base64(part)
-                    part.add_header('Content-Disposition', 'attachment', filename=name)
-                    message.attach(part)
-                    attached_names.append(name)
-                except Exception as e:
-                    print(f"[SCHEDULER] Attachment error ({name}): {str(e)}")
-        
-        if len(attached_names) < 2:
-            for filepath, _ in all_attachments:
-                try:
-                    if filepath and os.path.exists(filepath):
-                        os.remove(filepath)
-                except: pass
-            raise Exception(f"Failed to attach required files. Attached: {', '.join(attached_names)}")
+        attached_names = attachments.attach(message, packed)
         
         # Send email
         try:
@@ -799,25 +1038,18 @@ IP ADDRESS: {MYLOCALIP}
                 server.login(SENDER_EMAIL, GMAIL_APP_PASSWORD)
                 server.send_message(message, to_addrs=managers)
         except smtplib.SMTPAuthenticationError:
-            for filepath, _ in all_attachments:
-                try:
-                    if filepath and os.path.exists(filepath):
-                        os.remove(filepath)
-                except: pass
+            cleanup_files()
             raise Exception("EMAIL AUTH FAILED: Invalid GMAIL_APP_PASSWORD")
+        attachments.record("overrides_scheduled", managers, packed, len(message.as_bytes()))
+        handover.save_mark(REPORT_MARK, {"seq": last_seq}, timestamp)
         
         # Cleanup ALL temp files
-        for filepath, _ in all_attachments:
-            try:
-                if filepath and os.path.exists(filepath):
-                    os.remove(filepath)
-            except Exception as e:
-                print(f"[SCHEDULER] Cleanup warning: {str(e)}")
+        cleanup_files()
         
         # Log success
         recipient_count = len(managers)
         print(f"[SCHEDULER] ✅ SUCCESS: Integrated report sent to {recipient_count} manager(s)")
-        print(f"              Overrides: OVERRIDES_FULL_DATABASE.xlsx + OVERRIDES_CURRENT_VIEW.pdf")
+        print(f"              Overrides: {', '.join(attached_names)}")
         print(f"              Next scheduled send: {T2 if schedule_time == T1 else '{T1} (next day)'}")
         print("="*60 + "\n")
         
@@ -828,6 +1060,8 @@ IP ADDRESS: {MYLOCALIP}
 
 def start_email_scheduler():
     """Initialize background scheduler with Congo timezone awareness"""
+    import schedule
+
     def run_scheduler():
         print("\n" + "="*70)
         print("📧 SCHEDULED EMAIL SYSTEM INITIALIZED")
@@ -835,13 +1069,14 @@ def start_email_scheduler():
         print(f"📍 Timezone: {SCHEDULER_TIMEZONE}")
         print(f"⏰ Schedule: Daily at {T1} and {T2} Congo Time")
         print(f"📬 Recipients: Managers from '{MANAGER_EMAILS_FILE}'")
-        print(f"📎 Attachments: FULL_DATABASE_EXPORT.xlsx + CURRENT_VIEW_PRINTOUT.pdf")
+        print(f"📎 Report mode: {SCHEDULED_REPORT_MODE} (changes since the last send; full export on the first run)")
         print(f"🌐 ORIGIN IP ADDRESS:  {MYLOCALIP}")
         print("-"*70)
         
         # Schedule jobs using Congo time
-        schedule.every().day.at(T1, SCHEDULER_TIMEZONE).do(send_scheduled_email)
-        schedule.every().day.at(T2, SCHEDULER_TIMEZONE).do(send_scheduled_email)
+        scheduled_job = metrics.instrument(cluster.leader_only(assets.for_each(send_scheduled_email)), kind="job")
+        schedule.every().day.at(T1, SCHEDULER_TIMEZONE).do(scheduled_job)
+        schedule.every().day.at(T2, SCHEDULER_TIMEZONE).do(scheduled_job)
         
         #######################################################
         #######################################################
@@ -866,54 +1101,85 @@ def start_email_scheduler():
 
 
 # ======================
-# GRADIO INTERFACE
+# STARTUP PHASE (explicit - nothing below runs at import time)
 # ======================
-    
-with gr.Blocks(title="CCR Override Register") as demo:
-    init_database()
+def startup():
+    """Run the one-off startup I/O: network probe, secrets, database, email scheduler"""
+    global MYLOCALIP, GMAIL_APP_PASSWORD
+
+    with phase("overrides: network IP probe"):
+        MYLOCALIP = get_IP()
+    with phase("overrides: load secret.json"):
+        GMAIL_APP_PASSWORD = load_gmail_password(SECRETFILE)
+    for asset in assets.names():
+        with assets.using(asset):
+            with phase(f"overrides: init_database [{asset}]"):
+                init_database()
+                conn = get_connection()
+                conn.execute("PRAGMA journal_mode=WAL")  # report snapshots never block writers (persistent)
+                conn.close()
+            with phase(f"overrides: lookup indexes [{asset}]"):
+                conn = get_connection()
+                lookup.ensure_indexes(conn)
+                conn.close()
+            with phase(f"overrides: archive table [{asset}]"):
+                conn = get_connection()
+                archive.ensure_schema(conn)
+                conn.commit()
+                conn.close()
+            with phase(f"overrides: normalize priority/approved/closed [{asset}]"):
+                conn = get_connection()
+                if normalize_exact_values(conn):
+                    print(f"🔧 Normalized priority/approved/closed spelling in {asset} (exact filters are case-sensitive)")
+                conn.close()
+            with phase(f"overrides: change history baseline [{asset}]"):
+                conn = get_connection()
+                history.ensure_baseline(conn)
+                conn.close()
+            with phase(f"overrides: replication log [{asset}]"):
+                replication.init(get_connection)
+            with phase(f"overrides: attach change feed [{asset}]"):
+                changefeed.overrides_feed.attach(db_path())
+                changefeed.overrides_feed.prune()
+    with phase("overrides: export store sweeper"):
+        exportstore.start_sweeper()
+    with phase("overrides: database backups"):
+        # Leader only in multi-worker mode (see cluster.py); each asset's database in turn
+        cluster.when_leader("Database backups", lambda: backup.start(db_path, job=cluster.leader_only))
+    with phase("overrides: archive closed entries"):
+        cluster.when_leader("Override archive", lambda: archive.start(get_connection, job=cluster.leader_only))
+    if replication.ENABLED:
+        with phase("overrides: replication shipper"):
+            cluster.when_leader("Replication", lambda: replication.start(job=cluster.leader_only))
+
     # ======================
-    # ACTIVATE EMAIL SCHEDULER (ADD THIS SECTION)
+    # ACTIVATE EMAIL SCHEDULER
     # ======================
-    MYLOCALIP = get_IP()
-    local_ip = "127.0.0.1"
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(0.1)
-        s.connect(("10.255.255.255", 1))
-        local_ip = s.getsockname()[0]
-        s.close()
-    except Exception:
+    with phase("overrides: start email scheduler"):
         try:
-            local_ip = socket.gethostbyname(socket.gethostname())
-            if local_ip.startswith("127.") or ":" in local_ip:
-                local_ip = "YOUR_LOCAL_IP"
-        except:
-            local_ip = "YOUR_LOCAL_IP"    
-    try:
-        # Verify email configuration before starting scheduler
-        if not GMAIL_APP_PASSWORD:
-            print("\n" + "⚠️  " + "="*68)
-            print("⚠️  EMAIL SCHEDULER DISABLED: Set GMAIL_APP_PASSWORD environment variable")
-            print("⚠️  To enable automated reports:")
-            print("⚠️    GMAIL_APP_PASSWORD='your_16_digit_code'")
-            print("⚠️  " + "="*68 + "\n")
-        elif not os.path.exists(MANAGER_EMAILS_FILE):
-            print(f"\n⚠️  EMAIL SCHEDULER DISABLED: Create '{MANAGER_EMAILS_FILE}' with manager emails\n")
-        else:
-            # START SCHEDULER (runs in background thread)
-            scheduler_thread = start_email_scheduler()
-            print(f"✅ Email scheduler thread started: {scheduler_thread.name}")
-    except Exception as e:
-        print(f"\n❌ Scheduler initialization failed: {str(e)}\n")
+            # Verify email configuration before starting scheduler
+            if not GMAIL_APP_PASSWORD:
+                print("\n" + "⚠️  " + "="*68)
+                print("⚠️  EMAIL SCHEDULER DISABLED: Set GMAIL_APP_PASSWORD environment variable")
+                print("⚠️  To enable automated reports:")
+                print("⚠️    GMAIL_APP_PASSWORD='your_16_digit_code'")
+                print("⚠️  " + "="*68 + "\n")
+            elif not os.path.exists(MANAGER_EMAILS_FILE):
+                print(f"\n⚠️  EMAIL SCHEDULER DISABLED: Create '{MANAGER_EMAILS_FILE}' with manager emails\n")
+            else:
+                # START SCHEDULER (background thread) - on the elected leader only in multi-worker mode
+                cluster.when_leader("Email scheduler", start_email_scheduler)
+        except Exception as e:
+            print(f"\n❌ Scheduler initialization failed: {str(e)}\n")
 
-    # PRINT MESSAGES FOR THE SERVER INITIALIZATION    
+    # PRINT MESSAGES FOR THE SERVER INITIALIZATION
     border = "=" * 70
     print(f"\n{border}")
     print("🚀 CCR MASTER OVERRIDE REGISTER - NETWORK ACCESS INFO")
     print(border)
     print(f"📍 LOCAL ACCESS (this machine):  http://127.0.0.1:7860")
-    if local_ip != "YOUR_LOCAL_IP":
-        print(f"🌐 LAN ACCESS (other devices):   http://{local_ip}:7860")
+    if MYLOCALIP != "YOUR_LOCAL_IP":
+        print(f"🌐 LAN ACCESS (other devices):   http://{MYLOCALIP}:7860")
         print(f"🌐 LAN ACCESS (other devices):   http://inst.local:7860")
     else:
         print(f"🌐 LAN ACCESS: Find your IP address:")
@@ -929,556 +1195,814 @@ with gr.Blocks(title="CCR Override Register") as demo:
     print("   3. Inbound Rules → New Rule → Port → TCP 7860 → Allow connection")
     print("   4. Name: 'FGS Override App' → Finish")
     print(border + "\n")
-    
-    # Install PDF dependency if needed (one-time setup)
-    try:
-        from fpdf import FPDF
+
+    # PDF dependency check without paying for the import (fpdf loads on first print)
+    import importlib.util
+    if importlib.util.find_spec("fpdf"):
         print("✅ PDF generation available (fpdf2 installed)")
-    except ImportError:
+    else:
         print("ℹ️  PDF generation NOT available. To enable:")
-        print("    pip install fpdf2")    
-    
-    # ======================
-    # START USER LOGIN AND MAIN INTERFACE
-    # ======================
-    role_state = gr.State(None)
-    current_entry_state = gr.State(None)
-    form_mode_state = gr.State("view")
+        print("    pip install fpdf2")
+
+
+# ======================
+# GRADIO INTERFACE
+# ======================
+def build_demo():
+    """Build the Override Register UI (call startup() first)"""
+    with gr.Blocks(title="CCR Override Register") as demo:
+        # ======================
+        # START USER LOGIN AND MAIN INTERFACE
+        # ======================
+        role_state = gr.State(None)
+        current_entry_state = gr.State(None)
+        form_mode_state = gr.State("view")
+        register_version_state = gr.State(None)  # change-feed version the table reflects
+        live_filter_cache = gr.State(None)  # previous as-you-type result set (refinement reuse)
+        recent_entries_state = gr.State([])  # entries this session opened, most recent first
+        register_timer = gr.Timer(LIVE_REFRESH_SECONDS)
     
-    # LOGIN PAGE
-    with gr.Column(visible=True) as login_page:
-        with gr.Row():  #equal_height=True
-            with gr.Column(scale=1):
-                gr.Markdown()
-            with gr.Column(scale=1):
-                gr.Markdown("# \n# 🔒 CCR Master Override Register")
-                gr.Markdown(f"\n #### Network IP: {MYLOCALIP}")
-            with gr.Column(scale=1):
-                gr.Markdown()
-
-        gr.Markdown("*(Login with your credentials...)*")
-        gr.Markdown("---")
-        with gr.Row():
-            with gr.Column(scale=1):             
-                gr.Image("wisonLOGO.png", width=150, container=False, buttons=[])
-                #gr.Image("congoFLNG.png", width=150, container=False, buttons=[])  
-            with gr.Column(scale=2):
-                username = gr.Textbox(label="Username", placeholder="Enter username")
-                password = gr.Textbox(label="Password", type="password", placeholder="Enter password")
-                login_btn = gr.Button("Login", variant="primary")
+        # LOGIN PAGE
+        with gr.Column(visible=True) as login_page:
+            with gr.Row():  #equal_height=True
+                with gr.Column(scale=1):
+                    gr.Markdown()
+                with gr.Column(scale=1):
+                    gr.Markdown("# \n# 🔒 CCR Master Override Register")
+                    gr.Markdown(f"\n #### Network IP: {MYLOCALIP}")
+                with gr.Column(scale=1):
+                    gr.Markdown()
+
+            gr.Markdown("*(Login with your credentials...)*")
+            gr.Markdown("---")
+            with gr.Row():
+                with gr.Column(scale=1):             
+                    gr.Image(webassets.image("wisonLOGO.png"), width=150, container=False, buttons=[])
+                    #gr.Image("congoFLNG.png", width=150, container=False, buttons=[])  
+                with gr.Column(scale=2):
+                    username = gr.Textbox(label="Username", placeholder="Enter username")
+                    password = gr.Textbox(label="Password", type="password", placeholder="Enter password")
+                    login_btn = gr.Button("Login", variant="primary")
+                    gr.Markdown("---")
+                    login_msg = gr.Textbox(label="Status", interactive=False)
+                with gr.Column(scale=1):
+                    gr.Markdown()
+                    gr.Image(webassets.image("ENIcongo.jpg"), width=150, container=False, buttons=[])
+                    #gr.Image("logo.png", width=150, container=False, buttons=[])
+            with gr.Row():
                 gr.Markdown("---")
-                login_msg = gr.Textbox(label="Status", interactive=False)
-            with gr.Column(scale=1):
-                gr.Markdown()
-                gr.Image("ENIcongo.jpg", width=150, container=False, buttons=[])
-                #gr.Image("logo.png", width=150, container=False, buttons=[])
-        with gr.Row():
+            with gr.Row():    
+                with gr.Column(scale=1):
+                    gr.Image(webassets.image("logo.png"), height=50, container=False, buttons=[], scale=1)
+                with gr.Column(scale=2):
+                    gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
+                    gr.Markdown(f"#### Network IP: {MYLOCALIP}")
+
+        # MAIN APPLICATION
+        with gr.Column(visible=False) as main_app:
+            with gr.Row():
+                with gr.Column(scale=1, variant='compact'):
+                    with gr.Row():
+                        gr.Image(webassets.image("wisonLOGO.png"), height=30, container=False, buttons=[], scale=1)
+                        gr.Image(webassets.image("congoFLNG.png"), height=30, container=False, buttons=[], scale=1)                       
+                with gr.Column(scale=3):
+                    gr.Markdown()
+                    gr.Markdown("# 🔒 CCR Master Override Register")
+                with gr.Column(scale=1, variant='compact'):
+                    gr.Image(webassets.image("ENIcongo.jpg"), height=30, container=False, buttons=[], scale=1)
+                    gr.Image(webassets.image("logo.png"), height=30, container=False, buttons=[], scale=1)
             gr.Markdown("---")
-        with gr.Row():    
-            with gr.Column(scale=1):
-                gr.Image("logo.png", height=50, container=False, buttons=[], scale=1)
-            with gr.Column(scale=2):
-                gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
-                gr.Markdown(f"#### Network IP: {MYLOCALIP}")
-
-    # MAIN APPLICATION
-    with gr.Column(visible=False) as main_app:
-        with gr.Row():
-            with gr.Column(scale=1, variant='compact'):
-                with gr.Row():
-                    gr.Image("wisonLOGO.png", height=30, container=False, buttons=[], scale=1)
-                    gr.Image("congoFLNG.png", height=30, container=False, buttons=[], scale=1)                       
-            with gr.Column(scale=3):
-                gr.Markdown()
-                gr.Markdown("# 🔒 CCR Master Override Register")
-            with gr.Column(scale=1, variant='compact'):
-                gr.Image("ENIcongo.jpg", height=30, container=False, buttons=[], scale=1)
-                gr.Image("logo.png", height=30, container=False, buttons=[], scale=1)
-        gr.Markdown("---")
-        
-        with gr.Tabs() as tabs:
-            # MAIN REGISTER TAB
-            with gr.Tab("📋 Main Register"):
-                with gr.Row():
-                    user_display = gr.Textbox(label="Logged in as", interactive=False)
-                    logout_btn = gr.Button("🚪 Logout", scale=0)
+        
+            with gr.Tabs() as tabs:
+                # MAIN REGISTER TAB
+                with gr.Tab("📋 Main Register"):
+                    with gr.Row():
+                        user_display = gr.Textbox(label="Logged in as", interactive=False)
+                        assets.selector(demo)
+                        logout_btn = gr.Button("🚪 Logout", scale=0)
                 
-                gr.Markdown("## 🔍 Override Register Entries")
-                with gr.Row():
-                    # Add this BELOW entry_table in UI definition (around line 340):
-                    gr.Markdown("""
-                    <div style="display: flex; gap: 20px; margin: 10px 0; padding: 8px; background: #f8f9fa; border-radius: 5px;">
-                      <span style="background: yellow; padding: 2px 8px; border-radius: 3px">🟡 Pending Approval</span>
-                      <span style="background: lightgreen; padding: 2px 8px; border-radius: 3px">🟢 Active Override</span>
-                      <span style="background: lightgray; padding: 2px 8px; border-radius: 3px">⚪ Closed</span>
-                    </div>
-                    """)                    
-                filter_inputs = {}
-                with gr.Row():
-                    for col in DISPLAY_COLUMNS[:4]:
-                        filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
-                with gr.Row():
-                    for col in DISPLAY_COLUMNS[4:8]:
-                        filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
-                with gr.Row():
-                    for col in DISPLAY_COLUMNS[8:]:
-                        filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
+                    gr.Markdown("## 🔍 Override Register Entries")
+                    with gr.Row():
+                        # Add this BELOW entry_table in UI definition (around line 340):
+                        gr.Markdown("""
+                        <div style="display: flex; gap: 20px; margin: 10px 0; padding: 8px; background: #f8f9fa; border-radius: 5px;">
+                          <span style="background: yellow; padding: 2px 8px; border-radius: 3px">🟡 Pending Approval</span>
+                          <span style="background: lightgreen; padding: 2px 8px; border-radius: 3px">🟢 Active Override</span>
+                          <span style="background: lightgray; padding: 2px 8px; border-radius: 3px">⚪ Closed</span>
+                        </div>
+                        """)                    
+                    filter_inputs = {}
+                    with gr.Row():
+                        for col in DISPLAY_COLUMNS[:4]:
+                            filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
+                    with gr.Row():
+                        for col in DISPLAY_COLUMNS[4:8]:
+                            filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
+                    with gr.Row():
+                        for col in DISPLAY_COLUMNS[8:]:
+                            filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
                 
-                filter_btn = gr.Button("Apply Filters", variant="secondary")
+                    with gr.Row():
+                        filter_btn = gr.Button("Apply Filters", variant="secondary")
+                        include_archive_box = gr.Checkbox(
+                            label=f"📦 Include archive (closed > {archive.ARCHIVE_AFTER_DAYS} days)", value=False,
+                            scale=0, min_width=260)
                 
 
-                entry_table = gr.Dataframe(
-                    headers=DISPLAY_COLUMNS,
-                    datatype=["str"] * len(DISPLAY_COLUMNS),
-                    interactive=False,
-                    wrap=True,
-                    label="Override Entries"
-                )
-                
-                with gr.Row():
-                    entry_selector = gr.Dropdown(
-                        label="Select Entry No to View/Edit", 
-                        choices=[],
-                        interactive=True
+                    entry_table = gr.Dataframe(
+                        headers=DISPLAY_COLUMNS,
+                        datatype=["str"] * len(DISPLAY_COLUMNS),
+                        interactive=False,
+                        wrap=True,
+                        label="Override Entries"
                     )
-                    load_btn = gr.Button("Load Selected Entry", variant="primary")
-                    create_btn = gr.Button("➕ Create New Entry", variant="secondary")
-
-
                 
-                # Detail form
-                gr.Markdown("## 📝 Entry Details")
-                with gr.Column():
-                    form_fields = {}
-                    # Row 1: Entry No + New Approval Fields
                     with gr.Row():
-                        form_fields['No'] = gr.Number(label="Entry No", interactive=False)
-                        form_fields['Approved'] = gr.Dropdown(
-                            label="Approved", 
-                            choices=["YES", "NO"], 
-                            value="NO",
-                            interactive=False  # Will be enabled for manager/admin only
-                        )
-                        form_fields['Closed'] = gr.Dropdown(
-                            label="Closed", 
-                            choices=["YES", "NO"], 
-                            value="NO",
-                            interactive=False  # Will be enabled for manager/admin only
+                        entry_selector = gr.Dropdown(
+                            label="Select Entry No to View/Edit (type number, tag or description)", 
+                            choices=[],
+                            interactive=True,
+                            allow_custom_value=True,
+                            filterable=True
                         )
+                        load_btn = gr.Button("Load Selected Entry", variant="primary")
+                        create_btn = gr.Button("➕ Create New Entry", variant="secondary")
+
+
+                
+                    # Detail form
+                    gr.Markdown("## 📝 Entry Details")
+                    with gr.Column():
+                        form_fields = {}
+                        # Row 1: Entry No + New Approval Fields
+                        with gr.Row():
+                            form_fields['No'] = gr.Number(label="Entry No", interactive=False)
+                            form_fields['Approved'] = gr.Dropdown(
+                                label="Approved", 
+                                choices=["YES", "NO"], 
+                                value="NO",
+                                interactive=False  # Will be enabled for manager/admin only
+                            )
+                            form_fields['Closed'] = gr.Dropdown(
+                                label="Closed", 
+                                choices=["YES", "NO"], 
+                                value="NO",
+                                interactive=False  # Will be enabled for manager/admin only
+                            )
                     
-                    # Row 2: Time fields
-                    with gr.Row():
-                        form_fields['Time In'] = gr.Textbox(label="Time In")
-                        form_fields['Date On'] = gr.Textbox(label="Date On")
-                        form_fields['Date Off'] = gr.Textbox(label="Date Off")
+                        # Row 2: Time fields
+                        with gr.Row():
+                            form_fields['Time In'] = gr.Textbox(label="Time In")
+                            form_fields['Date On'] = gr.Textbox(label="Date On")
+                            form_fields['Date Off'] = gr.Textbox(label="Date Off")
                     
-                    # Row 3: Critical parameters
-                    with gr.Row():
-                        form_fields['Module Parameter'] = gr.Textbox(label="Module Parameter", scale=2)
-                        form_fields['Alarm'] = gr.Textbox(label="Alarm Type")
-                        form_fields['Priority'] = gr.Dropdown(
-                            label="Priority", 
-                            choices=["critical", "high", "medium", "low"],
-                            value="critical"
-                        )
+                        # Row 3: Critical parameters
+                        with gr.Row():
+                            form_fields['Module Parameter'] = gr.Textbox(label="Module Parameter", scale=2)
+                            form_fields['Alarm'] = gr.Textbox(label="Alarm Type")
+                            form_fields['Priority'] = gr.Dropdown(
+                                label="Priority", 
+                                choices=["critical", "high", "medium", "low"],
+                                value="critical"
+                            )
                     
-                    # Remaining fields (unchanged)
-                    form_fields['Description'] = gr.Textbox(label="Description", lines=2)
-                    form_fields['Message'] = gr.Textbox(label="Message")
-                    form_fields['Status'] = gr.Textbox(label="Status", lines=2)
-                    form_fields['Requested By'] = gr.Textbox(label="Requested By")
-                    form_fields['Removal Requested By'] = gr.Textbox(label="Removal Requested By")
+                        # Remaining fields (unchanged)
+                        form_fields['Description'] = gr.Textbox(label="Description", lines=2)
+                        form_fields['Message'] = gr.Textbox(label="Message")
+                        form_fields['Status'] = gr.Textbox(label="Status", lines=2)
+                        form_fields['Requested By'] = gr.Textbox(label="Requested By")
+                        form_fields['Removal Requested By'] = gr.Textbox(label="Removal Requested By")
                     
-                    # Action buttons (unchanged)
-                    with gr.Row():
-                        save_btn = gr.Button("💾 Save Changes", variant="primary", visible=True)
-                        delete_btn = gr.Button("🗑️ Delete Entry", variant="stop", visible=False)
-                        cancel_btn = gr.Button("↺ Cancel", variant="secondary")
+                        # Action buttons (unchanged)
+                        with gr.Row():
+                            save_btn = gr.Button("💾 Save Changes", variant="primary", visible=True)
+                            delete_btn = gr.Button("🗑️ Delete Entry", variant="stop", visible=False)
+                            cancel_btn = gr.Button("↺ Cancel", variant="secondary")
                 
-                status_msg = gr.Textbox(label="Operation Status", interactive=False)
-
-
-                # Export/Print Section
-                gr.Markdown("## 📤 Export, Print & Email")
-                with gr.Row():
-                    export_excel_btn = gr.Button("📤 Export FULL Database to Excel", variant="secondary")
-                    print_pdf_btn = gr.Button("🖨️ Print CURRENT Table to PDF", variant="secondary")
-                    send_email_btn = gr.Button("✉️ Send by Email (Managers)", variant="primary")  # NEW BUTTON
-                with gr.Row():
-                    export_file = gr.File(label="📥 Download Excel Export", type="filepath", visible=True)
-                    print_file = gr.File(label="🖨️ Download PDF Printout", type="filepath", visible=True)
-                    email_status = gr.Textbox(label="📧 Email Status", interactive=False, visible=True)  # NEW STATUS
-                with gr.Row():
+                    status_msg = gr.Textbox(label="Operation Status", interactive=False)
+
+
+                    # Export/Print Section
+                    gr.Markdown("## 📤 Export, Print & Email")
+                    with gr.Row():
+                        export_excel_btn = gr.Button("📤 Export FULL Database to Excel", variant="secondary")
+                        print_pdf_btn = gr.Button("🖨️ Print CURRENT Table to PDF", variant="secondary")
+                        send_email_btn = gr.Button("✉️ Send by Email (Managers)", variant="primary")  # NEW BUTTON
+                    with gr.Row():
+                        export_file = gr.File(label="📥 Download Excel Export", type="filepath", visible=True)
+                        print_file = gr.File(label="🖨️ Download PDF Printout", type="filepath", visible=True)
+                        email_status = gr.Textbox(label="📧 Email Status", interactive=False, visible=True)  # NEW STATUS
+                    with gr.Row():
+                        gr.Markdown("---")
+                    with gr.Row():    
+                        with gr.Column(scale=1):
+                            gr.Image(webassets.image("logo.png"), height=50, container=False, buttons=[], scale=1)
+                        with gr.Column(scale=2):
+                            gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
+                            gr.Markdown(f"#### Network IP: {MYLOCALIP}")
+
+                # BYPASS EXPOSURE TAB (time-in-bypass statistics, cached per data version)
+                with gr.Tab("⏱️ Bypass Exposure") as exposure_tab:
+                    gr.Markdown("## ⏱️ Time in Bypass")
+                    gr.Markdown("Durations run from Date On (Time In when on the same day) to Date Off, "
+                                "or to now for overrides that are still open.")
+                    with gr.Row():
+                        exposure_rollup = gr.Dropdown(list(exposure.ROLLUPS), value="Tag prefix",
+                                                      label="Roll up by", interactive=True)
+                        exposure_refresh_btn = gr.Button("🔄 Refresh", variant="secondary")
+                    exposure_summary = gr.Markdown()
+                    exposure_rollup_table = gr.Dataframe(interactive=False, wrap=True, label="Bypass hours")
+                    with gr.Row():
+                        exposure_age_plot = gr.BarPlot(x="Age", y="Open overrides", sort=exposure.AGE_LABELS,
+                                                       title="Age of open overrides", height=300)
+                    exposure_longest_table = gr.Dataframe(interactive=False, wrap=True,
+                                                          label=f"Longest-standing open overrides (top {exposure.LONGEST_LIMIT})")
+
+                # CHANGE HISTORY TAB (audit trail + point-in-time view)
+                with gr.Tab("🕓 History"):
+                    gr.Markdown("## 🕓 Register History")
+                    gr.Markdown("Every create / edit / delete is recorded with the changed fields, user and time.")
+                    with gr.Row():
+                        history_when = gr.Textbox(label="Show the register as it was at (YYYY-MM-DD HH:MM)",
+                                                  placeholder="e.g. 2026-01-29 05:00", scale=3)
+                        history_asof_btn = gr.Button("🕓 Show Register", variant="primary", scale=1)
+                    history_status = gr.Textbox(label="Status", interactive=False)
+                    history_table = gr.Dataframe(headers=DISPLAY_COLUMNS, interactive=False, wrap=True,
+                                                 label="Register at that time")
+                    gr.Markdown("---")
+                    with gr.Row():
+                        history_entry_no = gr.Textbox(label="Entry No", placeholder="e.g. 42", scale=3)
+                        history_entry_btn = gr.Button("📜 Show Audit Trail", variant="secondary", scale=1)
+                    history_entry_table = gr.Dataframe(headers=["When", "By", "Action", "Changes"],
+                                                       interactive=False, wrap=True, label="Audit trail")
+
+                # ALL ASSETS TAB (federated read-only search over every asset partition)
+                with gr.Tab("🌐 All Assets", visible=len(assets.names()) > 1):
+                    gr.Markdown("## 🌐 Overrides Across All Assets")
+                    gr.Markdown("Read-only: select an asset above to edit its register.")
+                    with gr.Row():
+                        fed_module = gr.Textbox(label="Module Parameter", placeholder="Filter Module Parameter...")
+                        fed_description = gr.Textbox(label="Description", placeholder="Filter Description...")
+                        fed_closed = gr.Dropdown(["", "YES", "NO"], value="NO", label="Closed", interactive=True)
+                        fed_search_btn = gr.Button("🔍 Search All Assets", variant="primary")
+                    fed_status = gr.Textbox(label="Status", interactive=False)
+                    fed_table = gr.Dataframe(headers=["Asset"] + DISPLAY_COLUMNS, interactive=False, wrap=True)
+
+                # ADMIN PANEL TAB (only visible to admin)
+                with gr.Tab("⚙️ Admin Panel", id="admin_tab", visible=False) as admin_tab:
+                    gr.Markdown("## 🔐 Admin Operations")
+                    gr.Markdown("### 📥 Import Excel Data")
+                    gr.Markdown("Upload Excel files matching the original database format. **Existing entries (by Entry No) will be skipped.**")
+                    with gr.Row():
+                        excel_upload = gr.File(
+                            label="Upload Excel File (.xlsx/.xls)", 
+                            type="filepath", 
+                            file_types=[".xlsx", ".xls"]
+                        )
+                        import_btn = gr.Button("✅ Import Data", variant="primary", size="lg")
+                    import_status = gr.Textbox(label="Import Status", interactive=False, max_lines=3)
                     gr.Markdown("---")
-                with gr.Row():    
-                    with gr.Column(scale=1):
-                        gr.Image("logo.png", height=50, container=False, buttons=[], scale=1)
-                    with gr.Column(scale=2):
-                        gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
-                        gr.Markdown(f"#### Network IP: {MYLOCALIP}")
-
-            # ADMIN PANEL TAB (only visible to admin)
-            with gr.Tab("⚙️ Admin Panel", id="admin_tab", visible=False) as admin_tab:
-                gr.Markdown("## 🔐 Admin Operations")
-                gr.Markdown("### 📥 Import Excel Data")
-                gr.Markdown("Upload Excel files matching the original database format. **Existing entries (by Entry No) will be skipped.**")
-                with gr.Row():
-                    excel_upload = gr.File(
-                        label="Upload Excel File (.xlsx/.xls)", 
-                        type="filepath", 
-                        file_types=[".xlsx", ".xls"]
+                    gr.Markdown("ℹ️ **Import Notes:**\n"
+                              "- File must have same structure as original database (skip 13 title rows)\n"
+                              "- Only NEW entries (by Entry No) will be added\n"
+                              "- Duplicates are automatically skipped\n"
+                              "- Admin access required")
+                    gr.Markdown("---")
+                    gr.Markdown("### 🐢 SQL Slow-Query Log")
+                    gr.Markdown(f"Statements slower than the threshold are written to `{sqltrace.SLOW_QUERY_LOG}` with their query plan "
+                                "(parameter values redacted). `SCAN overrides` in the plan means a full table scan.")
+                    with gr.Row():
+                        sql_trace_enabled = gr.Checkbox(label="Enable SQL tracing", value=sqltrace.ENABLED)
+                        sql_trace_threshold = gr.Number(label="Slow-query threshold (ms)", value=sqltrace.SLOW_QUERY_MS, minimum=0)
+                        sql_trace_apply_btn = gr.Button("💾 Apply", variant="secondary")
+                        sql_trace_refresh_btn = gr.Button("🔄 Refresh Top 20", variant="secondary")
+                        sql_trace_reset_btn = gr.Button("🗑️ Reset Statistics", variant="stop")
+                    sql_trace_status = gr.Textbox(label="Tracing Status", interactive=False)
+                    sql_trace_table = gr.Dataframe(
+                        headers=["Statement", "Calls", "Total ms", "Avg ms", "Max ms", "Slow", "Query Plan", "Params (redacted)"],
+                        interactive=False,
+                        wrap=True,
+                        label="Top statements by total time"
                     )
-                    import_btn = gr.Button("✅ Import Data", variant="primary", size="lg")
-                import_status = gr.Textbox(label="Import Status", interactive=False, max_lines=3)
-                gr.Markdown("---")
-                gr.Markdown("ℹ️ **Import Notes:**\n"
-                          "- File must have same structure as original database (skip 13 title rows)\n"
-                          "- Only NEW entries (by Entry No) will be added\n"
-                          "- Duplicates are automatically skipped\n"
-                          "- Admin access required")
-                with gr.Row():
                     gr.Markdown("---")
-                with gr.Row():    
-                    with gr.Column(scale=1):
-                        gr.Image("logo.png", height=50, container=False, buttons=[], scale=1)
-                    with gr.Column(scale=2):
-                        gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
-                        gr.Markdown(f"#### Network IP: {MYLOCALIP}")
-
-
-            # ===== CUSTOM EMAIL TAB (VISIBLE TO ALL USERS) =====
-            with gr.Tab("📧 Custom Email"):
-                gr.Markdown("## 📧 Send Current Exports to Custom Recipients")
-                gr.Markdown("Enter email addresses below (one per line). Attachments will include:")
-                gr.Markdown("- **FULL_DATABASE_EXPORT.xlsx**: Complete override register\n- **CURRENT_VIEW_PRINTOUT.pdf**: Filtered table as displayed")
-                
-                with gr.Row():
-                    email_recipients = gr.Textbox(
-                        label="Recipient Emails (one per line)",
-                        placeholder="manager1@congoflng.com\nsupervisor2@wison.com\nhse@congoflng.com",
-                        lines=5,
-                        max_lines=20
+                    gr.Markdown("### 📈 Index Advisor")
+                    gr.Markdown("Built from the filter combinations operators actually use in **Apply Filters**. "
+                                "Exact YES/NO and priority filters can use indexes; substring filters always scan.")
+                    with gr.Row():
+                        advisor_refresh_btn = gr.Button("🔄 Refresh Recommendations", variant="secondary")
+                        advisor_index_selector = gr.Dropdown(label="Advisor index", choices=[], interactive=True, allow_custom_value=False)
+                        advisor_create_btn = gr.Button("➕ Create Index", variant="primary")
+                        advisor_drop_btn = gr.Button("🗑️ Drop Index", variant="stop")
+                    advisor_table = gr.Dataframe(
+                        headers=["Filter columns", "Calls", "Avg ms", "Max ms", "Rows (last)", "Recommendation", "Index", "SQL"],
+                        interactive=False,
+                        wrap=True,
+                        label="Observed filter usage"
                     )
-                with gr.Row():
-                    email_note = gr.Textbox(label="Optional Note (appears in email body)", placeholder="Shift handover report - 06:00")
-                    send_custom_btn = gr.Button("📤 Send Custom Email", variant="primary", size="lg")
-                custom_email_status = gr.Textbox(label="Status", interactive=False, max_lines=3)
+                    advisor_status = gr.Textbox(label="Before / After Timing", interactive=False, lines=5)
+                    gr.Markdown("---")
+                    gr.Markdown("### 🗄️ Export Store")
+                    gr.Markdown(f"Exports and email bundles are kept in `{exportstore.EXPORT_DIR}/` for at most "
+                                f"{exportstore.MAX_AGE_HOURS} h and {exportstore.MAX_TOTAL_BYTES // (1024 * 1024)} MB "
+                                "(least recently used removed first). The sweeper runs in the background.")
+                    with gr.Row():
+                        export_store_refresh_btn = gr.Button("🔄 Refresh Disk Use", variant="secondary")
+                        export_store_sweep_btn = gr.Button("🧹 Sweep Now", variant="secondary")
+                    export_store_table = gr.Dataframe(
+                        headers=["Export type", "Files", "Size (MB)", "Oldest (h)"],
+                        interactive=False,
+                        label="Disk use by export type"
+                    )
+                    export_store_status = gr.Textbox(label="Export Store Status", interactive=False)
+                    gr.Markdown("---")
+                    gr.Markdown("### 💾 Database Backups")
+                    gr.Markdown(f"Online copies of the override database in `{backup.BACKUP_DIR}/`, taken every "
+                                f"{backup.INTERVAL_HOURS} h in small steps (writers are never held up) and checked with "
+                                f"`PRAGMA integrity_check`. The {backup.KEEP_RECENT} newest copies and one per day for "
+                                f"{backup.KEEP_DAYS} days are kept. **Restore** first saves the current database as a "
+                                "`pre_restore` copy.")
+                    with gr.Row():
+                        backup_refresh_btn = gr.Button("🔄 Refresh List", variant="secondary")
+                        backup_now_btn = gr.Button("💾 Back Up Now", variant="primary")
+                        backup_selector = gr.Dropdown(label="Backup to restore", choices=[], interactive=True)
+                        backup_restore_btn = gr.Button("♻️ Restore Selected", variant="stop")
+                    backup_table = gr.Dataframe(
+                        headers=BACKUP_COLUMNS,
+                        interactive=False,
+                        label="Backups (newest first)"
+                    )
+                    backup_status = gr.Textbox(label="Backup Status", interactive=False)
+                    gr.Markdown("---")
+                    gr.Markdown("### 📦 Override Archive")
+                    gr.Markdown(f"Closed entries move out of the register {archive.ARCHIVE_AFTER_DAYS} days after their "
+                                f"Date Off (checked every {archive.CHECK_HOURS} h), so the register screens only query "
+                                "the live set. Archived entries stay read-only and are found with **📦 Include archive**.")
+                    with gr.Row():
+                        archive_refresh_btn = gr.Button("🔄 Refresh Counts", variant="secondary")
+                        archive_now_btn = gr.Button("📦 Archive Now", variant="primary")
+                    archive_status = gr.Textbox(label="Archive Status", interactive=False)
+                    gr.Markdown("---")
+                    gr.Markdown("### 🛰️ Replication")
+                    gr.Markdown("Every write to the register and the shutdown log is queued as a compact change record and "
+                                f"shipped in compressed batches to the onshore copy (`CCR_REPLICATION_PEER`), every "
+                                f"{replication.SHIP_SECONDS} s while the link is up. After a link drop shipping resumes "
+                                "where the onshore copy stopped; nothing is sent twice.")
+                    with gr.Row():
+                        replication_refresh_btn = gr.Button("🔄 Refresh Status", variant="secondary")
+                        replication_now_btn = gr.Button("🛰️ Ship Now", variant="primary")
+                    replication_status = gr.Textbox(label="Replication Status", interactive=False, lines=3)
+                    with gr.Row():
+                        gr.Markdown("---")
+                    with gr.Row():    
+                        with gr.Column(scale=1):
+                            gr.Image(webassets.image("logo.png"), height=50, container=False, buttons=[], scale=1)
+                        with gr.Column(scale=2):
+                            gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
+                            gr.Markdown(f"#### Network IP: {MYLOCALIP}")
+
+
+                # ===== CUSTOM EMAIL TAB (VISIBLE TO ALL USERS) =====
+                with gr.Tab("📧 Custom Email"):
+                    gr.Markdown("## 📧 Send Current Exports to Custom Recipients")
+                    gr.Markdown("Enter email addresses below (one per line). Attachments will include:")
+                    gr.Markdown("- **FULL_DATABASE_EXPORT.xlsx**: Complete override register\n- **CURRENT_VIEW_PRINTOUT.pdf**: Filtered table as displayed")
+                
+                    with gr.Row():
+                        email_recipients = gr.Textbox(
+                            label="Recipient Emails (one per line)",
+                            placeholder="manager1@congoflng.com\nsupervisor2@wison.com\nhse@congoflng.com",
+                            lines=5,
+                            max_lines=20
+                        )
+                    with gr.Row():
+                        email_note = gr.Textbox(label="Optional Note (appears in email body)", placeholder="Shift handover report - 06:00")
+                        send_custom_btn = gr.Button("📤 Send Custom Email", variant="primary", size="lg")
+                    custom_email_status = gr.Textbox(label="Status", interactive=False, max_lines=3)
                 
-                gr.Markdown("---")
-                gr.Markdown("ℹ️ **Security Notes**:\n- Emails sent via secure Gmail API\n- Attachments contain CONFIDENTIAL operational data\n- Only send to authorized Congo FLNG personnel\n- System logs all email requests")
-                with gr.Row():
                     gr.Markdown("---")
-                with gr.Row():    
-                    with gr.Column(scale=1):
-                        gr.Image("logo.png", height=50, container=False, buttons=[], scale=1)
-                    with gr.Column(scale=2):
-                        gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
-                        gr.Markdown(f"#### Network IP: {MYLOCALIP}")
-
-
-    # ===== EVENT HANDLERS =====
-    def login_action(uname, pwd):
-        if not uname or not uname.strip():
-            return _create_login_response(
-                login_msg_text="⚠️ Username cannot be empty",
-                keep_username=""
-            )
-        
-        if not pwd or not pwd.strip():
-            return _create_login_response(
-                login_msg_text="⚠️ Password cannot be empty",
-                keep_username=uname.strip()
-            )
-        
-        success, role, auth_msg = authenticate(uname.strip(), pwd.strip())
-        if not success:
-            return _create_login_response(
-                login_msg_text="❌ Invalid credentials! Try: user/user, manager/manager, or admin/admin",
-                keep_username=uname.strip()
-            )
+                    gr.Markdown("ℹ️ **Security Notes**:\n- Emails sent via secure Gmail API\n- Attachments contain CONFIDENTIAL operational data\n- Only send to authorized Congo FLNG personnel\n- System logs all email requests")
+                    with gr.Row():
+                        gr.Markdown("---")
+                    with gr.Row():    
+                        with gr.Column(scale=1):
+                            gr.Image(webassets.image("logo.png"), height=50, container=False, buttons=[], scale=1)
+                        with gr.Column(scale=2):
+                            gr.Markdown("All rights reserved (C)\ncreated by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\nvisit [Key Solution SRL](key-solution.eu)")
+                            gr.Markdown(f"#### Network IP: {MYLOCALIP}")
+
+
+        # ===== EVENT HANDLERS =====
+        def login_action(uname, pwd):
+            if not uname or not uname.strip():
+                return _create_login_response(
+                    login_msg_text="⚠️ Username cannot be empty",
+                    keep_username=""
+                )
         
-        df = get_filtered_data({})
-        raw_df = get_filtered_data({})
-        styled_df = style_dataframe_for_display(raw_df)
-        entry_nums = [str(int(x)) for x in raw_df['No'].tolist() if pd.notna(x) and x != ""] if not raw_df.empty else []
-        form_vals = {k: "" for k in DISPLAY_COLUMNS}
-        form_vals['Priority'] = "critical"
-        
-        outputs = {
-            login_page: gr.update(visible=False),
-            main_app: gr.update(visible=True),
-            login_msg: gr.update(value=""),
-            user_display: gr.update(value=f"{uname} ({role.title()})"),
-            role_state: role,
-            entry_table: styled_df,  # Replace df with styled_df
-            entry_selector: gr.update(choices=entry_nums),
-            status_msg: auth_msg,
-            admin_tab: gr.update(visible=(role == "admin")),
-        }
-        for col in DISPLAY_COLUMNS:
-            if col == 'Priority':
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-            else:
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-        outputs[save_btn] = gr.update(visible=False)
-        outputs[delete_btn] = gr.update(visible=False)
-        outputs[form_mode_state] = "view"
-        outputs[username] = gr.update(value="")
-        outputs[password] = gr.update(value="")
-        outputs[export_file] = None  # Clears file download link
-        outputs[print_file] = None   # Clears file download link
-        return outputs
-
-    def _create_login_response(login_msg_text, keep_username):
-        form_vals = {k: "" for k in DISPLAY_COLUMNS}
-        form_vals['Priority'] = "critical"
-        
-        outputs = {
-            login_page: gr.update(visible=True),
-            main_app: gr.update(visible=False),
-            login_msg: gr.update(value=login_msg_text),
-            user_display: gr.update(value=""),
-            role_state: None,
-            entry_table: pd.DataFrame(columns=DISPLAY_COLUMNS),
-            entry_selector: gr.update(choices=[], value=None),
-            status_msg: gr.update(value=""),
-            admin_tab: gr.update(visible=False),
-        }
-        for col in DISPLAY_COLUMNS:
-            if col == 'Priority':
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-            else:
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-        outputs[save_btn] = gr.update(visible=False)
-        outputs[delete_btn] = gr.update(visible=False)
-        outputs[form_mode_state] = "view"
-        outputs[username] = gr.update(value=keep_username)
-        outputs[password] = gr.update(value="")
-        outputs[export_file] = None  # Clears file download link
-        outputs[print_file] = None   # Clears file download link
-        return outputs
-    
-    def logout_action():
-        form_vals = {k: "" for k in DISPLAY_COLUMNS}
-        form_vals['Priority'] = "critical"
-        
-        outputs = {
-            login_page: gr.update(visible=True),
-            main_app: gr.update(visible=False),
-            username: gr.update(value=""),
-            password: gr.update(value=""),
-            login_msg: "Logged out successfully",
-            role_state: None,
-            admin_tab: gr.update(visible=False),
-            export_file: gr.update(visible=False),
-            print_file: gr.update(visible=False),
-        }
-        for col in DISPLAY_COLUMNS:
-            if col == 'Priority':
-                outputs[form_fields[col]] = gr.update(value=form_vals[col])
-            else:
-                outputs[form_fields[col]] = gr.update(value=form_vals[col])
-        return outputs
-    
-    def apply_filters(*args):
-        if len(args) < 15:  # 14 filters + role
-            return {status_msg: "Filter error: insufficient inputs"}
+            if not pwd or not pwd.strip():
+                return _create_login_response(
+                    login_msg_text="⚠️ Password cannot be empty",
+                    keep_username=uname.strip()
+                )
         
-        filter_vals = args[:14]
-        role = args[14]
+            success, role, auth_msg = authenticate(uname.strip(), pwd.strip())
+            if not success:
+                return _create_login_response(
+                    login_msg_text="❌ Invalid credentials! Try: user/user, manager/manager, or admin/admin",
+                    keep_username=uname.strip()
+                )
         
-        filters = dict(zip(DISPLAY_COLUMNS, filter_vals))
-        raw_df = get_filtered_data(filters)  # Keep raw for selector
-        styled_df = style_dataframe_for_display(raw_df)  # Style for display
+            version = changefeed.overrides_feed.version()  # read BEFORE the query: nothing slips through
+            raw_df = get_filtered_data({})
+            styled_df = style_dataframe_for_display(raw_df)
+            form_vals = {k: "" for k in DISPLAY_COLUMNS}
+            form_vals['Priority'] = "critical"
         
-        entry_nums = [str(int(x)) for x in raw_df['No'].tolist() if pd.notna(x) and x != ""] if not raw_df.empty else []
+            outputs = {
+                login_page: gr.update(visible=False),
+                main_app: gr.update(visible=True),
+                login_msg: gr.update(value=""),
+                user_display: gr.update(value=f"{uname} ({role.title()})"),
+                role_state: role,
+                register_version_state: version,
+                entry_table: styled_df,  # Replace df with styled_df
+                entry_selector: gr.update(choices=lookup_choices("", None), value=None),
+                status_msg: auth_msg,
+                admin_tab: gr.update(visible=(role == "admin")),
+            }
+            for col in DISPLAY_COLUMNS:
+                if col == 'Priority':
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+                else:
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+            outputs[save_btn] = gr.update(visible=False)
+            outputs[delete_btn] = gr.update(visible=False)
+            outputs[form_mode_state] = "view"
+            outputs[username] = gr.update(value="")
+            outputs[password] = gr.update(value="")
+            outputs[export_file] = None  # Clears file download link
+            outputs[print_file] = None   # Clears file download link
+            return outputs
+
+        def _create_login_response(login_msg_text, keep_username):
+            form_vals = {k: "" for k in DISPLAY_COLUMNS}
+            form_vals['Priority'] = "critical"
         
-        return {
-            entry_table: styled_df,  # CRITICAL: Use styled version
-            entry_selector: gr.update(choices=entry_nums),
-            status_msg: f"Showing {len(raw_df)} entries"
-        }
+            outputs = {
+                login_page: gr.update(visible=True),
+                main_app: gr.update(visible=False),
+                login_msg: gr.update(value=login_msg_text),
+                user_display: gr.update(value=""),
+                role_state: None,
+                entry_table: pd.DataFrame(columns=DISPLAY_COLUMNS),
+                entry_selector: gr.update(choices=[], value=None),
+                status_msg: gr.update(value=""),
+                admin_tab: gr.update(visible=False),
+            }
+            for col in DISPLAY_COLUMNS:
+                if col == 'Priority':
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+                else:
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+            outputs[save_btn] = gr.update(visible=False)
+            outputs[delete_btn] = gr.update(visible=False)
+            outputs[form_mode_state] = "view"
+            outputs[username] = gr.update(value=keep_username)
+            outputs[password] = gr.update(value="")
+            outputs[export_file] = None  # Clears file download link
+            outputs[print_file] = None   # Clears file download link
+            return outputs
     
-    def load_entry(entry_no_str, role):
-        if not entry_no_str or not entry_no_str.strip():
-            return {status_msg: "Please select an entry number"}
+        def logout_action():
+            form_vals = {k: "" for k in DISPLAY_COLUMNS}
+            form_vals['Priority'] = "critical"
         
-        try:
-            entry_no = int(float(entry_no_str))
-        except (ValueError, TypeError):
-            return {status_msg: "Invalid entry number"}
-        
-        entry = get_entry_by_no(entry_no)
-        if not entry:
-            return {status_msg: f"Entry #{entry_no} not found"}
-        
-        form_vals = {}
-        for col in DISPLAY_COLUMNS:
-            val = entry.get(col, "")
-            if col == 'No':
-                try:
-                    form_vals[col] = int(float(val)) if val else entry_no
-                except:
-                    form_vals[col] = entry_no
+            outputs = {
+                login_page: gr.update(visible=True),
+                main_app: gr.update(visible=False),
+                username: gr.update(value=""),
+                password: gr.update(value=""),
+                login_msg: "Logged out successfully",
+                role_state: None,
+                admin_tab: gr.update(visible=False),
+                export_file: gr.update(visible=False),
+                print_file: gr.update(visible=False),
+            }
+            for col in DISPLAY_COLUMNS:
+                if col == 'Priority':
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col])
+                else:
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col])
+            return outputs
+    
+        def _showing(raw_df, include_archive):
+            return f"Showing {len(raw_df)} entries" + (" (archive included)" if include_archive else "")
+
+        def apply_filters(*args):
+            if len(args) < 16:  # 14 filters + role + include archive
+                return {status_msg: "Filter error: insufficient inputs"}
+        
+            filter_vals = args[:14]
+            role = args[14]
+            include_archive = bool(args[15])
+        
+            filters = dict(zip(DISPLAY_COLUMNS, filter_vals))
+            version = changefeed.overrides_feed.version()
+            started = time.perf_counter()
+            raw_df = get_filtered_data(filters, include_archive=include_archive)  # Keep raw for selector
+            if not include_archive:  # the advisor tunes the hot-set queries only
+                _record_filter_usage(filters, (time.perf_counter() - started) * 1000, len(raw_df))
+            styled_df = style_dataframe_for_display(raw_df)  # Style for display
+        
+            return {
+                entry_table: styled_df,  # CRITICAL: Use styled version
+                status_msg: _showing(raw_df, include_archive),
+                register_version_state: version,
+            }
+
+        def live_filter(request: gr.Request, cache, role, include_archive, *filter_vals):
+            """As-you-type filtering: narrow the previous result in memory when possible, else query"""
+            if not role:
+                return gr.skip()
+            key = (request.session_hash if request else None, "register")
+            ticket = LIVE_FILTER_REQUESTS.begin(key)
+            filters = dict(zip(DISPLAY_COLUMNS, filter_vals))
+            version = changefeed.overrides_feed.version()
+            cache_version = (version, bool(include_archive))  # a hot-only result cannot serve an archive search
+            if livefilter.reusable(cache, filters, cache_version, LIVE_EXACT_VALUES):
+                raw_df = livefilter.refine(cache["df"], filters, LIVE_EXACT_VALUES)
             else:
-                form_vals[col] = str(val) if pd.notna(val) else ""
-        
-        interactive = can_edit(role)
-        
-        outputs = {
-            current_entry_state: entry_no,
-            form_mode_state: "edit",
-            status_msg: f"Loaded entry #{entry_no} | Role: {role}",
-        }
+                started = time.perf_counter()
+                raw_df = get_filtered_data(filters, include_archive=include_archive)
+                if not include_archive:
+                    _record_filter_usage(filters, (time.perf_counter() - started) * 1000, len(raw_df))
+            if LIVE_FILTER_REQUESTS.is_stale(key, ticket):
+                return gr.skip()  # a newer keystroke is already being served
+        
+            return {
+                entry_table: style_dataframe_for_display(raw_df),
+                status_msg: _showing(raw_df, include_archive),
+                register_version_state: version,
+                live_filter_cache: livefilter.cache_entry(filters, cache_version, raw_df),
+            }
 
-        # CRITICAL: Set interactivity for new fields
-        approved_interactive = can_edit(role)
-        closed_interactive = can_edit(role)            
-        for col in DISPLAY_COLUMNS:
-            if col == 'No':
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-            elif col == 'Approved':
-                outputs[form_fields[col]] = gr.update(
-                    value=form_vals[col] if form_vals[col] in ["YES", "NO"] else "NO",
-                    interactive=approved_interactive
-                )
-            elif col == 'Closed':
-                outputs[form_fields[col]] = gr.update(
-                    value=form_vals[col] if form_vals[col] in ["YES", "NO"] else "NO",
-                    interactive=closed_interactive
-                )
-            elif col == 'Priority':
-                outputs[form_fields[col]] = gr.update(
-                    value=form_vals[col] if form_vals[col] in ["critical", "high", "medium", "low"] else "critical",
-                    interactive=can_edit(role)
-                )
+        def poll_register_changes(known_version, role, table_df, include_archive, *filter_vals):
+            """Timer tick: no-op unless the change feed moved; then merge only the changed rows"""
+            if not role:
+                return gr.skip()
+            version, changed, deleted, full_refresh = changefeed.overrides_feed.changes_since(known_version)
+            if known_version is None:
+                return {register_version_state: version}
+            if version == known_version:
+                return gr.skip()
+            
+            filters = dict(zip(DISPLAY_COLUMNS, filter_vals))
+            if full_refresh or table_df is None or 'No' not in table_df.columns:
+                raw_df = get_filtered_data(filters, include_archive=include_archive)
             else:
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=can_edit(role))
+                # An archived entry is a delete in the feed: with the archive shown it comes back from there
+                fresh = get_filtered_data(filters, entry_nos=changed + deleted if include_archive else changed,
+                                          include_archive=include_archive)
+                touched = {str(n) for n in changed + deleted}
+                kept = table_df[~table_df['No'].astype(str).isin(touched)]
+                raw_df = pd.concat([kept, fresh], ignore_index=True) if not fresh.empty else kept
+                raw_df = (raw_df.assign(_no=pd.to_numeric(raw_df['No'], errors='coerce'))
+                          .sort_values('_no').drop(columns='_no').reset_index(drop=True))
+            
+            return {
+                entry_table: style_dataframe_for_display(raw_df),
+                register_version_state: version,
+            }
+    
+        def _record_filter_usage(filters, elapsed_ms, rows):
+            """Feed the index advisor (never let bookkeeping break filtering)"""
+            try:
+                _, _, like_cols, exact_terms = build_filter_clauses(filters)
+                index_advisor.record(db_path(), get_connection, like_cols, exact_terms, elapsed_ms, rows)
+            except Exception as e:
+                print(f"⚠️ Index advisor record failed: {str(e)}")
+    
+        def load_entry(entry_no_str, role, recent=None):
+            if not entry_no_str or not entry_no_str.strip():
+                return {status_msg: "Please select an entry number"}
+        
+            try:
+                entry_no = int(float(entry_no_str))
+            except (ValueError, TypeError):
+                typed = re.match(r"\s*(\d+)", str(entry_no_str))  # typed label, e.g. "123 · TAG · ..."
+                if not typed:
+                    return {status_msg: "Invalid entry number"}
+                entry_no = int(typed.group(1))
+        
+            entry = get_entry_by_no(entry_no)
+            archived = entry is None
+            if archived:
+                entry = get_entry_by_no(entry_no, include_archive=True)
+            if not entry:
+                return {status_msg: f"Entry #{entry_no} not found"}
+        
+            form_vals = {}
+            for col in DISPLAY_COLUMNS:
+                val = entry.get(col, "")
+                if col == 'No':
+                    try:
+                        form_vals[col] = int(float(val)) if val else entry_no
+                    except:
+                        form_vals[col] = entry_no
+                else:
+                    form_vals[col] = str(val) if pd.notna(val) else ""
+        
+            editable = can_edit(role) and not archived  # archived entries are read-only
         
-        outputs[save_btn] = gr.update(visible=can_edit(role))
-        outputs[delete_btn] = gr.update(visible=can_delete(role))
-        return outputs
+            outputs = {
+                current_entry_state: entry_no,
+                form_mode_state: "edit",
+                status_msg: (f"📦 Entry #{entry_no} is archived (read-only) | Role: {role}" if archived
+                             else f"Loaded entry #{entry_no} | Role: {role}"),
+            }
+
+            # CRITICAL: Set interactivity for new fields
+            approved_interactive = editable
+            closed_interactive = editable
+            for col in DISPLAY_COLUMNS:
+                if col == 'No':
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+                elif col == 'Approved':
+                    outputs[form_fields[col]] = gr.update(
+                        value=form_vals[col] if form_vals[col] in ["YES", "NO"] else "NO",
+                        interactive=approved_interactive
+                    )
+                elif col == 'Closed':
+                    outputs[form_fields[col]] = gr.update(
+                        value=form_vals[col] if form_vals[col] in ["YES", "NO"] else "NO",
+                        interactive=closed_interactive
+                    )
+                elif col == 'Priority':
+                    outputs[form_fields[col]] = gr.update(
+                        value=form_vals[col] if form_vals[col] in ["critical", "high", "medium", "low"] else "critical",
+                        interactive=editable
+                    )
+                else:
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=editable)
+        
+            outputs[save_btn] = gr.update(visible=editable)
+            outputs[delete_btn] = gr.update(visible=can_delete(role) and not archived)
+            if recent is not None:  # called from the Load button (not from save_action)
+                choice = (lookup.choice_label(entry_no, form_vals['Module Parameter'], form_vals['Description']), str(entry_no))
+                recent = lookup.remember(recent, choice)
+                outputs[recent_entries_state] = recent
+                outputs[entry_selector] = gr.update(choices=lookup_choices("", recent), value=str(entry_no))
+            return outputs
+
+        def lookup_choices(q, recent):
+            """Top-N matches for the entry selector; this session's recent entries first when q is empty"""
+            conn = get_connection()
+            with metrics.db_timer("lookup_entries"):
+                matches = lookup.override_choices(conn, q)
+            conn.close()
+            return matches if (q or "").strip() else lookup.merge(recent or [], matches, limit=lookup.RECENT_LIMIT + lookup.LOOKUP_LIMIT)
+
+        def lookup_entries(role, recent, key_up: gr.KeyUpData):
+            """Autocomplete: typed text in the selector -> top-N matching entries"""
+            if not role:
+                return gr.skip()
+            return gr.update(choices=lookup_choices(key_up.input_value, recent))
+
+        def show_recent_entries(role, recent):
+            if not role:
+                return gr.skip()
+            return gr.update(choices=lookup_choices("", recent))
     
-    def create_new(role):
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT MAX(entry_no) FROM overrides")
-        next_no = (cursor.fetchone()[0] or 0) + 1
-        conn.close()
+        def create_new(role):
+            conn = get_connection()
+            cursor = conn.cursor()
+            with metrics.db_timer("next_entry_no"):
+                cursor.execute(f"SELECT MAX(entry_no) FROM {archive.ALL_VIEW}")
+                next_no = (cursor.fetchone()[0] or 0) + 1
+            conn.close()
         
-        now = datetime.datetime.now().strftime("%m/%d/%y %H:%M")
-        today = datetime.datetime.now().strftime("%m/%d/%y")
-        
-        form_vals = {
-            'No': next_no,
-            'Approved': 'NO',  # Default values
-            'Closed': 'NO',
-            'Time In': now,
-            'Module Parameter': "",
-            'Description': "",
-            'Alarm': "FGS bypass",
-            'Message': "MOS active",
-            'Priority': "critical",
-            'Status': "",
-            'Date On': today,
-            'Requested By': role.capitalize(),
-            'Date Off': "",
-            'Removal Requested By': ""
-        }
+            form_vals = {col: "" for col in DISPLAY_COLUMNS}
+            form_vals.update(new_entry_defaults())  # Default values
+            form_vals.update({'No': next_no, 'Requested By': role.capitalize()})
         
-        outputs = {
-            current_entry_state: None,
-            form_mode_state: "create",
-            status_msg: f"Creating new entry (No. {next_no}) | Role: {role}",
-        }
-        # CRITICAL: Set interactivity for new fields based on role
-        approved_interactive = can_edit(role)  # Only manager/admin
-        closed_interactive = can_edit(role)    # Only manager/admin
-        
-        for col in DISPLAY_COLUMNS:
-            if col == 'No':
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-            elif col in ['Approved', 'Closed']:
-                outputs[form_fields[col]] = gr.update(
-                    value=form_vals[col], 
-                    interactive=approved_interactive if col=='Approved' else closed_interactive
-                )
-            elif col == 'Priority':
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=True)
-            else:
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=True)
+            outputs = {
+                current_entry_state: None,
+                form_mode_state: "create",
+                status_msg: f"Creating new entry (No. {next_no}) | Role: {role}",
+            }
+            # CRITICAL: Set interactivity for new fields based on role
+            approved_interactive = can_edit(role)  # Only manager/admin
+            closed_interactive = can_edit(role)    # Only manager/admin
+        
+            for col in DISPLAY_COLUMNS:
+                if col == 'No':
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+                elif col in ['Approved', 'Closed']:
+                    outputs[form_fields[col]] = gr.update(
+                        value=form_vals[col], 
+                        interactive=approved_interactive if col=='Approved' else closed_interactive
+                    )
+                elif col == 'Priority':
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=True)
+                else:
+                    outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=True)
         
-        outputs[save_btn] = gr.update(visible=can_create(role), value="✅ Create New Entry")
-        outputs[delete_btn] = gr.update(visible=False)
-        return outputs
+            outputs[save_btn] = gr.update(visible=can_create(role), value="✅ Create New Entry")
+            outputs[delete_btn] = gr.update(visible=False)
+            return outputs
     
-    def save_action(*args):
-        if len(args) < 17:  
-            return {status_msg: f"Save error: insufficient inputs (expected 17, got {len(args)})"}
+        def _display_user(label):
+            """'manager (Editor)' -> 'manager'"""
+            return (label or "").split(" (")[0].strip()
+
+        def save_action(*args):
+            if len(args) < 17:  
+                return {status_msg: f"Save error: insufficient inputs (expected 17, got {len(args)})"}
         
-        # WAS: args[:12] → NOW: args[:14] for all form fields
-        field_vals = args[:14]  
-        role = args[14]      # WAS args[12]
-        mode = args[15]      # WAS args[13]
-        current_no = args[16]  # WAS args[14]
+            # WAS: args[:12] → NOW: args[:14] for all form fields
+            field_vals = args[:14]  
+            role = args[14]      # WAS args[12]
+            mode = args[15]      # WAS args[13]
+            current_no = args[16]  # WAS args[14]
+            user = _display_user(args[17]) if len(args) > 17 else role  # for the change history
         
-        data = dict(zip(DISPLAY_COLUMNS, field_vals))  # Now includes Approved/Closed
+            data = dict(zip(DISPLAY_COLUMNS, field_vals))  # Now includes Approved/Closed
         
-        # Validation (unchanged)
-        if not data['Module Parameter'].strip():
-            return {status_msg: "Error: Module Parameter is required"}
-        if not data['Description'].strip():
-            return {status_msg: "Error: Description is required"}
+            # Validation (unchanged)
+            if not data['Module Parameter'].strip():
+                return {status_msg: "Error: Module Parameter is required"}
+            if not data['Description'].strip():
+                return {status_msg: "Error: Description is required"}
         
-        try:
-            saved_no = save_entry(data, mode == "create", role)
-            action = "created" if mode == "create" else "updated"
+            try:
+                saved_no = save_entry(data, mode == "create", user)
+                action = "created" if mode == "create" else "updated"
             
-            df = get_filtered_data({})
-            raw_df = get_filtered_data({})
-            styled_df = style_dataframe_for_display(raw_df)
-            entry_nums = [str(int(x)) for x in raw_df['No'].tolist() if pd.notna(x) and x != ""] if not raw_df.empty else []
+                raw_df = get_filtered_data({})
+                styled_df = style_dataframe_for_display(raw_df)
             
-            outputs = {
-                status_msg: f"Entry #{saved_no} successfully {action}!",
-                entry_table: styled_df,  # Replace df with styled_df
-                entry_selector: gr.update(choices=entry_nums),
-                export_file: None,  # Clear previous exports
-                print_file: None,   # Clear previous prints
-            }
+                outputs = {
+                    status_msg: f"Entry #{saved_no} successfully {action}!",
+                    entry_table: styled_df,  # Replace df with styled_df
+                    export_file: None,  # Clear previous exports
+                    print_file: None,   # Clear previous prints
+                }
             
-            if mode == "create":
-                # Reset to NEW blank form (not load saved entry)
-                outputs.update(create_new(role))  
-            else:
-                # Only reload for EDIT mode
-                outputs.update(load_entry(str(saved_no), role))  
+                if mode == "create":
+                    # Reset to NEW blank form (not load saved entry)
+                    outputs.update(create_new(role))  
+                else:
+                    # Only reload for EDIT mode
+                    outputs.update(load_entry(str(saved_no), role))  
             
-            return outputs
+                return outputs
             
-        except Exception as e:
-            return {status_msg: f"Save failed: {str(e)}"}
+            except Exception as e:
+                return {status_msg: f"Save failed: {str(e)}"}
     
-    def delete_action(entry_no, role):
-        if not can_delete(role):
-            return {status_msg: "Insufficient permissions to delete entries"}
-        if not entry_no:
-            return {status_msg: "No entry selected for deletion"}
+        def delete_action(entry_no, role, user_label=""):
+            if not can_delete(role):
+                return {status_msg: "Insufficient permissions to delete entries"}
+            if not entry_no:
+                return {status_msg: "No entry selected for deletion"}
         
-        try:
-            delete_entry(entry_no)
-            df = get_filtered_data({})
-            aw_df = get_filtered_data({})
-            styled_df = style_dataframe_for_display(raw_df)
-            entry_nums = [str(int(x)) for x in raw_df['No'].tolist() if pd.notna(x) and x != ""] if not raw_df.empty else []
+            try:
+                delete_entry(entry_no, _display_user(user_label) or role)
+                raw_df = get_filtered_data({})
+                styled_df = style_dataframe_for_display(raw_df)
+            
+                form_vals = {k: "" for k in DISPLAY_COLUMNS}
+                form_vals['Priority'] = "critical"
+            
+                outputs = {
+                    status_msg: f"Entry #{entry_no} deleted successfully",
+                    entry_table: styled_df,  # Replace df with styled_df
+                    entry_selector: gr.update(value=None),
+                    export_file: gr.update(visible=True),
+                    print_file: gr.update(visible=True),
+                }
+                for col in DISPLAY_COLUMNS:
+                    if col == 'Priority':
+                        outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+                    else:
+                        outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
+            
+                outputs[save_btn] = gr.update(visible=False)
+                outputs[delete_btn] = gr.update(visible=False)
+                outputs[form_mode_state] = "view"
+                return outputs
             
+            except Exception as e:
+                return {status_msg: f"Delete failed: {str(e)}"}
+    
+        def cancel_action(role):
             form_vals = {k: "" for k in DISPLAY_COLUMNS}
             form_vals['Priority'] = "critical"
-            
+        
             outputs = {
-                status_msg: f"Entry #{entry_no} deleted successfully",
-                entry_table: styled_df,  # Replace df with styled_df
-                entry_selector: gr.update(choices=entry_nums),
+                status_msg: "Changes cancelled",
+                form_mode_state: "view",
+                current_entry_state: None,
                 export_file: gr.update(visible=True),
                 print_file: gr.update(visible=True),
             }
@@ -1487,247 +2011,579 @@ with gr.Blocks(title="CCR Override Register") as demo:
                     outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
                 else:
                     outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-            
+        
             outputs[save_btn] = gr.update(visible=False)
             outputs[delete_btn] = gr.update(visible=False)
-            outputs[form_mode_state] = "view"
             return outputs
-            
-        except Exception as e:
-            return {status_msg: f"Delete failed: {str(e)}"}
     
-    def cancel_action(role):
-        form_vals = {k: "" for k in DISPLAY_COLUMNS}
-        form_vals['Priority'] = "critical"
-        
-        outputs = {
-            status_msg: "Changes cancelled",
-            form_mode_state: "view",
-            current_entry_state: None,
-            export_file: gr.update(visible=True),
-            print_file: gr.update(visible=True),
-        }
-        for col in DISPLAY_COLUMNS:
-            if col == 'Priority':
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-            else:
-                outputs[form_fields[col]] = gr.update(value=form_vals[col], interactive=False)
-        
-        outputs[save_btn] = gr.update(visible=False)
-        outputs[delete_btn] = gr.update(visible=False)
-        return outputs
+        # ===== EVENT BINDINGS =====
+        login_btn.click(
+            metrics.instrument(login_action),
+            inputs=[username, password],
+            outputs=[
+                login_page, main_app, login_msg, user_display, role_state, register_version_state,
+                entry_table, entry_selector, status_msg, admin_tab,
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                save_btn, delete_btn, form_mode_state,
+                username, password, export_file, print_file
+            ]
+        )
     
-    # ===== EVENT BINDINGS =====
-    login_btn.click(
-        login_action,
-        inputs=[username, password],
-        outputs=[
-            login_page, main_app, login_msg, user_display, role_state, 
-            entry_table, entry_selector, status_msg, admin_tab,
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            save_btn, delete_btn, form_mode_state,
-            username, password, export_file, print_file
-        ]
-    )
+        logout_btn.click(
+            metrics.instrument(logout_action),
+            outputs=[
+                login_page, main_app, username, password, login_msg, role_state, admin_tab,
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                export_file, print_file
+            ]
+        )
     
-    logout_btn.click(
-        logout_action,
-        outputs=[
-            login_page, main_app, username, password, login_msg, role_state, admin_tab,
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            export_file, print_file
-        ]
-    )
+        # As-you-type filtering: debounced in the browser, off the queue, stale results dropped
+        gr.on(
+            triggers=[filter_inputs[col].input for col in DISPLAY_COLUMNS],
+            fn=metrics.instrument(live_filter),
+            inputs=[live_filter_cache, role_state, include_archive_box, *[filter_inputs[col] for col in DISPLAY_COLUMNS]],
+            outputs=[entry_table, status_msg, register_version_state, live_filter_cache],
+            js=livefilter.debounce_js("register"),
+            trigger_mode="multiple",
+            queue=False,
+            show_progress="hidden"
+        )
     
-    filter_btn.click(
-        apply_filters,
-        inputs=[*[filter_inputs[col] for col in DISPLAY_COLUMNS], role_state],
-        outputs=[entry_table, entry_selector, status_msg]
-    )
+        gr.on(
+            triggers=[filter_btn.click, include_archive_box.change],
+            fn=metrics.instrument(apply_filters),
+            inputs=[*[filter_inputs[col] for col in DISPLAY_COLUMNS], role_state, include_archive_box],
+            outputs=[entry_table, status_msg, register_version_state]
+        )
     
-    load_btn.click(
-        load_entry,
-        inputs=[entry_selector, role_state],
-        outputs=[
-            current_entry_state, form_mode_state, status_msg,
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            save_btn, delete_btn
-        ]
-    )
+        # Live updates: cheap change-feed poll, kept off the queue
+        register_timer.tick(
+            metrics.instrument(poll_register_changes),
+            inputs=[register_version_state, role_state, entry_table, include_archive_box,
+                    *[filter_inputs[col] for col in DISPLAY_COLUMNS]],
+            outputs=[entry_table, register_version_state],
+            queue=False,
+            show_progress="hidden"
+        )
     
-    create_btn.click(
-        create_new,
-        inputs=[role_state],
-        outputs=[
-            current_entry_state, form_mode_state, status_msg,
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            save_btn, delete_btn
-        ]
-    )
+        load_btn.click(
+            metrics.instrument(load_entry),
+            inputs=[entry_selector, role_state, recent_entries_state],
+            outputs=[
+                current_entry_state, form_mode_state, status_msg,
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                save_btn, delete_btn, recent_entries_state, entry_selector
+            ]
+        )
     
-    save_btn.click(
-        save_action,
-        inputs=[
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            role_state, form_mode_state, current_entry_state
-        ],
-        outputs=[
-            status_msg, entry_table, entry_selector,
-            current_entry_state, form_mode_state,
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            save_btn, delete_btn, export_file, print_file
-        ]
-    )
+        # Autocomplete: top-N matches as the user types; recent entries when the selector opens
+        entry_selector.key_up(
+            metrics.instrument(lookup_entries),
+            inputs=[role_state, recent_entries_state],
+            outputs=[entry_selector],
+            js=livefilter.debounce_js("entry_lookup", 150),
+            trigger_mode="multiple",
+            queue=False,
+            show_progress="hidden"
+        )
+        entry_selector.focus(
+            metrics.instrument(show_recent_entries),
+            inputs=[role_state, recent_entries_state],
+            outputs=[entry_selector],
+            queue=False,
+            show_progress="hidden"
+        )
     
-    delete_btn.click(
-        delete_action,
-        inputs=[current_entry_state, role_state],
-        outputs=[
-            status_msg, entry_table, entry_selector,
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            save_btn, delete_btn, form_mode_state, export_file, print_file
-        ]
-    )
+        create_btn.click(
+            metrics.instrument(create_new),
+            inputs=[role_state],
+            outputs=[
+                current_entry_state, form_mode_state, status_msg,
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                save_btn, delete_btn
+            ]
+        )
     
-    cancel_btn.click(
-        cancel_action,
-        inputs=[role_state],
-        outputs=[
-            status_msg, form_mode_state, current_entry_state,
-            *[form_fields[col] for col in DISPLAY_COLUMNS],
-            save_btn, delete_btn, export_file, print_file
-        ]
-    )
+        save_btn.click(
+            metrics.instrument(save_action),
+            inputs=[
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                role_state, form_mode_state, current_entry_state, user_display
+            ],
+            outputs=[
+                status_msg, entry_table, entry_selector,
+                current_entry_state, form_mode_state,
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                save_btn, delete_btn, export_file, print_file
+            ]
+        )
     
-    # Export/Print bindings
-    export_excel_btn.click(
-        export_entire_database,
-        inputs=[role_state],
-        outputs=[export_file, status_msg]
-    )
-
-    print_pdf_btn.click(
-        print_current_table_to_pdf,
-        inputs=[entry_table, role_state],
-        outputs=[print_file, status_msg]
-    )
-    # Admin import binding
-    # REMOVE existing import_btn.click chain and REPLACE with:
-    def refresh_table_after_import(role):
-        """Helper: Refresh table with styling + update selector"""
-        raw_df = get_filtered_data({})
-        styled_df = style_dataframe_for_display(raw_df)
-        entry_nums = [str(int(x)) for x in raw_df['No'].tolist() if pd.notna(x) and x != ""] if not raw_df.empty else []
-        return styled_df, gr.update(choices=entry_nums)
-
-    import_btn.click(
-        import_excel_data,
-        inputs=[excel_upload, role_state],
-        outputs=[import_status]
-    ).then(
-        refresh_table_after_import,
-        inputs=[role_state],
-        outputs=[entry_table, entry_selector]  # Single call updates both
-    )
-
-
-    # ===== EMAIL FUNCTIONALITY =====
-    def send_to_managers(role, table_df):
-        """Send exports to managers from emails.txt"""
-        if not role:
-            return "❌ Not authenticated. Please login first."
+        delete_btn.click(
+            metrics.instrument(delete_action),
+            inputs=[current_entry_state, role_state, user_display],
+            outputs=[
+                status_msg, entry_table, entry_selector,
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                save_btn, delete_btn, form_mode_state, export_file, print_file
+            ]
+        )
+    
+        cancel_btn.click(
+            metrics.instrument(cancel_action),
+            inputs=[role_state],
+            outputs=[
+                status_msg, form_mode_state, current_entry_state,
+                *[form_fields[col] for col in DISPLAY_COLUMNS],
+                save_btn, delete_btn, export_file, print_file
+            ]
+        )
+    
+        # Export/Print bindings
+        export_excel_btn.click(
+            metrics.instrument(exportstore.served(export_entire_database)),
+            inputs=[role_state],
+            outputs=[export_file, status_msg]
+        )
+
+        print_pdf_btn.click(
+            metrics.instrument(exportstore.served(print_current_table_to_pdf)),
+            inputs=[entry_table, role_state],
+            outputs=[print_file, status_msg]
+        )
+        # Admin import binding
+        # REMOVE existing import_btn.click chain and REPLACE with:
+        def refresh_table_after_import(role):
+            """Helper: Refresh table with styling (selector choices come from the lookup)"""
+            raw_df = get_filtered_data({})
+            return style_dataframe_for_display(raw_df)
+
+        import_btn.click(
+            metrics.instrument(import_excel_data),
+            inputs=[excel_upload, role_state],
+            outputs=[import_status]
+        ).then(
+            metrics.instrument(refresh_table_after_import),
+            inputs=[role_state],
+            outputs=[entry_table]
+        )
+
+
+        # Admin SQL tracing bindings
+        def _sql_trace_state():
+            state = "ON" if sqltrace.ENABLED else "OFF"
+            return f"SQL tracing {state} | threshold {sqltrace.SLOW_QUERY_MS:g} ms"
+
+        def apply_sql_trace_settings(enabled, threshold, role):
+            if role != 'admin':
+                return "❌ Access denied! Admin privileges required."
+            sqltrace.configure(enabled=enabled, slow_query_ms=threshold or 0)
+            return f"✅ {_sql_trace_state()}"
+
+        def refresh_slow_queries(role):
+            if role != 'admin':
+                return pd.DataFrame(), "❌ Access denied! Admin privileges required."
+            rows = sqltrace.top_statements(20)
+            return pd.DataFrame(rows), f"{_sql_trace_state()} | {len(rows)} statement(s) tracked"
+
+        def reset_slow_queries(role):
+            if role != 'admin':
+                return pd.DataFrame(), "❌ Access denied! Admin privileges required."
+            sqltrace.reset()
+            return pd.DataFrame(), f"✅ Statistics cleared | {_sql_trace_state()}"
+
+        sql_trace_apply_btn.click(
+            metrics.instrument(apply_sql_trace_settings),
+            inputs=[sql_trace_enabled, sql_trace_threshold, role_state],
+            outputs=[sql_trace_status]
+        )
+        sql_trace_refresh_btn.click(
+            metrics.instrument(refresh_slow_queries),
+            inputs=[role_state],
+            outputs=[sql_trace_table, sql_trace_status]
+        )
+        sql_trace_reset_btn.click(
+            metrics.instrument(reset_slow_queries),
+            inputs=[role_state],
+            outputs=[sql_trace_table, sql_trace_status]
+        )
+
+        # Admin index advisor bindings
+        def refresh_index_advisor(role):
+            if role != 'admin':
+                return pd.DataFrame(), gr.update(choices=[]), "❌ Access denied! Admin privileges required."
+            conn = get_connection()
+            index_advisor.flush(db_path(), conn)
+            recs = index_advisor.recommend(conn, EXACT_MATCH_VALUES)
+            names = sorted({r["Index"] for r in recs if r["Index"]} | set(index_advisor.advisor_indexes(conn)))
+            conn.close()
+            return pd.DataFrame(recs), gr.update(choices=names, value=names[0] if names else None), f"{len(recs)} filter combination(s) observed"
+
+        def refresh_advisor_table(role):
+            """Refresh table + selector but keep the before/after report visible"""
+            return refresh_index_advisor(role)[:2]
+
+        def create_advisor_index(index_name, role):
+            if role != 'admin':
+                return "❌ Access denied! Admin privileges required."
+            conn = get_connection()
+            try:
+                return index_advisor.apply_index(conn, index_name, EXACT_MATCH_VALUES)
+            except Exception as e:
+                return f"❌ Index creation failed: {str(e)}"
+            finally:
+                conn.close()
+
+        def drop_advisor_index(index_name, role):
+            if role != 'admin':
+                return "❌ Access denied! Admin privileges required."
+            conn = get_connection()
+            try:
+                return index_advisor.apply_index(conn, index_name, EXACT_MATCH_VALUES, drop=True)
+            except Exception as e:
+                return f"❌ Index drop failed: {str(e)}"
+            finally:
+                conn.close()
+
+        advisor_refresh_btn.click(
+            metrics.instrument(refresh_index_advisor),
+            inputs=[role_state],
+            outputs=[advisor_table, advisor_index_selector, advisor_status]
+        )
+        advisor_create_btn.click(
+            metrics.instrument(create_advisor_index),
+            inputs=[advisor_index_selector, role_state],
+            outputs=[advisor_status]
+        ).then(
+            metrics.instrument(refresh_advisor_table),
+            inputs=[role_state],
+            outputs=[advisor_table, advisor_index_selector]
+        )
+        advisor_drop_btn.click(
+            metrics.instrument(drop_advisor_index),
+            inputs=[advisor_index_selector, role_state],
+            outputs=[advisor_status]
+        ).then(
+            metrics.instrument(refresh_advisor_table),
+            inputs=[role_state],
+            outputs=[advisor_table, advisor_index_selector]
+        )
+
+        # Change history bindings
+        def show_register_as_of(role, when):
+            if not role:
+                return gr.skip(), "❌ Not authenticated. Please login first."
+            if not re.match(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}(:\d{2})?$", (when or "").strip()):
+                return gr.skip(), "❌ Use the format YYYY-MM-DD HH:MM"
+            conn = get_connection()
+            try:
+                with metrics.db_timer("history_as_of"):
+                    records, msg = history.as_of(conn, when)
+            finally:
+                conn.close()
+            if records is None:
+                return pd.DataFrame(columns=DISPLAY_COLUMNS), msg
+            df = pd.DataFrame(records).rename(columns=reverse_mapping)
+            return style_dataframe_for_display(df[[c for c in DISPLAY_COLUMNS if c in df.columns]]), msg
+
+        def show_entry_history(role, entry_no):
+            if not role:
+                return gr.skip(), "❌ Not authenticated. Please login first."
+            try:
+                entry_no = int(str(entry_no).strip())
+            except ValueError:
+                return gr.skip(), "❌ Enter an entry number"
+            conn = get_connection()
+            try:
+                rows = history.entry_history(conn, entry_no)
+            finally:
+                conn.close()
+            return (pd.DataFrame(rows, columns=["When", "By", "Action", "Changes"]),
+                    f"✅ {len(rows)} recorded change(s) for entry #{entry_no}")
+
+        history_asof_btn.click(
+            metrics.instrument(show_register_as_of),
+            inputs=[role_state, history_when],
+            outputs=[history_table, history_status]
+        )
+        history_entry_btn.click(
+            metrics.instrument(show_entry_history),
+            inputs=[role_state, history_entry_no],
+            outputs=[history_entry_table, history_status]
+        )
+
+        # All-assets (federated) bindings
+        def search_all_assets(role, module_parameter, description, closed):
+            if not role:
+                return gr.skip(), "❌ Not authenticated. Please login first."
+            filters = {'Module Parameter': module_parameter, 'Description': description, 'Closed': closed}
+            try:
+                df = get_filtered_data_all_assets({k: v for k, v in filters.items() if v and v.strip()})
+            except Exception as e:
+                return gr.skip(), f"❌ Federated search failed: {str(e)}"
+            per_asset = df["Asset"].value_counts()
+            counts = " · ".join(f"{a}: {per_asset.get(a, 0)}" for a in assets.names())
+            return df, f"✅ {len(df)} entries across {len(assets.names())} assets ({counts})"
+
+        fed_search_btn.click(
+            metrics.instrument(search_all_assets),
+            inputs=[role_state, fed_module, fed_description, fed_closed],
+            outputs=[fed_table, fed_status]
+        )
+
+        # Bypass exposure bindings
+        def show_exposure(role, rollup_name):
+            if not role:
+                return "❌ Not authenticated. Please login first.", gr.skip(), gr.skip(), gr.skip()
+            stats = get_exposure()
+            summary = (f"**As of {stats['computed_at']:%Y-%m-%d %H:%M}**\n\n"
+                       + exposure.summary_text(stats).replace("  • ", "- "))
+            return summary, stats["rollups"][rollup_name], stats["age_distribution"], stats["longest"]
+
+        gr.on(
+            triggers=[exposure_tab.select, exposure_refresh_btn.click, exposure_rollup.change],
+            fn=metrics.instrument(show_exposure),
+            inputs=[role_state, exposure_rollup],
+            outputs=[exposure_summary, exposure_rollup_table, exposure_age_plot, exposure_longest_table]
+        )
+
+        # Admin export store bindings
+        def refresh_export_store(role):
+            if role != 'admin':
+                return pd.DataFrame(), "❌ Access denied! Admin privileges required."
+            rows = exportstore.stats()
+            total = sum(r["Size (MB)"] for r in rows)
+            return pd.DataFrame(rows), f"{sum(r['Files'] for r in rows)} file(s), {total:.1f} MB in use"
+
+        def sweep_export_store(role):
+            if role != 'admin':
+                return pd.DataFrame(), "❌ Access denied! Admin privileges required."
+            removed, freed = exportstore.sweep()
+            table, status = refresh_export_store(role)
+            return table, f"✅ Evicted {removed} file(s), {freed / 1024 / 1024:.1f} MB freed | {status}"
+
+        export_store_refresh_btn.click(
+            metrics.instrument(refresh_export_store),
+            inputs=[role_state],
+            outputs=[export_store_table, export_store_status]
+        )
+        export_store_sweep_btn.click(
+            metrics.instrument(sweep_export_store),
+            inputs=[role_state],
+            outputs=[export_store_table, export_store_status]
+        )
+
+        # Admin database backup bindings
+        def refresh_backups(role):
+            if role != 'admin':
+                return pd.DataFrame(), gr.update(choices=[]), "❌ Access denied! Admin privileges required."
+            rows = backup.list_backups()
+            return (pd.DataFrame(rows, columns=BACKUP_COLUMNS), gr.update(choices=[r["File"] for r in rows], value=None),
+                    f"{len(rows)} backup(s) of {assets.current()}")
+
+        def run_backup_now(role):
+            if role != 'admin':
+                return pd.DataFrame(), gr.update(choices=[]), "❌ Access denied! Admin privileges required."
+            try:
+                b = backup.backup_now(db_path())
+            except Exception as e:
+                return gr.skip(), gr.skip(), f"❌ Backup failed: {str(e)}"
+            table, choices, _ = refresh_backups(role)
+            return table, choices, (f"✅ {b['file']}: {b['size'] / 1024 / 1024:.1f} MB in {b['duration_s']} s, "
+                                    f"longest lock {b['max_lock_ms']} ms over {b['steps']} step(s), integrity {b['integrity']}")
+
+        def restore_backup(role, filename):
+            if role != 'admin':
+                return pd.DataFrame(), gr.update(choices=[]), "❌ Access denied! Admin privileges required."
+            if not filename:
+                return gr.skip(), gr.skip(), "❌ Select a backup to restore"
+            floor = changefeed.overrides_feed.version()
+            conn = get_connection()
+            try:
+                replication_floor = replication.issued(conn)
+            finally:
+                conn.close()
+            try:
+                def after_copy(conn):
+                    archive.ensure_schema(conn)  # a backup older than the archive table
+                    changefeed.rebase(conn, floor)
+                    replication.rebase(conn, replication_floor)  # the peer gets the restored register
+                safety, seconds = backup.restore(db_path(), filename, after_copy=after_copy)
+            except Exception as e:
+                return gr.skip(), gr.skip(), f"❌ Restore failed (database unchanged): {str(e)}"
+            handover.clear_mark(REPORT_MARK)  # the next scheduled report sends the full register
+            table, choices, _ = refresh_backups(role)
+            return table, choices, (f"✅ Restored {filename} in {seconds:.2f} s - previous database saved as {safety}. "
+                                    "Open screens refresh automatically.")
+
+        backup_refresh_btn.click(
+            metrics.instrument(refresh_backups),
+            inputs=[role_state],
+            outputs=[backup_table, backup_selector, backup_status]
+        )
+        backup_now_btn.click(
+            metrics.instrument(run_backup_now),
+            inputs=[role_state],
+            outputs=[backup_table, backup_selector, backup_status]
+        )
+        backup_restore_btn.click(
+            metrics.instrument(restore_backup),
+            inputs=[role_state, backup_selector],
+            outputs=[backup_table, backup_selector, backup_status]
+        )
+
+        # Admin override archive bindings
+        def refresh_archive(role):
+            if role != 'admin':
+                return "❌ Access denied! Admin privileges required."
+            conn = get_connection()
+            try:
+                hot, archived = archive.counts(conn)
+                due = len(archive.due_entries(conn))
+            finally:
+                conn.close()
+            return f"{assets.current()}: {hot} entries in the register, {archived} archived, {due} due for archiving"
+
+        def run_archive_now(role):
+            if role != 'admin':
+                return "❌ Access denied! Admin privileges required."
+            conn = get_connection()
+            try:
+                moved = archive.archive_closed(conn)
+            except Exception as e:
+                return f"❌ Archiving failed (nothing moved): {str(e)}"
+            finally:
+                conn.close()
+            return f"✅ Archived {moved} closed entries. " + refresh_archive(role)
+
+        archive_refresh_btn.click(
+            metrics.instrument(refresh_archive),
+            inputs=[role_state],
+            outputs=[archive_status]
+        )
+        archive_now_btn.click(
+            metrics.instrument(run_archive_now),
+            inputs=[role_state],
+            outputs=[archive_status]
+        )
+
+        def refresh_replication(role):
+            if role != 'admin':
+                return "❌ Access denied! Admin privileges required."
+            conn = get_connection()
+            try:
+                return f"{assets.current()}:\n" + replication.status(conn)
+            finally:
+                conn.close()
+
+        def run_replication_now(role):
+            if role != 'admin':
+                return "❌ Access denied! Admin privileges required."
+            if not replication.ENABLED:
+                return "❌ Replication is off: set CCR_REPLICATION_PEER and CCR_REPLICATION_TOKEN"
+            try:
+                shipped = replication.ship_once()
+            except Exception as e:
+                return f"❌ Shipping failed (records kept for the next attempt): {str(e)}"
+            return f"✅ {shipped} change record(s) acknowledged by the peer.\n" + refresh_replication(role)
+
+        replication_refresh_btn.click(
+            metrics.instrument(refresh_replication),
+            inputs=[role_state],
+            outputs=[replication_status]
+        )
+        replication_now_btn.click(
+            metrics.instrument(run_replication_now),
+            inputs=[role_state],
+            outputs=[replication_status]
+        )
+
+        # ===== EMAIL FUNCTIONALITY =====
+        def send_to_managers(role, table_df):
+            """Send exports to managers from emails.txt"""
+            if not role:
+                return "❌ Not authenticated. Please login first."
         
-        managers, error = read_manager_emails()
-        if error:
-            return error
-        
-        excel_path, pdf_path, gen_error = generate_email_exports(role, table_df)
-        if gen_error:
-            return gen_error
-        
-        status = send_email_with_exports(managers, role, excel_path, pdf_path)
-        
-        # Cleanup temp files
-        for path in [excel_path, pdf_path]:
-            try: 
-                if path and os.path.exists(path): 
-                    os.remove(path)
-            except: 
-                pass
-        
-        return status
-
-    def send_to_custom(role, table_df, recipients_text, note):
-        """Send exports to custom email list"""
-        if not role:
-            return "❌ Not authenticated. Please login first."
-        
-        # Parse and validate emails
-        email_pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-        recipients = []
-        invalid = []
-        
-        for line in recipients_text.strip().split('\n'):
-            email = line.strip()
-            if email and not email.startswith('#'):
-                if email_pattern.match(email):
-                    recipients.append(email)
-                else:
-                    invalid.append(email)
+            managers, error = read_manager_emails()
+            if error:
+                return error
+        
+            with read_snapshot():  # attachments (and a fallback summary PDF) all from one instant
+                excel_path, pdf_path, gen_error = generate_email_exports(role, table_df)
+                if gen_error:
+                    return gen_error
         
-        if invalid:
-            return f"❌ Invalid emails skipped: {', '.join(invalid[:3])}{'...' if len(invalid)>3 else ''}"
-        if not recipients:
-            return "❌ No valid email addresses provided. Enter one per line."
+                status = send_email_with_exports(managers, role, excel_path, pdf_path)
         
-        excel_path, pdf_path, gen_error = generate_email_exports(role, table_df)
-        if gen_error:
-            return gen_error
+            # Cleanup temp files
+            for path in [excel_path, pdf_path]:
+                try: 
+                    if path and os.path.exists(path): 
+                        os.remove(path)
+                except: 
+                    pass
         
-        status = send_email_with_exports(recipients, role, excel_path, pdf_path, note)
+            return status
+
+        def send_to_custom(role, table_df, recipients_text, note):
+            """Send exports to custom email list"""
+            if not role:
+                return "❌ Not authenticated. Please login first."
         
-        # Cleanup
-        for path in [excel_path, pdf_path]:
-            try: 
-                if path and os.path.exists(path): 
-                    os.remove(path)
-            except: 
-                pass
+            # Parse and validate emails
+            email_pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+            recipients = []
+            invalid = []
         
-        return status
+            for line in recipients_text.strip().split('\n'):
+                email = line.strip()
+                if email and not email.startswith('#'):
+                    if email_pattern.match(email):
+                        recipients.append(email)
+                    else:
+                        invalid.append(email)
+        
+            if invalid:
+                return f"❌ Invalid emails skipped: {', '.join(invalid[:3])}{'...' if len(invalid)>3 else ''}"
+            if not recipients:
+                return "❌ No valid email addresses provided. Enter one per line."
+        
+            with read_snapshot():  # attachments (and a fallback summary PDF) all from one instant
+                excel_path, pdf_path, gen_error = generate_email_exports(role, table_df)
+                if gen_error:
+                    return gen_error
+        
+                status = send_email_with_exports(recipients, role, excel_path, pdf_path, note)
+        
+            # Cleanup
+            for path in [excel_path, pdf_path]:
+                try: 
+                    if path and os.path.exists(path): 
+                        os.remove(path)
+                except: 
+                    pass
+        
+            return status
+
+        # Bind email buttons
+        send_email_btn.click(
+            metrics.instrument(send_to_managers),
+            inputs=[role_state, entry_table],
+            outputs=[email_status]
+        )
 
-    # Bind email buttons
-    send_email_btn.click(
-        send_to_managers,
-        inputs=[role_state, entry_table],
-        outputs=[email_status]
-    )
+        send_custom_btn.click(
+            metrics.instrument(send_to_custom),
+            inputs=[role_state, entry_table, email_recipients, email_note],
+            outputs=[custom_email_status]
+        )
 
-    send_custom_btn.click(
-        send_to_custom,
-        inputs=[role_state, entry_table, email_recipients, email_note],
-        outputs=[custom_email_status]
-    )
+    return assets.scope_handlers(demo)
 
 
 # ======================
 # LAUNCH APPLICATION
 # ======================
 if __name__ == "__main__":
-    # Auto-detect LAN IP address
-    local_ip = "127.0.0.1"
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(0.1)
-        s.connect(("10.255.255.255", 1))
-        local_ip = s.getsockname()[0]
-        s.close()
-    except Exception:
-        try:
-            local_ip = socket.gethostbyname(socket.gethostname())
-            if local_ip.startswith("127.") or ":" in local_ip:
-                local_ip = "YOUR_LOCAL_IP"
-        except:
-            local_ip = "YOUR_LOCAL_IP"
-    
-    demo.launch()
\ No newline at end of file
+    startup()
+    build_demo().launch()
@@ -0,0 +1,214 @@
+"""
+Streaming PDF table writer for long reports (shutdown log printout)
+fpdf2 keeps every page in memory until output(). This writer appends each page to the file as
+soon as it is full, so memory holds one page of drawing commands whatever the number of rows.
+Text uses the standard Helvetica fonts (WinAnsi, not embedded). Wrapping is measured with the
+Helvetica glyph widths shipped with fpdf2, not guessed from a character count. The header row
+repeats on every page, and a row taller than the space left continues on the next page instead
+of running off the bottom.
+
+    with TableWriter(path, columns, widths_mm, title="...", subtitle="...") as table:
+        for row in rows:
+            table.add_row(row)
+    table.pages  # page count
+"""
+import zlib
+
+MM = 72 / 25.4                       # points per millimetre
+A3_LANDSCAPE = (420 * MM, 297 * MM)  # width, height in points
+A4_LANDSCAPE = (297 * MM, 210 * MM)
+FONTS = {"F1": ("Helvetica", "helvetica"), "F2": ("Helvetica-Bold", "helveticaB"),
+         "F3": ("Helvetica-Oblique", "helveticaI")}
+_FIRST_PAGE_OBJ = 6                  # 1 catalog, 2 page tree, 3-5 fonts
+
+
+def _encode(text):
+    """WinAnsi bytes (characters outside cp1252 print as '?')"""
+    return str(text).encode("cp1252", errors="replace")
+
+
+def _pdf_string(data):
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+class TableWriter:
+    def __init__(self, path, columns, widths_mm, title="", subtitle="", footer="",
+                 page_size=A3_LANDSCAPE, margin_mm=10, font_size=7, header_size=8):
+        from fpdf.fonts import CORE_FONTS_CHARWIDTHS  # fpdf2 is the PDF dependency of the app
+        self._widths = {key: [CORE_FONTS_CHARWIDTHS[name].get(chr(b), 500) for b in range(256)]  # per WinAnsi byte
+                        for key, (_, name) in FONTS.items()}
+        self.columns = list(columns)
+        scale = (page_size[0] - 2 * margin_mm * MM) / (sum(widths_mm) * MM)  # stretch to the printable width
+        self.col_widths = [w * MM * scale for w in widths_mm]
+        self.title, self.subtitle, self.footer = title, subtitle, footer
+        self.page_w, self.page_h = page_size
+        self.margin = margin_mm * MM
+        self.font_size, self.header_size = font_size, header_size
+        self.leading = font_size * 1.25
+        self.padding = 2.0
+        self.pages = 0
+        self.rows = 0
+        self._f = open(path, "wb")
+        self._offsets = {}
+        self._ops = None
+        self._y = 0.0
+        self._fresh = False       # nothing drawn below the header yet
+        self._capacity = 0        # text lines that fit below the header of a continuation page
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        for num, (key, (base, _)) in enumerate(FONTS.items(), start=3):
+            self._object(num, b"<< /Type /Font /Subtype /Type1 /BaseFont /" + base.encode()
+                         + b" /Encoding /WinAnsiEncoding >>")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
+
+    # ======================
+    # TEXT MEASUREMENT
+    # ======================
+    def text_width(self, text, font="F1", size=None):
+        widths = self._widths[font]
+        return sum(widths[b] for b in _encode(text)) * (size or self.font_size) / 1000
+
+    def wrap(self, text, width, font="F1", size=None):
+        """Lines of `text` that fit `width` points (words longer than a line are broken)"""
+        space = self.text_width(" ", font, size)
+        lines = []
+        for paragraph in str(text).replace("\r\n", "\n").split("\n"):
+            line, line_w = "", 0.0
+            for word in paragraph.split():
+                word_w = self.text_width(word, font, size)
+                if line and line_w + space + word_w <= width:
+                    line, line_w = f"{line} {word}", line_w + space + word_w
+                    continue
+                if line:
+                    lines.append(line)
+                while word_w > width and len(word) > 1:  # e.g. a long tag list without spaces
+                    cut = max(1, min(len(word) - 1, int(len(word) * width / word_w)))
+                    while cut > 1 and self.text_width(word[:cut], font, size) > width:
+                        cut -= 1
+                    lines.append(word[:cut])
+                    word = word[cut:]
+                    word_w = self.text_width(word, font, size)
+                line, line_w = word, word_w
+            lines.append(line)
+        while len(lines) > 1 and not lines[-1]:
+            lines.pop()
+        return lines
+
+    # ======================
+    # PAGES
+    # ======================
+    def _object(self, num, body):
+        self._offsets[num] = self._f.tell()
+        self._f.write(f"{num} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _text(self, x, y, text, font="F1", size=None, align="L", width=0):
+        size = size or self.font_size
+        if align == "C":
+            x += (width - self.text_width(text, font, size)) / 2
+        self._ops.append(b"BT /" + font.encode() + f" {size} Tf {x:.2f} {self.page_h - y - size:.2f} Td ".encode()
+                         + _pdf_string(_encode(text)) + b" Tj ET")
+
+    def _rect(self, x, y, w, h, fill=None):
+        box = f"{x:.2f} {self.page_h - y - h:.2f} {w:.2f} {h:.2f} re".encode()
+        if fill:
+            self._ops.append(f"{fill[0]:.3f} {fill[1]:.3f} {fill[2]:.3f} rg ".encode() + box + b" B 0 g")
+        else:
+            self._ops.append(box + b" S")
+
+    def _new_page(self):
+        if self._ops is not None:
+            self._finish_page()
+        self._ops = [b"0.5 w"]
+        self.pages += 1
+        self._y = self.margin
+        if self.pages == 1 and self.title:
+            self._text(self.margin, self._y, self.title, "F2", 14, "C", self.page_w - 2 * self.margin)
+            self._y += 20
+            if self.subtitle:
+                self._text(self.margin, self._y, self.subtitle, "F1", 9, "C", self.page_w - 2 * self.margin)
+                self._y += 16
+            self._y += 4
+        self._draw_header()
+
+    def _draw_header(self):
+        cells = [self.wrap(c, w - 2 * self.padding, "F2", self.header_size) for c, w in zip(self.columns, self.col_widths)]
+        height = max(len(c) for c in cells) * self.header_size * 1.25 + 2 * self.padding
+        x = self.margin
+        for lines, w in zip(cells, self.col_widths):
+            self._rect(x, self._y, w, height, fill=(0.902, 0.902, 0.98))
+            for i, line in enumerate(lines):
+                self._text(x + self.padding, self._y + self.padding + i * self.header_size * 1.25, line, "F2",
+                           self.header_size, "C", w - 2 * self.padding)
+            x += w
+        self._y += height
+        self._fresh = True
+        self._capacity = int((self._bottom() - self.margin - height - 2 * self.padding) // self.leading)
+
+    def _bottom(self):
+        return self.page_h - self.margin - 14  # room for the page footer
+
+    def _finish_page(self):
+        footer = f"{self.footer} | Page {self.pages}" if self.footer else f"Page {self.pages}"
+        self._text(self.margin, self.page_h - self.margin - 8, footer, "F3", 8, "C", self.page_w - 2 * self.margin)
+        content = zlib.compress(b"\n".join(self._ops), 6)
+        num = _FIRST_PAGE_OBJ + 2 * (self.pages - 1)
+        self._object(num, f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode()
+                     + content + b"\nendstream")
+        fonts = b" ".join(f"/{key} {n} 0 R".encode() for n, key in enumerate(FONTS, start=3))
+        self._object(num + 1, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.page_w:.2f} {self.page_h:.2f}] "
+                     f"/Contents {num} 0 R /Resources << /Font << ".encode() + fonts + b" >> >> >>")
+        self._f.flush()
+        self._ops = None
+
+    def add_row(self, values):
+        """Wrap every cell, then draw the row - continued on the next page(s) when it does not fit"""
+        if self._ops is None:
+            self._new_page()
+        cells = [self.wrap("" if v is None else v, w - 2 * self.padding) for v, w in zip(values, self.col_widths)]
+        self.rows += 1
+        while True:
+            room = int((self._bottom() - self._y - 2 * self.padding) // self.leading)
+            needed = max(len(c) for c in cells)
+            # A row that fits a page starts on a new page; a longer one is split (>= 3 lines per part)
+            if not self._fresh and (needed > room if needed <= self._capacity else room < 3):
+                self._new_page()
+                continue
+            take = max(1, min(room, needed))
+            height = take * self.leading + 2 * self.padding
+            x = self.margin
+            for i, (lines, w) in enumerate(zip(cells, self.col_widths)):
+                self._rect(x, self._y, w, height)
+                for j, line in enumerate(lines[:take]):
+                    self._text(x + self.padding, self._y + self.padding + j * self.leading, line,
+                               align="C" if i == 0 else "L", width=w - 2 * self.padding)
+                x += w
+            self._y += height
+            self._fresh = False
+            cells = [lines[take:] for lines in cells]
+            if not any(cells):
+                return
+            self._new_page()
+
+    def close(self):
+        if self._ops is None and self.pages == 0:
+            self._new_page()  # an empty table still prints its header
+        if self._ops is not None:
+            self._finish_page()
+        kids = " ".join(f"{_FIRST_PAGE_OBJ + 2 * i + 1} 0 R" for i in range(self.pages))
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {self.pages} >>".encode())
+        xref = self._f.tell()
+        last = max(self._offsets)
+        self._f.write(f"xref\n0 {last + 1}\n0000000000 65535 f \n".encode())
+        for num in range(1, last + 1):
+            self._f.write(f"{self._offsets[num]:010d} 00000 n \n".encode())
+        self._f.write(f"trailer\n<< /Size {last + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+        self._f.close()
+        return self.pages
@@ -0,0 +1,494 @@
+"""
+Offshore -> onshore replication of the override register and the shutdown log over the VSAT link
+Every write becomes one sequence-numbered change record in replication_log (in the asset's
+override database, so one sequence per asset):
+  - override tables (register, archive, change history, checkpoints): SQLite triggers store the
+    full new row as compact JSON - or just the key for a delete - in the writer's own
+    transaction, whatever made the write (UI, API, import, archiving).
+  - shutdown log: save_shutdown_events() records the saved events (the whole log, preceded by a
+    reset record, when the change set is unknown).
+The shipper (scheduler leader, see cluster.py) sends the records after the peer's acknowledged
+sequence in batches of at most BATCH_RECORDS / BATCH_BYTES: one zlib-compressed JSON POST to the
+peer's /replication/apply, where only the last record of each row is kept. The peer applies a
+batch in one transaction and stores the last applied sequence per source in that same
+transaction, so a replayed or overlapping batch is skipped (idempotent). After a link drop the
+shipper asks the peer where it stands (/replication/status) and resumes from there; records are
+deleted once acknowledged. The first run - or a peer that lost its copy - gets a full resync.
+
+The onshore instance is a read copy: run it with the same CCR_REPLICATION_TOKEN and no peer.
+Two local instances are enough to try it (see README).
+"""
+import hmac
+import json
+import os
+import socket
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from datetime import datetime
+
+import archive
+import assets
+import metrics
+
+PEER_URL = os.environ.get("CCR_REPLICATION_PEER", "").rstrip("/")  # e.g. http://onshore-ccr:7860 (sender side)
+TOKEN = os.environ.get("CCR_REPLICATION_TOKEN", "")                 # shared secret, both sides
+SOURCE = os.environ.get("CCR_REPLICATION_SOURCE", socket.gethostname())
+ENABLED = bool(PEER_URL and TOKEN)
+BATCH_RECORDS = 2000
+BATCH_BYTES = 512 * 1024   # uncompressed JSON per batch (one record may exceed it alone)
+SHIP_SECONDS = 30          # idle poll of the log
+RETRY_SECONDS = (30, 60, 120, 300, 600)  # backoff while the link is down
+TIMEOUT = 60
+SHUTDOWNS = "shutdowns"    # stream name of the shutdown log records
+TABLES = {"overrides": "entry_no", archive.ARCHIVE_TABLE: "entry_no",
+          "override_history": "seq", "override_checkpoints": "seq"}  # replicated table -> key column
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_connect = None   # opens the current asset's override database (set by init)
+_thread = None
+
+
+class GapError(Exception):
+    """The batch starts after the peer's applied sequence: records in between are missing"""
+    def __init__(self, applied):
+        super().__init__(f"batch does not follow the applied sequence {applied}")
+        self.applied = applied
+
+
+def _now():
+    return datetime.now().strftime(TIME_FORMAT)
+
+
+# ======================
+# CHANGE LOG (sender side)
+# ======================
+def _columns(conn, table):
+    return [(row[1], (row[2] or "").upper()) for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _row_json(conn, table, prefix=""):
+    """json_object(...) of every column of `table` (BLOB columns as hex)"""
+    parts = []
+    for name, col_type in _columns(conn, table):
+        value = f"{prefix}{name}"
+        parts.append(f"'{name}', " + (f"hex({value})" if col_type == "BLOB" else value))
+    return f"json_object({', '.join(parts)})"
+
+
+def ensure_schema(conn):
+    """Log + applied tables; capture triggers only while replication is enabled. Caller commits.
+    Run after every other schema step: the triggers list the tables' current columns."""
+    conn.execute('''CREATE TABLE IF NOT EXISTS replication_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        stream TEXT NOT NULL,
+        key TEXT,
+        op TEXT NOT NULL,
+        data TEXT,
+        recorded_at TEXT DEFAULT CURRENT_TIMESTAMP)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS replication_state (
+        name TEXT PRIMARY KEY,
+        value TEXT)''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS replication_applied (
+        source TEXT PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        applied_at TEXT NOT NULL)''')
+    for table, key in TABLES.items():
+        for event in ("ins", "upd", "del"):
+            conn.execute(f"DROP TRIGGER IF EXISTS trg_{table}_repl_{event}")
+        if not ENABLED:
+            continue
+        row = _row_json(conn, table, "NEW.")
+        conn.execute(f"""CREATE TRIGGER trg_{table}_repl_ins AFTER INSERT ON {table}
+            BEGIN INSERT INTO replication_log (stream, key, op, data) VALUES ('{table}', NEW.{key}, 'U', {row}); END""")
+        conn.execute(f"""CREATE TRIGGER trg_{table}_repl_upd AFTER UPDATE ON {table}
+            BEGIN
+                INSERT INTO replication_log (stream, key, op) SELECT '{table}', OLD.{key}, 'D' WHERE OLD.{key} IS NOT NEW.{key};
+                INSERT INTO replication_log (stream, key, op, data) VALUES ('{table}', NEW.{key}, 'U', {row});
+            END""")
+        conn.execute(f"""CREATE TRIGGER trg_{table}_repl_del AFTER DELETE ON {table}
+            BEGIN INSERT INTO replication_log (stream, key, op) VALUES ('{table}', OLD.{key}, 'D'); END""")
+
+
+def init(connect_fn):
+    """Install the schema on the current asset's database; connect_fn() opens the current asset's database"""
+    global _connect
+    _connect = connect_fn
+    conn = connect_fn()
+    try:
+        ensure_schema(conn)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _get_state(conn, name, default=None):
+    row = conn.execute("SELECT value FROM replication_state WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else default
+
+
+def _set_state(conn, name, value):
+    conn.execute("INSERT OR REPLACE INTO replication_state (name, value) VALUES (?, ?)", (name, value))
+
+
+def _event_key(key):
+    """Shutdown event IDs are ints in the log file, record keys are text"""
+    return int(key) if str(key).isdigit() else key
+
+
+def _log_events(conn, events, ids=None):
+    """Shutdown records: ids=None -> reset + every event; else upsert / delete the given IDs"""
+    by_id = {str(e.get('ID')): e for e in events}
+    if ids is None:  # unknown change set
+        conn.execute("INSERT INTO replication_log (stream, op) VALUES (?, 'T')", (SHUTDOWNS,))
+        ids = list(by_id)
+    conn.executemany(
+        "INSERT INTO replication_log (stream, key, op, data) VALUES (?, ?, ?, ?)",
+        [(SHUTDOWNS, str(i), 'U' if str(i) in by_id else 'D',
+          json.dumps(by_id[str(i)], ensure_ascii=False, separators=(',', ':')) if str(i) in by_id else None)
+         for i in ids])
+
+
+def record_events(events, changed_ids=None):
+    """Called after every successful save_shutdown_events() (changed_ids None = unknown -> whole log)"""
+    if not ENABLED or _connect is None:
+        return
+    conn = _connect()
+    try:
+        _log_events(conn, events, changed_ids)
+        conn.commit()
+    except Exception as e:
+        print(f"⚠️ Replication: shutdown change not recorded ({assets.current()}): {str(e)}")
+    finally:
+        conn.close()
+
+
+def _seed(conn, events):
+    """Full resync (caller commits): drop the pending records - the resync supersedes them - then a
+    resync marker, a reset per stream and every row. The peer accepts a batch starting at the
+    marker whatever it applied before."""
+    conn.execute("DELETE FROM replication_log")
+    conn.execute("INSERT INTO replication_log (stream, op) VALUES ('*', 'S')")
+    for table, key in TABLES.items():
+        conn.execute("INSERT INTO replication_log (stream, op) VALUES (?, 'T')", (table,))
+        conn.execute(f"INSERT INTO replication_log (stream, key, op, data) "
+                     f"SELECT '{table}', {key}, 'U', {_row_json(conn, table)} FROM {table} ORDER BY {key}")
+    _log_events(conn, events)
+    _set_state(conn, "seeded", _now())
+
+
+def issued(conn):
+    """Highest sequence ever handed out (kept by SQLite even after the records are deleted)"""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'replication_log'").fetchone()
+    return row[0] if row else 0
+
+
+def _raise_sequence(conn, floor):
+    if not conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'replication_log'", (floor,)).rowcount:
+        conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('replication_log', ?)", (floor,))
+
+
+def _resync(conn, floor=0):
+    import shutdown_log  # late import: shutdown_log records through this module
+    if floor > issued(conn):
+        _raise_sequence(conn, floor)
+    _seed(conn, shutdown_log.load_shutdown_events())
+
+
+def rebase(conn, floor):
+    """After a restore: continue above `floor` (the pre-restore sequence) with a full resync, so
+    the peer ends up with the restored register (caller commits)"""
+    ensure_schema(conn)
+    conn.execute("DELETE FROM replication_log")
+    conn.execute("DELETE FROM replication_state")
+    if ENABLED:
+        _resync(conn, floor)
+
+
+# ======================
+# SHIPPING
+# ======================
+def _request(path, body=None):
+    url = f"{PEER_URL}{path}{'&' if '?' in path else '?'}asset={urllib.parse.quote(assets.current())}"
+    req = urllib.request.Request(url, data=body, method="POST" if body is not None else "GET",
+                                 headers={"X-CCR-Replication-Token": TOKEN,
+                                          "Content-Type": "application/octet-stream"})
+    try:
+        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+            return resp.status, json.loads(resp.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read() or b"{}")
+        except ValueError:
+            raise e
+
+
+def peer_applied():
+    """Last sequence of ours the peer has applied for the current asset"""
+    status, body = _request(f"/replication/status?source={urllib.parse.quote(SOURCE)}")
+    if status != 200:
+        raise RuntimeError(f"peer status HTTP {status}: {body.get('error', '')}")
+    return int(body.get("applied", 0))
+
+
+def _compact(rows):
+    """Keep only the last record of each row; a reset drops the earlier records of its stream"""
+    kept = {}
+    for seq, stream, key, op, data in rows:
+        if op in ('T', 'S'):
+            for k in [k for k in kept if k[0] == stream]:
+                del kept[k]
+        kept[(stream, key if op == 'U' or op == 'D' else None)] = (seq, stream, key, op, data)
+    return sorted(kept.values())
+
+
+def next_batch(conn, after):
+    """(first seq, last seq, records) after `after`, cut at BATCH_RECORDS / BATCH_BYTES; None when caught up"""
+    rows = conn.execute("SELECT seq, stream, key, op, data FROM replication_log WHERE seq > ? ORDER BY seq LIMIT ?",
+                        (after, BATCH_RECORDS)).fetchall()
+    size, cut = 0, 0
+    for row in rows:
+        size += len(row[4] or "") + 32
+        if cut and size > BATCH_BYTES:
+            break
+        cut += 1
+    rows = rows[:cut]
+    if not rows:
+        return None
+    records = [[seq, stream, key, op, json.loads(data) if data else None]
+               for seq, stream, key, op, data in _compact(rows)]
+    return rows[0][0], rows[-1][0], records
+
+
+def ship_once():
+    """Ship the current asset's backlog; returns the number of records acknowledged"""
+    conn = _connect()
+
+    def resync_if_needed(applied):
+        """First run, records the peer missed already deleted, or a peer ahead of us (replaced database)"""
+        oldest = conn.execute("SELECT MIN(seq) FROM replication_log").fetchone()[0]
+        if (_get_state(conn, "seeded") is None or applied > issued(conn)
+                or applied < (oldest if oldest is not None else issued(conn) + 1) - 1):
+            conn.execute("BEGIN IMMEDIATE")
+            _resync(conn, applied)
+            conn.commit()
+            print(f"🛰️ Replication: full resync queued for {assets.current()} (peer at #{applied})")
+
+    try:
+        applied = peer_applied()
+        resync_if_needed(applied)
+        shipped = 0
+        while True:
+            batch = next_batch(conn, applied)
+            if batch is None:
+                break
+            first, last, records = batch
+            body = zlib.compress(json.dumps({"source": SOURCE, "first": first, "last": last, "records": records},
+                                            ensure_ascii=False, separators=(',', ':')).encode("utf-8"), 9)
+            started = time.perf_counter()
+            status, reply = _request("/replication/apply", body)
+            metrics.observe("job", "replication_batch", time.perf_counter() - started)
+            if status == 409:  # the peer is elsewhere (restored, rebuilt): resume from its position
+                applied = int(reply.get("applied", 0))
+                resync_if_needed(applied)
+                continue
+            if status != 200:
+                raise RuntimeError(f"peer apply HTTP {status}: {reply.get('error', '')}")
+            applied = int(reply["applied"])
+            shipped += last - first + 1
+            conn.execute("DELETE FROM replication_log WHERE seq <= ?", (applied,))
+            _set_state(conn, "acked", str(applied))
+            _set_state(conn, "last_shipped", f"{_now()} ({len(records)} records, {len(body) / 1024:.0f} KB)")
+            _set_state(conn, "last_error", "")
+            conn.commit()
+        return shipped
+    finally:
+        conn.close()
+
+
+def start(job=None):
+    """Daemon thread: ship each asset's backlog to PEER_URL, backing off while the link is down (idempotent)"""
+    global _thread
+    if not ENABLED or _connect is None:
+        return None
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    def due():
+        failed = False
+        for name in assets.names():
+            with assets.using(name):
+                try:
+                    ship_once()
+                except Exception as e:
+                    failed = True
+                    print(f"⚠️ Replication to {PEER_URL} failed ({name}): {str(e)} - retrying")
+                    conn = _connect()
+                    try:
+                        _set_state(conn, "last_error", f"{_now()} {str(e)[:200]}")
+                        conn.commit()
+                    finally:
+                        conn.close()
+        return failed
+
+    run_due = job(due) if job else due
+
+    def run():
+        attempt = 0
+        while True:
+            attempt = attempt + 1 if run_due() else 0
+            time.sleep(RETRY_SECONDS[min(attempt, len(RETRY_SECONDS)) - 1] if attempt else SHIP_SECONDS)
+
+    _thread = threading.Thread(target=run, name="replication", daemon=True)
+    _thread.start()
+    print(f"🛰️ Replication: shipping changes to {PEER_URL} as '{SOURCE}'")
+    return _thread
+
+
+def status(conn):
+    """Admin Panel summary for the current asset (both directions)"""
+    lines = []
+    if ENABLED:
+        backlog, oldest = conn.execute("SELECT COUNT(*), MIN(recorded_at) FROM replication_log").fetchone()
+        lines.append(f"Sending to {PEER_URL} as '{SOURCE}': {backlog} record(s) waiting"
+                     + (f" (oldest {oldest} UTC)" if oldest else "")
+                     + f", acknowledged up to #{_get_state(conn, 'acked', '0')}")
+        lines.append(f"Last batch: {_get_state(conn, 'last_shipped') or 'none yet'}")
+        if _get_state(conn, "last_error"):
+            lines.append(f"Last error: {_get_state(conn, 'last_error')}")
+    else:
+        lines.append("Not sending (set CCR_REPLICATION_PEER and CCR_REPLICATION_TOKEN)")
+    for source, seq, applied_at in conn.execute("SELECT source, seq, applied_at FROM replication_applied ORDER BY source"):
+        lines.append(f"Receiving from '{source}': applied up to #{seq} at {applied_at}")
+    return "\n".join(lines)
+
+
+# ======================
+# APPLYING (receiver side)
+# ======================
+def _apply_rows(conn, stream, records):
+    key = TABLES[stream]
+    columns = dict(_columns(conn, stream))
+    for seq, _, row_key, op, data in records:
+        if op == 'T':
+            conn.execute(f"DELETE FROM {stream}")
+        elif op == 'D':
+            conn.execute(f"DELETE FROM {stream} WHERE {key} = ?", (row_key,))
+        else:
+            values = {c: (bytes.fromhex(v) if v is not None and columns[c] == "BLOB" else v)
+                      for c, v in data.items() if c in columns}  # columns the local schema has
+            conn.execute(f"DELETE FROM {stream} WHERE {key} = ?", (row_key,))
+            conn.execute(f"INSERT OR REPLACE INTO {stream} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                         list(values.values()))
+
+
+def _apply_events(records):
+    """Shutdown records -> one load-modify-save of the log under the shared write lock"""
+    import shutdown_log  # late import: shutdown_log records through this module
+    with shutdown_log.write_lock():
+        events = shutdown_log.load_shutdown_events()
+        by_id = {str(e.get('ID')): e for e in events}
+        changed, reset = [], False
+        for _, _, key, op, data in records:
+            if op == 'T':
+                by_id, reset = {}, True
+            elif op == 'D':
+                by_id.pop(key, None)
+            else:
+                by_id[key] = data
+            changed.append(_event_key(key))
+        saved = list(by_id.values())
+        if not shutdown_log.save_shutdown_events(saved, changed_ids=None if reset else changed):
+            raise RuntimeError("shutdown log save failed")
+
+
+def apply_batch(batch):
+    """Apply one shipped batch in one transaction; returns the source's applied sequence.
+    Records at or below the applied sequence are skipped (replays are harmless)."""
+    source, first, last = str(batch["source"]), int(batch["first"]), int(batch["last"])
+    records = batch["records"]
+    applied = _applied(source)
+    if first > applied + 1 and not (records and records[0][0] == first and records[0][3] == 'S'):
+        raise GapError(applied)
+    if last <= applied:
+        return applied
+    records = [r for r in records if r[0] > applied]
+    events = [r for r in records if r[1] == SHUTDOWNS]
+    if events:
+        _apply_events(events)  # upserts: re-applying them after a failed commit below is harmless
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for stream in TABLES:
+            _apply_rows(conn, stream, [r for r in records if r[1] == stream])
+        conn.execute("INSERT OR REPLACE INTO replication_applied (source, seq, applied_at) VALUES (?, ?, ?)",
+                     (source, last, _now()))
+        conn.commit()
+        return last
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _applied(source):
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT seq FROM replication_applied WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else 0
+    finally:
+        conn.close()
+
+
+def routes():
+    """GET /replication/status?source=S and POST /replication/apply (zlib JSON batch) - both take
+    ?asset=<name> and need the X-CCR-Replication-Token header"""
+    from starlette.concurrency import run_in_threadpool
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    def checked(fn):
+        async def wrapper(request):
+            if not TOKEN or _connect is None:
+                return JSONResponse({"error": "replication is not enabled on this instance"}, status_code=404)
+            if not hmac.compare_digest(request.headers.get("x-ccr-replication-token", ""), TOKEN):
+                return JSONResponse({"error": "bad replication token"}, status_code=403)
+            try:
+                asset = assets.from_request(request)
+            except ValueError as e:
+                return JSONResponse({"error": str(e)}, status_code=404)
+            with assets.using(asset):
+                return await fn(request)
+        return wrapper
+
+    @checked
+    async def status_endpoint(request):
+        source = request.query_params.get("source", "")
+        return JSONResponse({"source": source, "applied": await run_in_threadpool(_applied, source)})
+
+    @checked
+    async def apply_endpoint(request):
+        try:
+            batch = json.loads(zlib.decompress(await request.body()))
+        except (zlib.error, ValueError):
+            return JSONResponse({"error": "body must be a zlib-compressed JSON batch"}, status_code=400)
+        asset = assets.current()
+
+        def run():
+            with assets.using(asset):
+                return apply_batch(batch)
+        try:
+            with metrics.timer("api", "replication_apply"):
+                applied = await run_in_threadpool(run)
+        except GapError as e:
+            return JSONResponse({"error": str(e), "applied": e.applied}, status_code=409)
+        return JSONResponse({"applied": applied})
+
+    return [
+        Route("/replication/status", status_endpoint, methods=["GET"]),
+        Route("/replication/apply", apply_endpoint, methods=["POST"]),
+    ]
@@ -1,24 +1,41 @@
 """
 Standalone Plant Shutdown Event Log Application
 Preserves all original Shutdown Log functionality with streamlined architecture
-PDF functionality REMOVED due to rendering issues - Excel-only exports
+Excel exports, plus a printable PDF rendered page by page (see pdfstream.py) so long free-text
+fields wrap properly and thousands of events do not have to fit in memory at once
 """
 import gradio as gr
 import json
 import os
-import socket
-import tempfile
 import re
 import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-import mimetypes
-import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import shutil
+import threading
+import time
+import contextlib
+import pytz
+import logging
+from startup import lazy_import, phase, get_IP, load_gmail_password
+import metrics
+import changefeed
+import livefilter
+import lookup
+import attachments
+import exportstore
+import eventindex
+import aggregates
+import handover
+import assets
+import cluster
+import pdfstream
+import digest
+import replication
+import webassets
+
+# Heavy libraries are imported on first use (see startup.py)
+pd = lazy_import("pandas")
 
 # ======================
 # CONFIGURABLE CATEGORIES (MAINTENANCE-FRIENDLY)
@@ -111,12 +128,9 @@ SUBCLUSTER_OPTIONS = {
     ]
 }
 
-# Fixed organizational fields (auto-populated)
-FIXED_FIELDS = {
-    "Country": "CONGO",
-    "Company": "ENI CONGO",
-    "Unit/Asset": "NGUYA FLNG"
-}
+# Fixed organizational fields (auto-populated) - per asset, configured in assets.json (see assets.py)
+def fixed_fields():
+    return assets.fields()
 
 # Complete column schema (order matters for exports/UI)
 SHUTDOWN_COLUMNS = [
@@ -125,34 +139,55 @@ SHUTDOWN_COLUMNS = [
     'Technical Details/Event Description', 'First Cause', 'RCA', 
     'Actions', 'Action by', 'Reported by'
 ]
+shutdown_index = assets.PerAsset(lambda: eventindex.EventIndex(SHUTDOWN_COLUMNS))  # filter engine (see eventindex.py)
+shutdown_stats = assets.PerAsset(aggregates.ShutdownStats)  # dashboard counters (see aggregates.py)
 
 # ======================
 # CORE CONFIGURATION
 # ======================
-SHUTDOWN_FILE = "shutdown.json"
+SHUTDOWN_FILE = "shutdown.json"  # first asset; other assets get their own copy (see assets.py)
+LIVE_REFRESH_SECONDS = 5  # open screens check the change feed this often (near-free when idle)
+LIVE_FILTER_REQUESTS = livefilter.LatestOnly()
 SECRETFILE = "secret.json"
 GMAIL_APP_PASSWORD = None
 MANAGER_EMAILS_FILE = "emails.txt"
 SENDER_EMAIL = "fabio.matricardi@gmail.com"
-MYLOCALIP = socket.gethostbyname(socket.gethostname()) if not socket.gethostbyname(socket.gethostname()).startswith("localhost") else "127.0.0.1"
-
-# Initialize shutdown log file with schema migration
-if not os.path.exists(SHUTDOWN_FILE):
-    with open(SHUTDOWN_FILE, 'w') as f:
-        json.dump([], f)
-    print(f"✅ Created new shutdown log: {SHUTDOWN_FILE}")
-else:
+MYLOCALIP = "127.0.0.1"  # Resolved once in startup()
+scheduler = None  # APScheduler instance (started in startup())
+
+def shutdown_file():
+    """Shutdown log of the current asset"""
+    return assets.path(SHUTDOWN_FILE)
+
+_write_lock = threading.Lock()
+
+@contextlib.contextmanager
+def write_lock():
+    """Hold around every load-modify-save of the log: other threads and other workers (see cluster.py)"""
+    with _write_lock, cluster.file_lock(shutdown_file()):
+        yield
+
+def migrate_shutdown_file():
+    """Initialize shutdown log file with schema migration"""
+    path = shutdown_file()
+    if not os.path.exists(path):
+        with open(path, 'w') as f:
+            json.dump([], f)
+        print(f"✅ Created new shutdown log: {path}")
+        return
+
     # Migrate existing records to new schema
-    with open(SHUTDOWN_FILE, 'r') as f:
+    with open(path, 'r') as f:
         events = json.load(f)
-    
+
+    fixed = fixed_fields()
     migrated = False
     for event in events:
         # Backfill missing fields with safe defaults
         for col in SHUTDOWN_COLUMNS:
             if col not in event:
-                if col in FIXED_FIELDS:
-                    event[col] = FIXED_FIELDS[col]
+                if col in fixed:
+                    event[col] = fixed[col]
                 elif col == 'Event Type':
                     event[col] = EVENT_TYPE_OPTIONS[0]
                 elif col == 'Event Classification':
@@ -167,58 +202,112 @@ else:
                 else:
                     event[col] = ""
                 migrated = True
-    
+
     if migrated:
-        backup_path = SHUTDOWN_FILE.replace('.json', f'_migrated_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-        shutil.copy2(SHUTDOWN_FILE, backup_path)
-        with open(SHUTDOWN_FILE, 'w') as f:
+        backup_path = path.replace('.json', f'_migrated_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+        shutil.copy2(path, backup_path)
+        with open(path, 'w') as f:
             json.dump(events, f, indent=2)
         print(f"✅ Migrated {len(events)} existing records to new schema (backup: {backup_path})")
 
-# Load Gmail password
-try:
-    with open(SECRETFILE) as f:
-        GMAIL_APP_PASSWORD = json.load(f)['secret_code']
-except FileNotFoundError:
-    print("⚠️ Warning: JSON file not found - email functionality disabled")
-except (json.JSONDecodeError, KeyError) as e:
-    print(f"⚠️ Warning: Error reading secret_code: {e} - email functionality disabled")
-
 # ======================
 # SCHEDULED REPORTS (Excel-only)
 # ======================
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-import pytz
-import logging
-
-logging.basicConfig(level=logging.INFO)
-scheduler_logger = logging.getLogger('apscheduler.executors.default')
-scheduler_logger.setLevel(logging.INFO)
-
 # TWO SCHEDULER TIME TRIGGERS (Africa/Brazzaville = UTC+1)
 T1H = 7  # Morning report hour
 T1M = 50 # Morning report minute
 T2H = 17 # Evening report hour
 T2M = 50 # Evening report minute
+SCHEDULED_REPORT_MODE = "delta"  # "delta": only changes since the last send | "full": whole log every time
+REPORT_MARK = "shutdown_scheduled"  # high-water mark name in handover.MARKS_FILE
+DIGEST_COLUMNS = ['ID', 'timestamp', 'Event Type', 'Event Classification', 'Main Cluster', 'Subcluster', 'First Cause']
+
+def shutdown_digest(timestamp, report_type, events, changed, attachments_text):
+    """HTML digest of a scheduled report: recent / changed events + the cached dashboard counters"""
+    version = changefeed.shutdown_feed.version()
+
+    def table(title, rows, total=None, empty="None"):
+        return digest.section(title, [c if c != 'timestamp' else 'Timestamp' for c in DIGEST_COLUMNS],
+                              [[e.get(c, '') for c in DIGEST_COLUMNS] for e in rows], total=total, empty=empty)
+
+    sections = [table(title, rows) for title, rows in changed]
+    sections.append(table("Recent shutdown events", newest_first(events), empty="No events logged"))
+    for dim in ('Event Type', 'Event Classification'):
+        totals = shutdown_stats.totals(dim, version, load_shutdown_events)
+        sections.append(digest.section(f"All events by {dim}", [dim, "Events"], list(totals.items())))
+    pareto = shutdown_stats.pareto(version, load_shutdown_events)
+    sections.append(digest.section("Top subclusters", ["Subcluster", "Main Cluster", "Events", "Share %"],
+                                   [[r["Subcluster"], r["Main Cluster"], r["Events"], r["Share %"]] for r in pareto],
+                                   total=len(pareto)))
+    return digest.render(
+        f"{assets.subject_tag()}Plant Shutdown Log - {report_type}",
+        f"{assets.current()} | {timestamp} (Africa/Brazzaville Time)",
+        stats=[("Total events", len(events))] + [(title, len(rows)) for title, rows in changed],
+        sections=sections, attachments=attachments_text,
+        footer=f"CONFIDENTIAL - operational safety data. Full log on demand: Shutdown Log app at {MYLOCALIP}")
 
 def send_scheduled_report(report_type="automated"):
-    """Send scheduled shutdown report with Excel export only"""
+    """Send scheduled shutdown report: events added or edited since the last send (Excel)"""
     try:
         timestamp = datetime.now(pytz.timezone('Africa/Brazzaville')).strftime('%Y-%m-%d %H:%M:%S')
-        print(f"\n⏰ SCHEDULED REPORT TRIGGERED [{timestamp}] - Type: {report_type}")
+        print(f"\n⏰ SCHEDULED REPORT TRIGGERED [{timestamp}] - Type: {report_type} - {assets.current()}")
+        # Run-once per slot across all workers (and across a leader failover) - see cluster.py
+        if not cluster.claim(f"{REPORT_MARK}@{assets.current()}", f"{timestamp[:10]} {report_type}"):
+            print(f"⏭️ {report_type} already sent today by another worker - skipped")
+            return "⏭️ Already sent"
 
-        # Generate Excel export ONLY
-        excel_path, excel_msg = export_shutdown_excel()
-        if excel_path is None:
-            raise Exception(f"Excel export failed: {excel_msg}")
+        # What changed since the last successful send (see handover.py)
+        events = load_shutdown_events()
+        current = handover.fingerprints(events)
+        mark = handover.load_mark(REPORT_MARK) if SCHEDULED_REPORT_MODE == "delta" else None
+        if mark:
+            added, edited, removed = handover.event_changes(current, mark["fingerprints"])
+            by_id = {str(e.get('ID')): e for e in events}
+
+            def lines(ids):
+                return [f"#{i} {by_id[i].get('timestamp', '')} {by_id[i].get('Event Type', '')} "
+                        f"{by_id[i].get('Event Classification', '')} - {by_id[i].get('Main Cluster', '')} / "
+                        f"{by_id[i].get('Subcluster', '')}" for i in ids]
+
+            changes_text = (handover.listing("NEW EVENTS", lines(added)) + "\n"
+                            + handover.listing("EDITED EVENTS", lines(edited))
+                            + (f"\nRemoved events: {removed}" if removed else ""))
+            changed = [("New events", [by_id[i] for i in added]), ("Edited events", [by_id[i] for i in edited])]
+            excel_path = None
+            if (added or edited) and digest.ATTACH_EXPORTS:
+                excel_path, excel_msg = export_shutdown_excel(ids=added + edited, prefix="ShutdownLog_Changes",
+                                                             events=events)
+                if excel_path is None:
+                    raise Exception(f"Excel export failed: {excel_msg}")
+            slots = [[("SHUTDOWN_LOG_CHANGES.xlsx", excel_path)],
+                     [("SHUTDOWN_LOG_CHANGES.pdf", lambda: export_shutdown_pdf(
+                         ids=added + edited, prefix="ShutdownLog_Changes", events=events)[0])]] if excel_path else []
+            pdf = None
+            subject = f"{assets.subject_tag()}Plant Shutdown Log - Shift Handover ({timestamp})"
+            changes_title = f"CHANGES SINCE LAST REPORT ({mark['sent_at']})"
+        else:
+            # First report (no mark yet) or full mode: whole log
+            changed, subject = [], None
+            if digest.ATTACH_EXPORTS:
+                excel_path, excel_msg = export_shutdown_excel(events=events)
+                if excel_path is None:
+                    raise Exception(f"Excel export failed: {excel_msg}")
+                slots = None
+                pdf = lambda: export_shutdown_pdf(events=events)[0]  # built only if the email has room for it
+            else:
+                excel_path, slots, pdf = None, [], None
+            changes_title = "FULL LOG ATTACHED" if digest.ATTACH_EXPORTS else "FULL LOG"
+            changes_text = ("First report - later reports list only the changes"
+                            if SCHEDULED_REPORT_MODE == "delta" else "")
 
         # Prepare custom note with report type
         custom_note = (
             f"SCHEDULED SHUTDOWN LOG REPORT ({report_type})\n"
             f"Generated at: {timestamp} (Africa/Brazzaville Time)\n"
-            f"Total Events: {len(load_shutdown_events())}\n"
+            f"Total Events: {len(events)}\n"
             f"IP ADDRESS: {MYLOCALIP}\n"
+            f"\n{changes_title}:\n{changes_text}\n"
+            f"Full log export on demand: Shutdown Log app at {MYLOCALIP}\n"
             f"⚠️ AUTOMATED REPORT - DO NOT REPLY"
         )
 
@@ -233,8 +322,15 @@ def send_scheduled_report(report_type="automated"):
         status = send_email_with_exports(
             recipients=managers,
             excel_path=excel_path,
-            custom_note=custom_note
+            custom_note=custom_note,
+            slots=slots,
+            subject=subject,
+            pdf=pdf,
+            html=lambda attached: shutdown_digest(timestamp, report_type, events, changed, attached),
+            events=events,  # the CSV fallback comes from the same read as everything else
         )
+        if status.startswith("✅"):
+            handover.save_mark(REPORT_MARK, {"fingerprints": current}, timestamp)
 
         # Cleanup temp file
         try:
@@ -260,6 +356,13 @@ def send_scheduled_report(report_type="automated"):
 def start_scheduled_reports():
     """Initialize and start the background scheduler"""
     try:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.triggers.cron import CronTrigger
+
+        logging.basicConfig(level=logging.INFO)
+        scheduler_logger = logging.getLogger('apscheduler.executors.default')
+        scheduler_logger.setLevel(logging.INFO)
+
         w_at_timezone = pytz.timezone('Africa/Brazzaville')
         scheduler = BackgroundScheduler(timezone=w_at_timezone)
 
@@ -267,7 +370,7 @@ def start_scheduled_reports():
         T1_name = f"Daily {T1H:02d}:{T1M:02d} Shutdown Report"
         T1_args = f"{T1H:02d}:{T1M:02d} Daily Report"
         scheduler.add_job(
-            send_scheduled_report,
+            metrics.instrument(cluster.leader_only(assets.for_each(send_scheduled_report)), kind="job"),
             CronTrigger(hour=T1H, minute=T1M, timezone=w_at_timezone),
             id='shutdown_report_am',
             name=T1_name,
@@ -279,7 +382,7 @@ def start_scheduled_reports():
         T2_name = f"Daily {T2H:02d}:{T2M:02d} Shutdown Report"
         T2_args = f"{T2H:02d}:{T2M:02d} Daily Report"
         scheduler.add_job(
-            send_scheduled_report,
+            metrics.instrument(cluster.leader_only(assets.for_each(send_scheduled_report)), kind="job"),
             CronTrigger(hour=T2H, minute=T2M, timezone=w_at_timezone),
             id='shutdown_report_pm',
             name=T2_name,
@@ -302,6 +405,10 @@ def start_scheduled_reports():
         print(f"⚠️ Scheduler initialization failed: {str(e)}")
         return None
 
+def _start_scheduler():
+    global scheduler
+    scheduler = start_scheduled_reports()
+
 # ======================
 # EMAIL FUNCTIONALITY (Excel-only)
 # ======================
@@ -323,21 +430,38 @@ def read_manager_emails():
     except Exception as e:
         return [], f"❌ Error reading email file: {str(e)}"
 
-def send_email_with_exports(recipients, excel_path, custom_note=""):
-    """Send shutdown log exports via email (Excel only)"""
+def send_email_with_exports(recipients, excel_path, custom_note="", slots=None, subject=None, pdf=None, html=None,
+                            events=None):
+    """Send shutdown log exports via email (Excel, plus the PDF printout when pdf - a path or a
+    callable making one - is given; slots=[] sends the note alone). html(attachments text) gives
+    an HTML digest body sent alongside the plain text (see digest.py). events: the list a report
+    already loaded, used for the CSV fallback."""
     if not GMAIL_APP_PASSWORD:
         return "❌ EMAIL NOT CONFIGURED: Set GMAIL_APP_PASSWORD environment variable"
     if not recipients:
         return "❌ No valid recipients provided"
     
+    # Full Excel, or the (much smaller once zipped) CSV when the Excel does not fit the email budget
+    if slots is None:
+        slots = [[("SHUTDOWN_LOG_FULL_EXPORT.xlsx", excel_path),
+                  ("SHUTDOWN_LOG_FULL_EXPORT.csv", lambda: export_shutdown_csv(events))]]
+        if pdf:
+            slots.append([("SHUTDOWN_LOG_PRINTOUT.pdf", pdf)])
+    packed = attachments.plan(slots, "SHUTDOWN_LOG_EXPORT.zip")
+    if slots and not packed["files"]:
+        attachments.cleanup(packed)
+        return "❌ Failed to attach Excel file (missing or over the email budget)"
+
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    subject = f"Plant Shutdown Log Export - {timestamp}"
+    subject = subject or f"{assets.subject_tag()}Plant Shutdown Log Export - {timestamp}"
+    no_attachment = ('(none - no events added or edited)' if digest.ATTACH_EXPORTS
+                     else '(none - exports are on demand in the Shutdown Log app)')
     body = f"""PLANT SHUTDOWN EVENT LOG EXPORT
 Generated by: Shutdown Log System
 Timestamp: {timestamp} (Congo FLNG Time)
 {('Note: ' + custom_note) if custom_note else ''}
 Attachment:
-• SHUTDOWN_LOG_FULL_EXPORT.xlsx - Complete event history with all classification fields
+{attachments.describe(packed) or no_attachment}
 
 ⚠️ CONFIDENTIAL: Contains operational safety data.
 Do not forward outside authorized Congo FLNG personnel.
@@ -346,42 +470,26 @@ System IP: {MYLOCALIP}
 Automated message from Plant Shutdown Event Log System
 """
 
-    # Create message
-    message = MIMEMultipart()
+    # Create message (plain text, plus the HTML digest alternative for scheduled reports)
+    message = digest.message(body, html(attachments.describe(packed) or no_attachment) if html else None)
     message['Subject'] = subject
     message['From'] = SENDER_EMAIL
     message['To'] = ', '.join(recipients[:3]) + (f" + {len(recipients)-3} more" if len(recipients) > 3 else "")
-    message.attach(MIMEText(body, 'plain'))
-
-    # Attach Excel file ONLY
-    attachments = []
-    if os.path.exists(excel_path):
-        try:
-            ctype, _ = mimetypes.guess_type(excel_path)
-            maintype, subtype = (ctype or 'application/octet-stream').split('/', 1)
-            with open(excel_path, 'rb') as fp:
-                part = MIMEBase(maintype, subtype)
-                part.set_payload(fp.read())
-            encoders.encode_base64(part)
-            part.add_header('Content-Disposition', 'attachment', filename="SHUTDOWN_LOG_FULL_EXPORT.xlsx")
-            message.attach(part)
-            attachments.append("SHUTDOWN_LOG_FULL_EXPORT.xlsx")
-        except Exception as e:
-            print(f"⚠️ Attachment error: {str(e)}")
-
-    if not attachments:
-        return "❌ Failed to attach Excel file"
+    attached = attachments.attach(message, packed)
 
     # Send email
     try:
         with smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=30) as server:
             server.login(SENDER_EMAIL, GMAIL_APP_PASSWORD)
             server.send_message(message, to_addrs=recipients)
-        return f"✅ Email sent to {len(recipients)} recipient(s)! ({', '.join(attachments)})"
+        attachments.record("shutdown_export", recipients, packed, len(message.as_bytes()))
+        return f"✅ Email sent to {len(recipients)} recipient(s)! ({', '.join(attached)})"
     except smtplib.SMTPAuthenticationError:
         return "❌ EMAIL AUTH FAILED: Invalid GMAIL_APP_PASSWORD. Contact administrator."
     except Exception as e:
         return f"❌ Email failed: {str(e)[:100]}"
+    finally:
+        attachments.cleanup(packed)
 
 # ======================
 # SHUTDOWN LOG OPERATIONS
@@ -389,15 +497,16 @@ Automated message from Plant Shutdown Event Log System
 def load_shutdown_events():
     """Load events from JSON with error handling and schema validation"""
     try:
-        with open(SHUTDOWN_FILE, 'r') as f:
+        with metrics.timer("db", "load_shutdown_events"), open(shutdown_file(), 'r') as f:
             events = json.load(f)
         
         # Ensure all events have complete schema (defense in depth)
+        fixed = fixed_fields()
         for event in events:
             for col in SHUTDOWN_COLUMNS:
                 if col not in event:
-                    if col in FIXED_FIELDS:
-                        event[col] = FIXED_FIELDS[col]
+                    if col in fixed:
+                        event[col] = fixed[col]
                     elif col == 'Event Type':
                         event[col] = EVENT_TYPE_OPTIONS[0]
                     elif col == 'Event Classification':
@@ -416,47 +525,82 @@ def load_shutdown_events():
         print(f"⚠️ Load error: {str(e)}")
         return []
 
-def save_shutdown_events(events):
-    """Save events to JSON with backup"""
+def _replace(src, dst, attempts=20):
+    """os.replace, retried while a reader holds dst open (Windows refuses to replace an open file)"""
+    for attempt in range(attempts):
+        try:
+            return os.replace(src, dst)
+        except PermissionError:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.05)
+
+def save_shutdown_events(events, changed_ids=None):
+    """Save events to JSON with backup (changed_ids feeds the change feed; None = unknown).
+    Callers doing load-modify-save hold write_lock()."""
     try:
         # Create backup before writing
-        if os.path.exists(SHUTDOWN_FILE):
-            backup_path = SHUTDOWN_FILE.replace('.json', f'_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-            shutil.copy2(SHUTDOWN_FILE, backup_path)
+        path = shutdown_file()
+        if os.path.exists(path):
+            backup_path = path.replace('.json', f'_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+            shutil.copy2(path, backup_path)
         
-        with open(SHUTDOWN_FILE, 'w') as f:
-            json.dump(events, f, indent=2)
+        # Write a temp file and swap it in: other workers never read a half-written log
+        tmp = f"{path}.tmp"
+        with metrics.timer("db", "save_shutdown_events"):
+            with open(tmp, 'w') as f:
+                json.dump(events, f, indent=2)
+            _replace(tmp, path)
+        changefeed.shutdown_feed.mark_written(changed_ids)
+        replication.record_events(events, changed_ids)
+        version = changefeed.shutdown_feed.version()
+        shutdown_index.update(events, changed_ids, version)
+        shutdown_stats.update(events, changed_ids, version)
         return True
     except Exception as e:
         print(f"❌ Save error: {str(e)}")
         return False
 
-def get_filtered_shutdowns(filters):
-    """Apply filters to shutdown events"""
-    events = load_shutdown_events()
+def _event_key(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+def search_shutdowns(filters, ids=None):
+    """Events matching the filters via the inverted index (literal, case-insensitive), newest first"""
+    keys = None if ids is None else [_event_key(i) for i in ids]
+    with metrics.timer("db", "search_shutdowns"):
+        events = shutdown_index.search(filters, changefeed.shutdown_feed.version(), load_shutdown_events, keys)
+    return newest_first(events)
+
+def newest_first(events):
+    return sorted(events, key=lambda e: (isinstance(e.get('ID'), int), e.get('ID') if isinstance(e.get('ID'), int) else 0),
+                  reverse=True)
+
+def get_filtered_shutdowns(filters, ids=None):
+    """Apply filters to shutdown events (ids: restrict to these event IDs)"""
+    events = search_shutdowns(filters, ids)
     if not events:
         return pd.DataFrame(columns=SHUTDOWN_COLUMNS)
-    
-    df = pd.DataFrame(events, columns=SHUTDOWN_COLUMNS)
-    
-    for col, val in filters.items():
-        if val and val.strip():
-            df = df[df[col].astype(str).str.contains(val, case=False, na=False)]
-    
-    return df.sort_values('ID', ascending=False).reset_index(drop=True)
+    return pd.DataFrame(events, columns=SHUTDOWN_COLUMNS)
 
 # ======================
 # EXPORT FUNCTIONS (Excel-only)
 # ======================
-def export_shutdown_excel():
-    """Export shutdown log to Excel with all columns"""
-    df = get_filtered_shutdowns({})
+def export_shutdown_excel(ids=None, prefix="ShutdownLog_Export", events=None):
+    """Export shutdown log to Excel with all columns (ids: only these events; events: the list a
+    report already loaded, so every part of it reflects the same read)"""
+    if events is None:
+        df = get_filtered_shutdowns({}, ids)
+    else:
+        wanted = None if ids is None else {str(i) for i in ids}
+        df = pd.DataFrame(newest_first([e for e in events if wanted is None or str(e.get('ID')) in wanted]),
+                          columns=SHUTDOWN_COLUMNS)
     if df.empty:
         return None, "❌ No shutdown events to export"
     
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"ShutdownLog_Export_{timestamp}.xlsx"
-    filepath = os.path.join(tempfile.gettempdir(), filename)
+    filepath = exportstore.new_path("shutdown_excel", prefix, "xlsx")
 
     try:
         with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
@@ -492,19 +636,88 @@ def export_shutdown_excel():
     except Exception as e:
         return None, f"❌ Export failed: {str(e)}"
 
+PDF_COLUMNS = [c for c in SHUTDOWN_COLUMNS if c not in ('Country', 'Company', 'Unit/Asset')]  # in the subtitle
+PDF_WIDTHS = [10, 24, 12, 20, 30, 28, 70, 40, 50, 50, 20, 20]  # mm, stretched to the A3 landscape width
+
+def export_shutdown_pdf(ids=None, prefix="ShutdownLog_Printout", events=None):
+    """Printable A3 PDF of the log, newest first (ids / events as in export_shutdown_excel).
+    Pages are written to the file as they fill up - memory does not grow with the event count."""
+    try:
+        import fpdf  # noqa: F401 - glyph widths for the text wrapping
+    except ImportError:
+        return None, "❌ PDF library not installed. Run: pip install fpdf2"
+    if events is None:
+        rows = search_shutdowns({}, ids)
+    else:
+        wanted = None if ids is None else {str(i) for i in ids}
+        rows = newest_first([e for e in events if wanted is None or str(e.get('ID')) in wanted])
+    if not rows:
+        return None, "❌ No shutdown events to export"
+
+    filepath = exportstore.new_path("shutdown_pdf", prefix, "pdf")
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    org = fixed_fields()
+    try:
+        started = time.perf_counter()
+        with pdfstream.TableWriter(
+                filepath, [c.replace('timestamp', 'Timestamp') for c in PDF_COLUMNS], PDF_WIDTHS,
+                title="PLANT SHUTDOWN EVENT LOG - OFFICIAL RECORD",
+                subtitle=f"{org['Country']} | {org['Company']} | {org['Unit/Asset']} | Generated on: {generated} "
+                         f"| {len(rows)} events, newest first",
+                footer=f"Document ID: SHUT-PRINT-{generated.replace('-', '').replace(':', '').replace(' ', '')} "
+                       f"| CONFIDENTIAL") as table:
+            for event in rows:
+                table.add_row([event.get(c, "") for c in PDF_COLUMNS])
+        metrics.observe("job", "shutdown_pdf", time.perf_counter() - started)
+        return filepath, f"✅ PDF generated: {len(rows)} shutdown events on {table.pages} A3 page(s)"
+    except Exception as e:
+        exportstore.discard(filepath)
+        return None, f"❌ PDF generation failed: {str(e)}"
+
+def export_shutdown_csv(events=None):
+    """Plain CSV of the full log (email fallback: deflates far better than xlsx; events: the list a
+    report already loaded)"""
+    if events is None:
+        df = get_filtered_shutdowns({})
+    else:
+        df = pd.DataFrame(newest_first(events), columns=SHUTDOWN_COLUMNS)
+    if df.empty:
+        return None
+    filepath = exportstore.new_path("shutdown_csv", "ShutdownLog_Export", "csv")
+    try:
+        df.to_csv(filepath, index=False, encoding='utf-8-sig')
+        return filepath
+    except Exception as e:
+        print(f"⚠️ CSV export failed: {str(e)}")
+        return None
+
 # ======================
-# GRADIO INTERFACE (PDF button removed)
+# STARTUP PHASE (explicit - nothing below runs at import time)
 # ======================
-with gr.Blocks(
-    title="Plant Shutdown Event Log",
-    theme=gr.themes.Glass(),
-    css="""
-    .shutdown-header {background: linear-gradient(to right, #7da8cc, #a3c1e6); color: white; padding: 15px; border-radius: 8px; margin-bottom: 20px}
-    .fixed-field {background-color: #e9ecef; padding: 8px; border-radius: 4px; margin-bottom: 10px; font-weight: bold}
-    """
-) as demo:
+def startup():
+    """Run the one-off startup I/O: network probe, schema migration, secrets, scheduled reports"""
+    global MYLOCALIP, GMAIL_APP_PASSWORD
+
+    with phase("shutdown_log: network IP probe"):
+        MYLOCALIP = get_IP()
+    for asset in assets.names():
+        with assets.using(asset):
+            with phase(f"shutdown_log: JSON schema migration [{asset}]"):
+                with write_lock():
+                    migrate_shutdown_file()
+                changefeed.shutdown_feed.attach(shutdown_file())
+            with phase(f"shutdown_log: build filter index + dashboard counters [{asset}]"):
+                events, version = load_shutdown_events(), changefeed.shutdown_feed.version()
+                shutdown_index.rebuild(events, version)
+                shutdown_stats.rebuild(events, version)
+    with phase("shutdown_log: load secret.json"):
+        GMAIL_APP_PASSWORD = load_gmail_password(SECRETFILE)
     # Start scheduled reports BEFORE launching UI
-    scheduler = start_scheduled_reports()
+    with phase("shutdown_log: start APScheduler"):
+        # On the elected leader only in multi-worker mode (see cluster.py)
+        cluster.when_leader("Shutdown report scheduler", _start_scheduler)
+    with phase("shutdown_log: export store sweeper"):
+        exportstore.start_sweeper()
 
     # Launch info
     border = "=" * 70
@@ -520,481 +733,612 @@ with gr.Blocks(
     print("   • Hierarchical dropdown dependencies (Classification → Cluster → Subcluster)")
     print("   • Fixed organizational fields auto-populated (Country/Company/Unit)")
     print("   • Permanent audit trail with automatic schema migration")
-    print("   • Excel exports with auto-fitted columns (PDF functionality removed)")
+    print("   • Excel exports with auto-fitted columns, A3 PDF printout (streamed page by page)")
     print("   • ⏰ AUTOMATED SCHEDULED REPORTS at 07:50 & 17:50 (Africa/Brazzaville)")
     print("🔒 SECURITY: All entries permanent. Deletion prohibited per SP-SHUT-001")
     print(border)
     print("✅ Excel export available (openpyxl installed)")
 
-    gr.Markdown("---")
-
-    # EXPORT & EMAIL SECTION (PDF button removed)
-    gr.Markdown("## 📤 Export & Distribution")
-    with gr.Row():
-        shutdown_export_excel_btn = gr.Button("📤 Export to Excel", variant="primary")
-        shutdown_send_email_btn = gr.Button("✉️ Send to Managers", variant="primary")
-
-    with gr.Row():
-        shutdown_export_file = gr.File(label="📥 Download Export", type="filepath", visible=True)
-        shutdown_email_status = gr.Textbox(label="📧 Email Status", interactive=False)
-
-    gr.Markdown("---")
-
-    # FILTER SECTION
-    gr.Markdown("## 🔍 Filter Shutdown Events")
-    shutdown_filter_inputs = {}
-    with gr.Row():
-        for col in SHUTDOWN_COLUMNS[:5]:
-            shutdown_filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
-    with gr.Row():
-        for col in SHUTDOWN_COLUMNS[5:10]:
-            shutdown_filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
-    with gr.Row():
-        for col in SHUTDOWN_COLUMNS[10:]:
-            shutdown_filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
-    shutdown_filter_btn = gr.Button("Apply Filters", variant="secondary")
-
-    # EVENTS TABLE
-    shutdown_table = gr.Dataframe(
-        headers=SHUTDOWN_COLUMNS,
-        datatype=["str"] * len(SHUTDOWN_COLUMNS),
-        interactive=False,
-        wrap=True,
-        label="Shutdown Events History"
-    )
-
-    gr.Markdown("---")
-
-    # EVENT SELECTION
-    gr.Markdown("## ➕ Add New Event / ✏️ Edit Existing Event")
-    with gr.Row():
-        shutdown_id_selector = gr.Dropdown(
-            label="Select Event ID to Edit", 
-            choices=[],
-            interactive=True,
-            scale=3
-        )
-        shutdown_load_event_btn = gr.Button("✏️ Load Selected Event", variant="primary", scale=1)
-
-    # FIXED ORGANIZATIONAL FIELDS (read-only display)
-    gr.Markdown("### 🏢 Organizational Context (Auto-populated)")
-    with gr.Row():
-        with gr.Column(scale=1):
-            gr.Markdown(f'<div class="fixed-field">Country:<br><strong>{FIXED_FIELDS["Country"]}</strong></div>', elem_id="country_field")
-        with gr.Column(scale=1):
-            gr.Markdown(f'<div class="fixed-field">Company:<br><strong>{FIXED_FIELDS["Company"]}</strong></div>', elem_id="company_field")
-        with gr.Column(scale=1):
-            gr.Markdown(f'<div class="fixed-field">Unit/Asset:<br><strong>{FIXED_FIELDS["Unit/Asset"]}</strong></div>', elem_id="unit_field")
-
-    # CLASSIFICATION SECTION (hierarchical dropdowns)
-    gr.Markdown("### 🔬 Event Classification")
-    with gr.Row():
-        shutdown_event_type = gr.Dropdown(
-            label="Event Type", 
-            choices=EVENT_TYPE_OPTIONS,
-            value=EVENT_TYPE_OPTIONS[0],
-            interactive=True
-        )
-        shutdown_event_classification = gr.Dropdown(
-            label="Event Classification", 
-            choices=EVENT_CLASSIFICATION_OPTIONS,
-            value=EVENT_CLASSIFICATION_OPTIONS[0],
-            interactive=True
-        )
-    with gr.Row():
-        shutdown_main_cluster = gr.Dropdown(
-            label="Main Cluster", 
-            choices=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]],
-            value=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0],
-            interactive=True
-        )
-        shutdown_subcluster = gr.Dropdown(
-            label="Subcluster", 
-            choices=SUBCLUSTER_OPTIONS.get(
-                f"{EVENT_CLASSIFICATION_OPTIONS[0]}|{MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]}", 
-                ["TBD"]
-            ),
-            value="TBD",
-            interactive=True
-        )
 
-    # CORE EVENT DETAILS
-    gr.Markdown("### 📝 Event Details")
-    with gr.Row():
-        shutdown_id = gr.Number(label="ID (Auto-generated for new events)", interactive=False, scale=1)
-        shutdown_timestamp = gr.Textbox(
-            label="Timestamp (YYYY-MM-DD HH:MM:SS)", 
-            value=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            scale=2
-        )
-    with gr.Row():
-        shutdown_event_desc = gr.Textbox(
-            label="Technical Details/Event Description", 
-            lines=3, 
-            max_lines=8, 
-            placeholder="Describe the event including sequence of events, systems affected, and operational impact..."
-        )
-    with gr.Row():
-        shutdown_first_cause = gr.Textbox(
-            label="First Cause", 
-            lines=2, 
-            max_lines=5,
-            placeholder="Immediate technical cause that initiated the shutdown sequence..."
-        )
-        shutdown_rca = gr.Textbox(
-            label="RCA", 
-            lines=2, 
-            max_lines=5,
-            value="Pending",
-            placeholder="Root cause analysis (to be completed within 72h per procedure)..."
-        )
-    with gr.Row():
-        shutdown_actions = gr.Textbox(
-            label="Actions", 
-            lines=3, 
-            max_lines=8,
-            value="Pending",
-            placeholder="Corrective/preventive actions with owners and deadlines..."
+# ======================
+# GRADIO INTERFACE
+# ======================
+def fixed_field_html(label, fields):
+    return f'<div class="fixed-field">{label}:<br><strong>{fields[label]}</strong></div>'
+
+def build_demo():
+    """Build the Shutdown Log UI (call startup() first)"""
+    with gr.Blocks(
+        title="Plant Shutdown Event Log",
+        theme=gr.themes.Glass(),
+        css="""
+        .shutdown-header {background: linear-gradient(to right, #7da8cc, #a3c1e6); color: white; padding: 15px; border-radius: 8px; margin-bottom: 20px}
+        .fixed-field {background-color: #e9ecef; padding: 8px; border-radius: 4px; margin-bottom: 10px; font-weight: bold}
+        """
+    ) as demo:
+        with gr.Row():
+            assets.selector(demo)
+        gr.Markdown("---")
+
+        # EXPORT & EMAIL SECTION
+        gr.Markdown("## 📤 Export & Distribution")
+        with gr.Row():
+            shutdown_export_excel_btn = gr.Button("📤 Export to Excel", variant="primary")
+            shutdown_export_pdf_btn = gr.Button("🖨️ Print to PDF", variant="primary")
+            shutdown_send_email_btn = gr.Button("✉️ Send to Managers", variant="primary")
+
+        with gr.Row():
+            shutdown_export_file = gr.File(label="📥 Download Export", type="filepath", visible=True)
+            shutdown_email_status = gr.Textbox(label="📧 Email Status", interactive=False)
+
+        gr.Markdown("---")
+
+        # FILTER SECTION
+        gr.Markdown("## 🔍 Filter Shutdown Events")
+        shutdown_filter_inputs = {}
+        with gr.Row():
+            for col in SHUTDOWN_COLUMNS[:5]:
+                shutdown_filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
+        with gr.Row():
+            for col in SHUTDOWN_COLUMNS[5:10]:
+                shutdown_filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
+        with gr.Row():
+            for col in SHUTDOWN_COLUMNS[10:]:
+                shutdown_filter_inputs[col] = gr.Textbox(label=col, placeholder=f"Filter {col}...", container=False)
+        shutdown_filter_btn = gr.Button("Apply Filters", variant="secondary")
+
+        # EVENTS TABLE
+        shutdown_table = gr.Dataframe(
+            headers=SHUTDOWN_COLUMNS,
+            datatype=["str"] * len(SHUTDOWN_COLUMNS),
+            interactive=False,
+            wrap=True,
+            label="Shutdown Events History"
         )
-    with gr.Row():
-        shutdown_action_by = gr.Textbox(label="Action by", placeholder="Name/Team responsible for actions")
-        shutdown_reported_by = gr.Textbox(label="Reported by", placeholder="Name of reporter")
-
-    # ACTION BUTTONS
-    with gr.Row():
-        shutdown_add_new_btn = gr.Button("➕ Add New Event", variant="primary")
-        shutdown_save_btn = gr.Button("💾 Save Event", variant="primary", visible=False)
-        shutdown_cancel_btn = gr.Button("↺ Cancel", variant="secondary")
-
-    shutdown_status_msg = gr.Textbox(label="Operation Status", interactive=False)
-
-    gr.Markdown("---")
-
-    # FOOTER
-    with gr.Row():
-        with gr.Column(scale=1):
-            try:
-                gr.Image("logo.png", height=40, container=False, show_label=False)
-            except:
-                gr.Markdown("![Logo](logo.png)", visible=False)
-        with gr.Column(scale=2):
-            gr.Markdown(
-                "**All rights reserved (C)**\n"
-                "created by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\n"
-                f"visit [Key Solution SRL](https://key-solution.eu) | Network IP: {MYLOCALIP}"
+        shutdown_version_state = gr.State(None)  # change-feed version the table reflects
+        shutdown_live_cache = gr.State(None)  # previous as-you-type result set (refinement reuse)
+        shutdown_timer = gr.Timer(LIVE_REFRESH_SECONDS)
+
+        gr.Markdown("---")
+
+        # EVENT SELECTION
+        gr.Markdown("## ➕ Add New Event / ✏️ Edit Existing Event")
+        with gr.Row():
+            shutdown_id_selector = gr.Dropdown(
+                label="Select Event ID to Edit (type ID, first cause or description)", 
+                choices=[],
+                interactive=True,
+                allow_custom_value=True,
+                filterable=True,
+                scale=3
+            )
+            shutdown_load_event_btn = gr.Button("✏️ Load Selected Event", variant="primary", scale=1)
+
+        # FIXED ORGANIZATIONAL FIELDS (read-only display)
+        gr.Markdown("### 🏢 Organizational Context (Auto-populated)")
+        with gr.Row():
+            fixed_field_displays = []
+            for label, elem_id in (("Country", "country_field"), ("Company", "company_field"), ("Unit/Asset", "unit_field")):
+                with gr.Column(scale=1):
+                    fixed_field_displays.append(gr.Markdown(fixed_field_html(label, assets.fields(assets.default())),
+                                                            elem_id=elem_id))
+
+        # CLASSIFICATION SECTION (hierarchical dropdowns)
+        gr.Markdown("### 🔬 Event Classification")
+        with gr.Row():
+            shutdown_event_type = gr.Dropdown(
+                label="Event Type", 
+                choices=EVENT_TYPE_OPTIONS,
+                value=EVENT_TYPE_OPTIONS[0],
+                interactive=True
+            )
+            shutdown_event_classification = gr.Dropdown(
+                label="Event Classification", 
+                choices=EVENT_CLASSIFICATION_OPTIONS,
+                value=EVENT_CLASSIFICATION_OPTIONS[0],
+                interactive=True
+            )
+        with gr.Row():
+            shutdown_main_cluster = gr.Dropdown(
+                label="Main Cluster", 
+                choices=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]],
+                value=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0],
+                interactive=True
+            )
+            shutdown_subcluster = gr.Dropdown(
+                label="Subcluster", 
+                choices=SUBCLUSTER_OPTIONS.get(
+                    f"{EVENT_CLASSIFICATION_OPTIONS[0]}|{MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]}", 
+                    ["TBD"]
+                ),
+                value="TBD",
+                interactive=True
             )
 
-    # ======================
-    # EVENT HANDLERS
-    # ======================
-    def refresh_shutdown_view(filters_dict=None):
-        """Refresh table and ID selector"""
-        if filters_dict is None:
-            filters_dict = {col: "" for col in SHUTDOWN_COLUMNS}
-        df = get_filtered_shutdowns(filters_dict)
-        events = load_shutdown_events()
-        id_choices = [str(e['ID']) for e in events] if events else []
-        return (
-            df,
-            gr.update(choices=id_choices, value=None),
-            gr.update(value=None, interactive=False),
-            gr.update(value=datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-            gr.update(value=EVENT_TYPE_OPTIONS[0]),
-            gr.update(value=EVENT_CLASSIFICATION_OPTIONS[0]),
-            gr.update(value=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]),
-            gr.update(value="TBD"),
-            gr.update(value=""),
-            gr.update(value=""),
-            gr.update(value="Pending"),
-            gr.update(value="Pending"),
-            gr.update(value=""),
-            gr.update(value=""),
-            gr.update(visible=False),
-            ""
-        )
+        # CORE EVENT DETAILS
+        gr.Markdown("### 📝 Event Details")
+        with gr.Row():
+            shutdown_id = gr.Number(label="ID (Auto-generated for new events)", interactive=False, scale=1)
+            shutdown_timestamp = gr.Textbox(
+                label="Timestamp (YYYY-MM-DD HH:MM:SS)", 
+                value=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                scale=2
+            )
+        with gr.Row():
+            shutdown_event_desc = gr.Textbox(
+                label="Technical Details/Event Description", 
+                lines=3, 
+                max_lines=8, 
+                placeholder="Describe the event including sequence of events, systems affected, and operational impact..."
+            )
+        with gr.Row():
+            shutdown_first_cause = gr.Textbox(
+                label="First Cause", 
+                lines=2, 
+                max_lines=5,
+                placeholder="Immediate technical cause that initiated the shutdown sequence..."
+            )
+            shutdown_rca = gr.Textbox(
+                label="RCA", 
+                lines=2, 
+                max_lines=5,
+                value="Pending",
+                placeholder="Root cause analysis (to be completed within 72h per procedure)..."
+            )
+        with gr.Row():
+            shutdown_actions = gr.Textbox(
+                label="Actions", 
+                lines=3, 
+                max_lines=8,
+                value="Pending",
+                placeholder="Corrective/preventive actions with owners and deadlines..."
+            )
+        with gr.Row():
+            shutdown_action_by = gr.Textbox(label="Action by", placeholder="Name/Team responsible for actions")
+            shutdown_reported_by = gr.Textbox(label="Reported by", placeholder="Name of reporter")
+
+        # ACTION BUTTONS
+        with gr.Row():
+            shutdown_add_new_btn = gr.Button("➕ Add New Event", variant="primary")
+            shutdown_save_btn = gr.Button("💾 Save Event", variant="primary", visible=False)
+            shutdown_cancel_btn = gr.Button("↺ Cancel", variant="secondary")
+
+        shutdown_status_msg = gr.Textbox(label="Operation Status", interactive=False)
+
+        gr.Markdown("---")
+
+        # FOOTER
+        with gr.Row():
+            with gr.Column(scale=1):
+                try:
+                    gr.Image(webassets.image("logo.png"), height=40, container=False, show_label=False)
+                except:
+                    gr.Markdown("![Logo](logo.png)", visible=False)
+            with gr.Column(scale=2):
+                gr.Markdown(
+                    "**All rights reserved (C)**\n"
+                    "created by fabio.matricardi@key-solution.eu for NGUYA FLNG Project\n"
+                    f"visit [Key Solution SRL](https://key-solution.eu) | Network IP: {MYLOCALIP}"
+                )
+
+        # ======================
+        # EVENT HANDLERS
+        # ======================
+        def refresh_shutdown_view(filters_dict=None):
+            """Refresh table and ID selector"""
+            if filters_dict is None:
+                filters_dict = {col: "" for col in SHUTDOWN_COLUMNS}
+            version = changefeed.shutdown_feed.version()
+            df = get_filtered_shutdowns(filters_dict)
+            return (
+                df,
+                gr.update(choices=shutdown_choices(""), value=None),
+                gr.update(value=None, interactive=False),
+                gr.update(value=datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                gr.update(value=EVENT_TYPE_OPTIONS[0]),
+                gr.update(value=EVENT_CLASSIFICATION_OPTIONS[0]),
+                gr.update(value=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]),
+                gr.update(value="TBD"),
+                gr.update(value=""),
+                gr.update(value=""),
+                gr.update(value="Pending"),
+                gr.update(value="Pending"),
+                gr.update(value=""),
+                gr.update(value=""),
+                gr.update(visible=False),
+                "",
+                version
+            )
 
-    def update_main_cluster_options(classification):
-        """Update Main Cluster options based on Event Classification"""
-        options = MAIN_CLUSTER_OPTIONS.get(classification, [])
-        return gr.update(choices=options, value=options[0] if options else "TBD")
-
-    def update_subcluster_options(classification, main_cluster):
-        """Update Subcluster options based on Classification + Main Cluster"""
-        key = f"{classification}|{main_cluster}"
-        options = SUBCLUSTER_OPTIONS.get(key, ["TBD"])
-        return gr.update(choices=options, value=options[0] if options else "TBD")
-
-    def load_selected_event(event_id_str):
-        """Load event into form for editing"""
-        if not event_id_str:
-            return {shutdown_status_msg: "❌ Please select an Event ID"}
+        def update_main_cluster_options(classification):
+            """Update Main Cluster options based on Event Classification"""
+            options = MAIN_CLUSTER_OPTIONS.get(classification, [])
+            return gr.update(choices=options, value=options[0] if options else "TBD")
+
+        def update_subcluster_options(classification, main_cluster):
+            """Update Subcluster options based on Classification + Main Cluster"""
+            key = f"{classification}|{main_cluster}"
+            options = SUBCLUSTER_OPTIONS.get(key, ["TBD"])
+            return gr.update(choices=options, value=options[0] if options else "TBD")
+
+        def load_selected_event(event_id_str):
+            """Load event into form for editing"""
+            if not event_id_str:
+                return {shutdown_status_msg: "❌ Please select an Event ID"}
         
-        try:
-            event_id = int(event_id_str)
-        except:
-            return {shutdown_status_msg: "❌ Invalid Event ID"}
-        
-        events = load_shutdown_events()
-        event = next((e for e in events if e['ID'] == event_id), None)
-        
-        if not event:
-            return {shutdown_status_msg: f"❌ Event ID {event_id} not found"}
-        
-        # Get subcluster options based on stored values
-        cluster_key = f"{event.get('Event Classification', 'GENUINE')}|{event.get('Main Cluster', '')}"
-        sub_options = SUBCLUSTER_OPTIONS.get(cluster_key, ["TBD"])
-        sub_value = event.get('Subcluster', "TBD") if event.get('Subcluster', "TBD") in sub_options else sub_options[0]
+            try:
+                event_id = int(event_id_str)
+            except:
+                typed = re.match(r"\s*(\d+)", str(event_id_str))  # typed label, e.g. "12 · PSD · ..."
+                if not typed:
+                    return {shutdown_status_msg: "❌ Invalid Event ID"}
+                event_id = int(typed.group(1))
         
-        return {
-            shutdown_id: gr.update(value=event['ID'], interactive=False),
-            shutdown_timestamp: gr.update(value=event.get('timestamp', '')),
-            shutdown_event_type: gr.update(value=event.get('Event Type', EVENT_TYPE_OPTIONS[0])),
-            shutdown_event_classification: gr.update(value=event.get('Event Classification', EVENT_CLASSIFICATION_OPTIONS[0])),
-            shutdown_main_cluster: gr.update(value=event.get('Main Cluster', MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0])),
-            shutdown_subcluster: gr.update(value=sub_value, choices=sub_options),
-            shutdown_event_desc: gr.update(value=event.get('Technical Details/Event Description', '')),
-            shutdown_first_cause: gr.update(value=event.get('First Cause', '')),
-            shutdown_rca: gr.update(value=event.get('RCA', 'Pending')),
-            shutdown_actions: gr.update(value=event.get('Actions', 'Pending')),
-            shutdown_action_by: gr.update(value=event.get('Action by', '')),
-            shutdown_reported_by: gr.update(value=event.get('Reported by', '')),
-            shutdown_save_btn: gr.update(visible=True, value="💾 Update Event"),
-            shutdown_status_msg: f"✏️ Editing Event ID #{event_id}. Make changes and click 'Save Event'"
-        }
-
-    def prepare_new_event():
-        """Reset form for new event"""
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        return {
-            shutdown_id: gr.update(value=None, interactive=False),
-            shutdown_timestamp: gr.update(value=now),
-            shutdown_event_type: gr.update(value=EVENT_TYPE_OPTIONS[0]),
-            shutdown_event_classification: gr.update(value=EVENT_CLASSIFICATION_OPTIONS[0]),
-            shutdown_main_cluster: gr.update(value=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]),
-            shutdown_subcluster: gr.update(value="TBD", choices=SUBCLUSTER_OPTIONS.get(
-                f"{EVENT_CLASSIFICATION_OPTIONS[0]}|{MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]}", ["TBD"]
-            )),
-            shutdown_event_desc: gr.update(value=""),
-            shutdown_first_cause: gr.update(value=""),
-            shutdown_rca: gr.update(value="Pending"),
-            shutdown_actions: gr.update(value="Pending"),
-            shutdown_action_by: gr.update(value=""),
-            shutdown_reported_by: gr.update(value=""),
-            shutdown_save_btn: gr.update(visible=True, value="✅ Add New Event"),
-            shutdown_status_msg: "➕ Creating new shutdown event. Fill required fields and click 'Add New Event'"
-        }
-
-    def save_shutdown_event(id_val, timestamp, event_type, classification, main_cluster, subcluster,
-                          desc, cause, rca, actions, action_by, reported_by):
-        """Save new or updated event with full schema"""
-        # Validation (minimal - per your request)
-        if not desc.strip():
-            return {shutdown_status_msg: "❌ Technical Details/Event Description is required"}
-        if not cause.strip():
-            return {shutdown_status_msg: "❌ First Cause is required"}
-        if not reported_by.strip():
-            return {shutdown_status_msg: "❌ Reported by is required"}
+            events = load_shutdown_events()
+            event = next((e for e in events if e['ID'] == event_id), None)
         
-        events = load_shutdown_events()
+            if not event:
+                return {shutdown_status_msg: f"❌ Event ID {event_id} not found"}
         
-        # Prepare event data with fixed fields auto-injected
-        event_data = {
-            'ID': id_val,
-            'timestamp': timestamp.strip() or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'Country': FIXED_FIELDS['Country'],
-            'Company': FIXED_FIELDS['Company'],
-            'Unit/Asset': FIXED_FIELDS['Unit/Asset'],
-            'Event Type': event_type,
-            'Event Classification': classification,
-            'Main Cluster': main_cluster,
-            'Subcluster': subcluster,
-            'Technical Details/Event Description': desc.strip(),
-            'First Cause': cause.strip(),
-            'RCA': rca.strip() if rca.strip() else "Pending",
-            'Actions': actions.strip() if actions.strip() else "Pending",
-            'Action by': action_by.strip(),
-            'Reported by': reported_by.strip()
-        }
+            # Get subcluster options based on stored values
+            cluster_key = f"{event.get('Event Classification', 'GENUINE')}|{event.get('Main Cluster', '')}"
+            sub_options = SUBCLUSTER_OPTIONS.get(cluster_key, ["TBD"])
+            sub_value = event.get('Subcluster', "TBD") if event.get('Subcluster', "TBD") in sub_options else sub_options[0]
         
-        if id_val:  # Update existing
-            for i, e in enumerate(events):
-                if e['ID'] == id_val:
-                    events[i] = event_data
-                    break
-            action = "updated"
-        else:  # Create new
-            new_id = max((e['ID'] for e in events), default=0) + 1
-            event_data['ID'] = new_id
-            events.append(event_data)
-            action = "created"
-        
-        # Save with backup
-        if save_shutdown_events(events):
-            df = get_filtered_shutdowns({})
-            id_choices = [str(e['ID']) for e in events]
             return {
-                shutdown_table: df,
-                shutdown_id_selector: gr.update(choices=id_choices),
+                shutdown_id: gr.update(value=event['ID'], interactive=False),
+                shutdown_timestamp: gr.update(value=event.get('timestamp', '')),
+                shutdown_event_type: gr.update(value=event.get('Event Type', EVENT_TYPE_OPTIONS[0])),
+                shutdown_event_classification: gr.update(value=event.get('Event Classification', EVENT_CLASSIFICATION_OPTIONS[0])),
+                shutdown_main_cluster: gr.update(value=event.get('Main Cluster', MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0])),
+                shutdown_subcluster: gr.update(value=sub_value, choices=sub_options),
+                shutdown_event_desc: gr.update(value=event.get('Technical Details/Event Description', '')),
+                shutdown_first_cause: gr.update(value=event.get('First Cause', '')),
+                shutdown_rca: gr.update(value=event.get('RCA', 'Pending')),
+                shutdown_actions: gr.update(value=event.get('Actions', 'Pending')),
+                shutdown_action_by: gr.update(value=event.get('Action by', '')),
+                shutdown_reported_by: gr.update(value=event.get('Reported by', '')),
+                shutdown_save_btn: gr.update(visible=True, value="💾 Update Event"),
+                shutdown_status_msg: f"✏️ Editing Event ID #{event_id}. Make changes and click 'Save Event'"
+            }
+
+        def prepare_new_event():
+            """Reset form for new event"""
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            return {
                 shutdown_id: gr.update(value=None, interactive=False),
-                shutdown_timestamp: gr.update(value=datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                shutdown_timestamp: gr.update(value=now),
                 shutdown_event_type: gr.update(value=EVENT_TYPE_OPTIONS[0]),
                 shutdown_event_classification: gr.update(value=EVENT_CLASSIFICATION_OPTIONS[0]),
                 shutdown_main_cluster: gr.update(value=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]),
-                shutdown_subcluster: gr.update(value="TBD"),
+                shutdown_subcluster: gr.update(value="TBD", choices=SUBCLUSTER_OPTIONS.get(
+                    f"{EVENT_CLASSIFICATION_OPTIONS[0]}|{MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]}", ["TBD"]
+                )),
                 shutdown_event_desc: gr.update(value=""),
                 shutdown_first_cause: gr.update(value=""),
                 shutdown_rca: gr.update(value="Pending"),
                 shutdown_actions: gr.update(value="Pending"),
                 shutdown_action_by: gr.update(value=""),
                 shutdown_reported_by: gr.update(value=""),
-                shutdown_save_btn: gr.update(visible=False),
-                shutdown_status_msg: f"✅ Event ID #{event_data['ID']} successfully {action}! (Permanent audit record)"
+                shutdown_save_btn: gr.update(visible=True, value="✅ Add New Event"),
+                shutdown_status_msg: "➕ Creating new shutdown event. Fill required fields and click 'Add New Event'"
             }
-        else:
-            return {shutdown_status_msg: "❌ Save failed. Check file permissions."}
 
-    def apply_shutdown_filters(*filter_vals):
-        """Apply filters to shutdown table"""
-        filters = dict(zip(SHUTDOWN_COLUMNS, filter_vals))
-        df = get_filtered_shutdowns(filters)
-        events = load_shutdown_events()
-        id_choices = [str(e['ID']) for e in events] if events else []
-        return {
-            shutdown_table: df,
-            shutdown_id_selector: gr.update(choices=id_choices)
-        }
-
-    def export_shutdown_excel_handler():
-        filepath, msg = export_shutdown_excel()
-        if filepath and os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-            return filepath, msg, gr.update(visible=True)
-        return None, msg, gr.update(visible=False)
-
-    def send_shutdown_to_managers():
-        """Send shutdown log Excel export to managers"""
-        managers, error = read_manager_emails()
-        if error:
-            return error
+        def save_shutdown_event(id_val, timestamp, event_type, classification, main_cluster, subcluster,
+                              desc, cause, rca, actions, action_by, reported_by):
+            """Save new or updated event with full schema"""
+            # Validation (minimal - per your request)
+            if not desc.strip():
+                return {shutdown_status_msg: "❌ Technical Details/Event Description is required"}
+            if not cause.strip():
+                return {shutdown_status_msg: "❌ First Cause is required"}
+            if not reported_by.strip():
+                return {shutdown_status_msg: "❌ Reported by is required"}
         
-        # Generate Excel export
-        excel_path, excel_msg = export_shutdown_excel()
-        if excel_path is None:
-            return excel_msg
+            with write_lock():
+                events = load_shutdown_events()
         
-        # Send with shutdown-specific note
-        custom_note = (
-            f"SHUTDOWN LOG EXPORT\n"
-            f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Congo FLNG Time)\n"
-            f"Total Events: {len(load_shutdown_events())}\n"
-            f"IP ADDRESS: {MYLOCALIP}"
-        )
+                # Prepare event data with fixed fields auto-injected
+                event_data = {
+                    'ID': id_val,
+                    'timestamp': timestamp.strip() or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    **fixed_fields(),
+                    'Event Type': event_type,
+                    'Event Classification': classification,
+                    'Main Cluster': main_cluster,
+                    'Subcluster': subcluster,
+                    'Technical Details/Event Description': desc.strip(),
+                    'First Cause': cause.strip(),
+                    'RCA': rca.strip() if rca.strip() else "Pending",
+                    'Actions': actions.strip() if actions.strip() else "Pending",
+                    'Action by': action_by.strip(),
+                    'Reported by': reported_by.strip()
+                }
         
-        status = send_email_with_exports(
-            recipients=managers,
-            excel_path=excel_path,
-            custom_note=custom_note
-        )
+                if id_val:  # Update existing
+                    for i, e in enumerate(events):
+                        if e['ID'] == id_val:
+                            events[i] = event_data
+                            break
+                    action = "updated"
+                else:  # Create new
+                    new_id = max((e['ID'] for e in events), default=0) + 1
+                    event_data['ID'] = new_id
+                    events.append(event_data)
+                    action = "created"
         
-        # Cleanup temp file
-        try:
-            if excel_path and os.path.exists(excel_path):
-                os.remove(excel_path)
-        except:
-            pass
+                # Save with backup
+                saved = save_shutdown_events(events, changed_ids=[event_data['ID']])
+            if saved:
+                df = get_filtered_shutdowns({})
+                return {
+                    shutdown_table: df,
+                    shutdown_id_selector: gr.update(choices=shutdown_choices(""), value=None),
+                    shutdown_id: gr.update(value=None, interactive=False),
+                    shutdown_timestamp: gr.update(value=datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+                    shutdown_event_type: gr.update(value=EVENT_TYPE_OPTIONS[0]),
+                    shutdown_event_classification: gr.update(value=EVENT_CLASSIFICATION_OPTIONS[0]),
+                    shutdown_main_cluster: gr.update(value=MAIN_CLUSTER_OPTIONS[EVENT_CLASSIFICATION_OPTIONS[0]][0]),
+                    shutdown_subcluster: gr.update(value="TBD"),
+                    shutdown_event_desc: gr.update(value=""),
+                    shutdown_first_cause: gr.update(value=""),
+                    shutdown_rca: gr.update(value="Pending"),
+                    shutdown_actions: gr.update(value="Pending"),
+                    shutdown_action_by: gr.update(value=""),
+                    shutdown_reported_by: gr.update(value=""),
+                    shutdown_save_btn: gr.update(visible=False),
+                    shutdown_status_msg: f"✅ Event ID #{event_data['ID']} successfully {action}! (Permanent audit record)"
+                }
+            else:
+                return {shutdown_status_msg: "❌ Save failed. Check file permissions."}
+
+        def apply_shutdown_filters(*filter_vals):
+            """Apply filters to shutdown table"""
+            filters = dict(zip(SHUTDOWN_COLUMNS, filter_vals))
+            version = changefeed.shutdown_feed.version()
+            df = get_filtered_shutdowns(filters)
+            return {
+                shutdown_table: df,
+                shutdown_version_state: version
+            }
+
+        def shutdown_choices(q):
+            """Top-N events matching q by ID, first cause or description prefix (newest if q is empty)"""
+            return lookup.shutdown_lookup.choices(q, changefeed.shutdown_feed.version(), load_shutdown_events)
+
+        def lookup_shutdown_events(key_up: gr.KeyUpData):
+            """Autocomplete: typed text in the selector -> top-N matching events"""
+            return gr.update(choices=shutdown_choices(key_up.input_value))
+
+        def show_recent_shutdown_events():
+            return gr.update(choices=shutdown_choices(""))
+
+        def live_shutdown_filter(request: gr.Request, cache, *filter_vals):
+            """As-you-type filtering: narrow the previous result in memory when possible, else reload"""
+            key = (request.session_hash if request else None, "shutdown")
+            ticket = LIVE_FILTER_REQUESTS.begin(key)
+            filters = dict(zip(SHUTDOWN_COLUMNS, filter_vals))
+            version = changefeed.shutdown_feed.version()
+            if livefilter.reusable(cache, filters, version, special_chars=""):
+                df = livefilter.refine(cache["df"], filters)
+            else:
+                df = get_filtered_shutdowns(filters)
+            if LIVE_FILTER_REQUESTS.is_stale(key, ticket):
+                return gr.skip()  # a newer keystroke is already being served
+            return {
+                shutdown_table: df,
+                shutdown_version_state: version,
+                shutdown_live_cache: livefilter.cache_entry(filters, version, df)
+            }
+
+        def poll_shutdown_changes(known_version, table_df, *filter_vals):
+            """Timer tick: no-op unless the change feed moved; then merge only the changed events"""
+            version, changed, full_refresh = changefeed.shutdown_feed.changes_since(known_version)
+            if known_version is None:
+                return {shutdown_version_state: version}
+            if version == known_version:
+                return gr.skip()
+        
+            filters = dict(zip(SHUTDOWN_COLUMNS, filter_vals))
+            if full_refresh or table_df is None or 'ID' not in table_df.columns:
+                df = get_filtered_shutdowns(filters)
+            else:
+                fresh = get_filtered_shutdowns(filters, ids=changed)
+                kept = table_df[~table_df['ID'].astype(str).isin({str(i) for i in changed})]
+                df = pd.concat([kept, fresh], ignore_index=True) if not fresh.empty else kept
+                df = (df.assign(_id=pd.to_numeric(df['ID'], errors='coerce'))
+                      .sort_values('_id', ascending=False).drop(columns='_id').reset_index(drop=True))
+            return {shutdown_table: df, shutdown_version_state: version}
+
+        def export_shutdown_excel_handler():
+            filepath, msg = export_shutdown_excel()
+            if filepath and os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+                return filepath, msg, gr.update(visible=True)
+            return None, msg, gr.update(visible=False)
+
+        def export_shutdown_pdf_handler():
+            filepath, msg = export_shutdown_pdf()
+            if filepath and os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+                return filepath, msg, gr.update(visible=True)
+            return None, msg, gr.update(visible=False)
+
+        def send_shutdown_to_managers():
+            """Send shutdown log Excel export (and the PDF printout when it fits) to managers"""
+            managers, error = read_manager_emails()
+            if error:
+                return error
+        
+            # Generate Excel export (one read: the note's count matches the attachment)
+            events = load_shutdown_events()
+            excel_path, excel_msg = export_shutdown_excel(events=events)
+            if excel_path is None:
+                return excel_msg
         
-        return status
-
-    # ======================
-    # EVENT BINDINGS
-    # ======================
-    # Hierarchical dropdown dependencies
-    shutdown_event_classification.change(
-        update_main_cluster_options,
-        inputs=[shutdown_event_classification],
-        outputs=[shutdown_main_cluster]
-    )
+            # Send with shutdown-specific note
+            custom_note = (
+                f"SHUTDOWN LOG EXPORT\n"
+                f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Congo FLNG Time)\n"
+                f"Total Events: {len(events)}\n"
+                f"IP ADDRESS: {MYLOCALIP}"
+            )
+        
+            status = send_email_with_exports(
+                recipients=managers,
+                excel_path=excel_path,
+                custom_note=custom_note,
+                pdf=lambda: export_shutdown_pdf(events=events)[0]
+            )
+        
+            # Cleanup temp file
+            try:
+                if excel_path and os.path.exists(excel_path):
+                    os.remove(excel_path)
+            except:
+                pass
+        
+            return status
+
+        # ======================
+        # EVENT BINDINGS
+        # ======================
+        # Hierarchical dropdown dependencies
+        shutdown_event_classification.change(
+            metrics.instrument(update_main_cluster_options),
+            inputs=[shutdown_event_classification],
+            outputs=[shutdown_main_cluster]
+        )
     
-    shutdown_main_cluster.change(
-        update_subcluster_options,
-        inputs=[shutdown_event_classification, shutdown_main_cluster],
-        outputs=[shutdown_subcluster]
-    )
-
-    shutdown_filter_btn.click(
-        apply_shutdown_filters,
-        inputs=[*[shutdown_filter_inputs[col] for col in SHUTDOWN_COLUMNS]],
-        outputs=[shutdown_table, shutdown_id_selector]
-    )
-
-    shutdown_load_event_btn.click(
-        load_selected_event,
-        inputs=[shutdown_id_selector],
-        outputs=[
-            shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
-            shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
-            shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
-            shutdown_save_btn, shutdown_status_msg
-        ]
-    )
-
-    shutdown_add_new_btn.click(
-        prepare_new_event,
-        outputs=[
-            shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
-            shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
-            shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
-            shutdown_save_btn, shutdown_status_msg
-        ]
-    )
-
-    shutdown_save_btn.click(
-        save_shutdown_event,
-        inputs=[
-            shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
-            shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
-            shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by
-        ],
-        outputs=[
-            shutdown_table, shutdown_id_selector,
-            shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
-            shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
-            shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
-            shutdown_save_btn, shutdown_status_msg
-        ]
-    )
-
-    shutdown_cancel_btn.click(
-        refresh_shutdown_view,
-        outputs=[
-            shutdown_table, shutdown_id_selector,
-            shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
-            shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
-            shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
-            shutdown_save_btn, shutdown_status_msg
-        ]
-    )
-
-    shutdown_export_excel_btn.click(
-        export_shutdown_excel_handler,
-        outputs=[shutdown_export_file, shutdown_email_status, shutdown_export_file]
-    )
-
-    shutdown_send_email_btn.click(
-        send_shutdown_to_managers,
-        outputs=[shutdown_email_status]
-    )
-
-    # Auto-refresh on app load
-    demo.load(
-        refresh_shutdown_view,
-        outputs=[
-            shutdown_table, shutdown_id_selector,
-            shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
-            shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
-            shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
-            shutdown_save_btn, shutdown_status_msg
-        ]
-    )
+        shutdown_main_cluster.change(
+            metrics.instrument(update_subcluster_options),
+            inputs=[shutdown_event_classification, shutdown_main_cluster],
+            outputs=[shutdown_subcluster]
+        )
+
+        # As-you-type filtering: debounced in the browser, off the queue, stale results dropped
+        gr.on(
+            triggers=[shutdown_filter_inputs[col].input for col in SHUTDOWN_COLUMNS],
+            fn=metrics.instrument(live_shutdown_filter),
+            inputs=[shutdown_live_cache, *[shutdown_filter_inputs[col] for col in SHUTDOWN_COLUMNS]],
+            outputs=[shutdown_table, shutdown_version_state, shutdown_live_cache],
+            js=livefilter.debounce_js("shutdown"),
+            trigger_mode="multiple",
+            queue=False,
+            show_progress="hidden"
+        )
+
+        shutdown_filter_btn.click(
+            metrics.instrument(apply_shutdown_filters),
+            inputs=[*[shutdown_filter_inputs[col] for col in SHUTDOWN_COLUMNS]],
+            outputs=[shutdown_table, shutdown_version_state]
+        )
+
+        # Live updates: cheap change-feed poll, kept off the queue
+        shutdown_timer.tick(
+            metrics.instrument(poll_shutdown_changes),
+            inputs=[shutdown_version_state, shutdown_table, *[shutdown_filter_inputs[col] for col in SHUTDOWN_COLUMNS]],
+            outputs=[shutdown_table, shutdown_version_state],
+            queue=False,
+            show_progress="hidden"
+        )
+
+        # Autocomplete: top-N matches as the user types; newest events when the selector opens
+        shutdown_id_selector.key_up(
+            metrics.instrument(lookup_shutdown_events),
+            outputs=[shutdown_id_selector],
+            js=livefilter.debounce_js("shutdown_lookup", 150),
+            trigger_mode="multiple",
+            queue=False,
+            show_progress="hidden"
+        )
+        shutdown_id_selector.focus(
+            metrics.instrument(show_recent_shutdown_events),
+            outputs=[shutdown_id_selector],
+            queue=False,
+            show_progress="hidden"
+        )
+
+        shutdown_load_event_btn.click(
+            metrics.instrument(load_selected_event),
+            inputs=[shutdown_id_selector],
+            outputs=[
+                shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
+                shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
+                shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
+                shutdown_save_btn, shutdown_status_msg
+            ]
+        )
+
+        shutdown_add_new_btn.click(
+            metrics.instrument(prepare_new_event),
+            outputs=[
+                shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
+                shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
+                shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
+                shutdown_save_btn, shutdown_status_msg
+            ]
+        )
+
+        shutdown_save_btn.click(
+            metrics.instrument(save_shutdown_event),
+            inputs=[
+                shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
+                shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
+                shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by
+            ],
+            outputs=[
+                shutdown_table, shutdown_id_selector,
+                shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
+                shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
+                shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
+                shutdown_save_btn, shutdown_status_msg
+            ]
+        )
+
+        shutdown_cancel_btn.click(
+            metrics.instrument(refresh_shutdown_view),
+            outputs=[
+                shutdown_table, shutdown_id_selector,
+                shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
+                shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
+                shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
+                shutdown_save_btn, shutdown_status_msg, shutdown_version_state
+            ]
+        )
+
+        shutdown_export_excel_btn.click(
+            metrics.instrument(exportstore.served(export_shutdown_excel_handler)),
+            outputs=[shutdown_export_file, shutdown_email_status, shutdown_export_file]
+        )
+
+        shutdown_export_pdf_btn.click(
+            metrics.instrument(exportstore.served(export_shutdown_pdf_handler)),
+            outputs=[shutdown_export_file, shutdown_email_status, shutdown_export_file]
+        )
+
+        shutdown_send_email_btn.click(
+            metrics.instrument(send_shutdown_to_managers),
+            outputs=[shutdown_email_status]
+        )
+
+        # Auto-refresh on app load
+        demo.load(
+            metrics.instrument(refresh_shutdown_view),
+            outputs=[
+                shutdown_table, shutdown_id_selector,
+                shutdown_id, shutdown_timestamp, shutdown_event_type, shutdown_event_classification,
+                shutdown_main_cluster, shutdown_subcluster, shutdown_event_desc, shutdown_first_cause,
+                shutdown_rca, shutdown_actions, shutdown_action_by, shutdown_reported_by,
+                shutdown_save_btn, shutdown_status_msg, shutdown_version_state
+            ]
+        )
+        demo.load(
+            lambda: [fixed_field_html(label, fixed_fields()) for label in ("Country", "Company", "Unit/Asset")],
+            outputs=fixed_field_displays,
+            queue=False,
+            show_progress="hidden"
+        )
+
+    return assets.scope_handlers(demo)
 
 # ======================
 # LAUNCH APPLICATION WITH SCHEDULER
@@ -1010,11 +1354,12 @@ if __name__ == "__main__":
         print("   Place required logo files in application directory for full UI experience")
 
     # Launch application
+    startup()
     try:
-        demo.launch()
+        build_demo().launch()
     finally:
         # Graceful shutdown of scheduler
         if scheduler and scheduler.running:
             print("\n🛑 Shutting down scheduled reports...")
             scheduler.shutdown(wait=False)
-            print("✅ Scheduler stopped")
\ No newline at end of file
+            print("✅ Scheduler stopped")
\ No newline at end of file
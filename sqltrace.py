@@ -0,0 +1,155 @@
+"""
+Opt-in SQL tracing for fgs_overrides.db
+Times every statement; statements slower than the threshold are logged to slow_queries.log
+with their EXPLAIN QUERY PLAN and redacted parameters, and a top-N summary is kept for the
+Admin Panel.
+
+Enable with environment variables (or from the Admin Panel at runtime):
+    CCR_SQL_TRACE=1            turn tracing on
+    CCR_SLOW_QUERY_MS=100      slow-query threshold in milliseconds
+"""
+import os
+import re
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+ENABLED = os.environ.get("CCR_SQL_TRACE", "").strip().lower() in ("1", "true", "yes", "on")
+SLOW_QUERY_MS = float(os.environ.get("CCR_SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG = "slow_queries.log"
+MAX_STATEMENTS = 500  # distinct statements kept in the summary
+
+_LOCK = threading.Lock()
+_STATS = {}  # normalized sql -> dict(count, total_ms, max_ms, slow, plan, last_params)
+
+
+def configure(enabled=None, slow_query_ms=None):
+    """Runtime toggle (Admin Panel)"""
+    global ENABLED, SLOW_QUERY_MS
+    if enabled is not None:
+        ENABLED = bool(enabled)
+    if slow_query_ms is not None:
+        SLOW_QUERY_MS = max(0.0, float(slow_query_ms))
+
+
+def reset():
+    with _LOCK:
+        _STATS.clear()
+
+
+def _normalize(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def redact(params):
+    """Keep the shape of the parameters, never the values (tags/descriptions are operational data)"""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {k: redact([v])[0] for k, v in params.items()}
+    redacted = []
+    for p in params:
+        if p is None:
+            redacted.append("NULL")
+        elif isinstance(p, str):
+            pattern = "%…%" if p.startswith("%") and p.endswith("%") and len(p) > 1 else "…"
+            redacted.append(f"<str:{len(p)} {pattern}>")
+        else:
+            redacted.append(f"<{type(p).__name__}>")
+    return redacted
+
+
+def _explain(conn, sql, params):
+    """EXPLAIN QUERY PLAN on the same connection (read statements only)"""
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return []
+    try:
+        cur = sqlite3.Connection.cursor(conn)
+        rows = cur.execute(f"EXPLAIN QUERY PLAN {sql}", params or []).fetchall()
+        cur.close()
+        return [row[-1] for row in rows]
+    except sqlite3.Error as e:
+        return [f"(plan unavailable: {e})"]
+
+
+def _record(conn, sql, params, elapsed_ms):
+    key = _normalize(sql)
+    slow = elapsed_ms >= SLOW_QUERY_MS
+    plan = _explain(conn, sql, params) if slow else None
+    with _LOCK:
+        stat = _STATS.get(key)
+        if stat is None:
+            if len(_STATS) >= MAX_STATEMENTS:
+                # Drop the cheapest statement to bound memory
+                del _STATS[min(_STATS, key=lambda k: _STATS[k]["total_ms"])]
+            stat = _STATS[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "slow": 0, "plan": [], "last_params": []}
+        stat["count"] += 1
+        stat["total_ms"] += elapsed_ms
+        stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+        if slow:
+            stat["slow"] += 1
+            stat["plan"] = plan
+            stat["last_params"] = redact(params)
+    if slow:
+        full_scan = any(p.startswith("SCAN") for p in plan)
+        line = (f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | {elapsed_ms:.1f} ms | "
+                f"{'FULL SCAN | ' if full_scan else ''}{key} | params={redact(params)} | plan={plan}")
+        print(f"🐢 SLOW QUERY {line}")
+        try:
+            with open(SLOW_QUERY_LOG, "a", encoding="utf-8") as log:
+                log.write(line + "\n")
+        except OSError:
+            pass
+
+
+class TracingCursor(sqlite3.Cursor):
+    def execute(self, sql, params=()):
+        if not ENABLED:
+            return super().execute(sql, params)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            _record(self.connection, sql, params, (time.perf_counter() - start) * 1000)
+
+    def executemany(self, sql, seq_of_params):
+        if not ENABLED:
+            return super().executemany(sql, seq_of_params)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            _record(self.connection, sql, None, (time.perf_counter() - start) * 1000)
+
+
+class TracingConnection(sqlite3.Connection):
+    def cursor(self, factory=TracingCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def connect(path, **kwargs):
+    """sqlite3.connect() with tracing support (no overhead beyond a flag check when disabled)"""
+    return sqlite3.connect(path, factory=TracingConnection, **kwargs)
+
+
+def top_statements(n=20, order_by="total_ms"):
+    """Top-N statements for the Admin Panel as a list of row dicts"""
+    with _LOCK:
+        items = sorted(_STATS.items(), key=lambda kv: kv[1][order_by], reverse=True)[:n]
+        return [{
+            "Statement": sql[:300],
+            "Calls": s["count"],
+            "Total ms": round(s["total_ms"], 1),
+            "Avg ms": round(s["total_ms"] / s["count"], 2) if s["count"] else 0,
+            "Max ms": round(s["max_ms"], 1),
+            "Slow": s["slow"],
+            "Query Plan": " / ".join(s["plan"]),
+            "Params (redacted)": str(s["last_params"]),
+        } for sql, s in items]
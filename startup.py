@@ -0,0 +1,130 @@
+"""
+Application startup phase + timing report
+Everything that touches the network, the filesystem or a heavy library runs from here
+(explicitly, once) instead of at import time, so `import app` stays cheap and side-effect free.
+"""
+import time
+import json
+import socket
+import importlib
+import functools
+import threading
+from contextlib import contextmanager
+
+# ======================
+# LAZY IMPORTS
+# ======================
+class LazyModule:
+    """Module proxy - the real import happens on first attribute access"""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with phase(f"lazy import: {self._name}"):
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Usage: pd = lazy_import("pandas") - behaves like the module once touched"""
+    return LazyModule(name)
+
+# ======================
+# PHASE TIMING
+# ======================
+STARTUP_PHASES = []  # [[name, own seconds, depth], ...] in start order (a parent before its children)
+_T0 = time.perf_counter()
+_open = threading.local()  # per thread: child time of every phase still running, innermost last
+
+@contextmanager
+def phase(name):
+    """Time a startup phase and record it for the report.
+    A phase opened inside another (e.g. a lazy import while building the UI) is recorded as its
+    child, and its time is taken off the parent's - every second is counted once."""
+    stack = _open.__dict__.setdefault("stack", [])
+    if not stack and threading.current_thread() is not threading.main_thread():
+        name = f"{name} (background: {threading.current_thread().name})"  # overlaps the main thread's phases
+    record = [name, 0.0, len(stack)]
+    STARTUP_PHASES.append(record)
+    stack.append([0.0])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        record[1] = elapsed - stack.pop()[0]
+        if stack:
+            stack[-1][0] += elapsed
+
+
+def startup_report():
+    """Return the startup timing report as text (one line per phase, children indented under their parent)"""
+    total = time.perf_counter() - _T0
+    border = "=" * 70
+    lines = [border, "⏱️  STARTUP TIMING REPORT (own time - nested phases listed separately)", border]
+    for name, seconds, depth in STARTUP_PHASES:
+        share = (seconds / total * 100) if total else 0
+        label = "  " * depth + name
+        lines.append(f"  {label:<48} {seconds * 1000:>9.1f} ms {share:>5.1f}%")
+    lines.append("-" * 70)
+    lines.append(f"  {'TOTAL (process start → ready to bind port)':<48} {total * 1000:>9.1f} ms")
+    lines.append(border)
+    return "\n".join(lines)
+
+# ======================
+# SHARED STARTUP I/O (cached - each runs once per process)
+# ======================
+@functools.lru_cache(maxsize=None)
+def get_IP():
+    """Auto-detect LAN IP address (one UDP probe per process)"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.settimeout(0.1)
+        s.connect(("10.255.255.255", 1))
+        local_ip = s.getsockname()[0]
+        s.close()
+        return local_ip
+    except Exception:
+        try:
+            local_ip = socket.gethostbyname(socket.gethostname())
+            if local_ip.startswith("127.") or ":" in local_ip:
+                return "YOUR_LOCAL_IP"
+            return local_ip
+        except Exception:
+            return "YOUR_LOCAL_IP"
+
+
+@functools.lru_cache(maxsize=None)
+def load_gmail_password(secret_file="secret.json"):
+    """Read the Gmail app password from secret.json (None if missing/invalid)"""
+    try:
+        with open(secret_file) as f:
+            return json.load(f)['secret_code']
+    except FileNotFoundError:
+        print(f"⚠️ Warning: {secret_file} not found - email functionality disabled")
+    except (json.JSONDecodeError, KeyError) as e:
+        print(f"⚠️ Warning: Error reading secret_code: {e} - email functionality disabled")
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def load_user_manual(manual_file="manual.md"):
+    """Read the Markdown user manual once (fallback text if missing)"""
+    try:
+        with open(manual_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        # Fallback content if file missing (prevents startup crash)
+        return """# 📘 FGS/ESD Master Override Register - User Manual
+⚠️ **manual.md not found**
+Place your user manual in Markdown format at `manual.md` in the application directory.
+"""
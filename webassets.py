@@ -0,0 +1,245 @@
+"""
+Static asset pipeline: optimized logos and a precompressed, immutable-cached Gradio bundle
+  - logos: resized once to IMAGE_BOXES (twice the largest size shown, for tablet screens),
+    re-encoded with the best PNG / JPEG settings (the original bytes are kept when they are
+    smaller) and written as BUILD_DIR/<name>.<hash>.<ext>.
+    The hash covers the source bytes and the box, so a new logo gets a new URL. image() gives
+    the built file to gr.Image; Gradio serves it from its content-addressed cache and
+    middleware() marks those URLs immutable.
+  - Gradio frontend bundle (/assets/*, subfolders included): .br and .gz copies are built once
+    per Gradio version in the background (or ahead of time with `python webassets.py`).
+    routes() serves them ahead of Gradio's own /assets route with Content-Encoding set, so
+    Gradio's middleware does not compress them again on every load. Files without a copy yet
+    are served as-is and compressed on the fly, like before. Only names Vite content-hashed
+    (index-B0zdmtA4.js) are cached as immutable; the rest (svelte/svelte_svelte.js, ...) keep
+    their name across Gradio upgrades, so they get no-cache + ETag (a 304 when unchanged).
+Repeat page loads on the tablets then fetch nothing but the page itself and the API calls.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+from startup import lazy_import
+
+Image = lazy_import("PIL.Image")
+brotli = lazy_import("brotli")
+
+BUILD_DIR = "static"
+IMAGE_BOXES = {  # source -> (max width, max height) in pixels
+    "logo.png": (800, 100),
+    "wisonLOGO.png": (300, 300),
+    "congoFLNG.png": (200, 60),
+    "ENIcongo.jpg": (300, 300),
+}
+COMPRESSIBLE = {".js", ".mjs", ".css", ".svg", ".json", ".map", ".html", ".txt"}
+MIN_COMPRESS_BYTES = 1024
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Vite's content hash: "-" + 8 base64url characters before the extension, with at least one
+# digit or capital (so a plain word like "-overview" is not taken for a hash)
+HASHED_NAME = re.compile(r"-(?=[A-Za-z0-9_-]*[A-Z0-9])[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+
+_built = {}       # source name -> built path
+_thread = None
+
+
+# ======================
+# IMAGES
+# ======================
+def _digest(*parts):
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+    return sha.hexdigest()[:12]
+
+
+def build_image(source, box):
+    """Resized, re-encoded copy of `source` in BUILD_DIR - or the original bytes when those are
+    smaller - reused when already built. Returns its path."""
+    with open(source, "rb") as f:
+        data = f.read()
+    stem, ext = os.path.splitext(os.path.basename(source))
+    target = os.path.join(BUILD_DIR, f"{stem}.{_digest(data, box)}{ext.lower()}")
+    if os.path.exists(target) and os.path.getsize(target) <= len(data):  # (a heavier copy: rebuild)
+        return target
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    tmp = f"{target}.tmp"
+    with Image.open(source) as im:
+        im.load()
+        im.thumbnail(box, Image.LANCZOS)  # only ever shrinks
+        if ext.lower() in (".jpg", ".jpeg"):
+            im.convert("RGB").save(tmp, "JPEG", quality=85, optimize=True, progressive=True)
+        else:
+            im.save(tmp, "PNG", optimize=True)
+    if os.path.getsize(tmp) >= len(data):
+        # Not smaller (a resampled logo gains colours and can outweigh the original): keep the original bytes
+        with open(tmp, "wb") as f:
+            f.write(data)
+    os.replace(tmp, target)
+    return target
+
+
+def build_images():
+    """Build every logo in IMAGE_BOXES; returns (built, KB before, KB after)"""
+    before = after = 0
+    for name, box in IMAGE_BOXES.items():
+        if not os.path.exists(name):
+            continue
+        try:
+            _built[name] = build_image(name, box)
+        except Exception as e:
+            print(f"⚠️ Image {name} served unoptimized: {str(e)}")
+            continue
+        before += os.path.getsize(name)
+        after += os.path.getsize(_built[name])
+    return len(_built), before / 1024, after / 1024
+
+
+def image(name):
+    """Path to give gr.Image: the optimized copy once built, else the original file"""
+    return _built.get(name, name)
+
+
+# ======================
+# GRADIO BUNDLE
+# ======================
+def bundle_dir():
+    import gradio
+    return os.path.join(os.path.dirname(gradio.__file__), "templates", "frontend", "assets")
+
+
+def compressed_dir():
+    import gradio
+    return os.path.join(BUILD_DIR, f"gradio-{gradio.__version__}")
+
+
+def precompress_bundle():
+    """.br (quality 11) and .gz (level 9) copy of every compressible bundle file not done yet.
+    Returns (files compressed, seconds)."""
+    started = time.perf_counter()
+    source_dir, out_dir = bundle_dir(), compressed_dir()
+    os.makedirs(out_dir, exist_ok=True)
+    done = 0
+    for folder, _, files in sorted(os.walk(source_dir)):
+        for name in sorted(files):
+            path = os.path.join(folder, name)
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE and os.path.getsize(path) >= MIN_COMPRESS_BYTES:
+                done += _precompress(path, os.path.join(out_dir, os.path.relpath(path, source_dir)))
+    return done, time.perf_counter() - started
+
+
+def _precompress(path, copy):
+    """Write copy.br / copy.gz of one bundle file unless both exist; 1 if written"""
+    br_path, gz_path = f"{copy}.br", f"{copy}.gz"
+    if os.path.exists(br_path) and os.path.exists(gz_path):
+        return 0
+    os.makedirs(os.path.dirname(copy), exist_ok=True)
+    with open(path, "rb") as f:
+        data = f.read()
+    for target, encode in ((br_path, lambda d: brotli.compress(d, quality=11)),
+                           (gz_path, lambda d: gzip.compress(d, 9, mtime=0))):
+        tmp = f"{target}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(encode(data))
+        os.replace(tmp, target)  # a half-written copy is never served
+    return 1
+
+
+def start(job=None):
+    """Background thread: precompress the bundle once (idempotent; pages work meanwhile)"""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return _thread
+
+    def run_build():
+        try:
+            done, seconds = precompress_bundle()
+            if done:
+                print(f"🗜️ Precompressed {done} Gradio bundle file(s) (brotli + gzip) in {seconds:.1f} s")
+        except Exception as e:
+            print(f"⚠️ Bundle precompression failed (served compressed on the fly): {str(e)}")
+
+    run = job(run_build) if job else run_build
+    _thread = threading.Thread(target=run, name="bundle-precompress", daemon=True)
+    _thread.start()
+    return _thread
+
+
+# ======================
+# HTTP
+# ======================
+def routes():
+    """/assets/{path} (the Gradio bundle, subfolders included): precompressed copy when the client
+    accepts it; immutable cache for content-hashed names, no-cache + ETag for the others"""
+    from starlette.responses import FileResponse, Response
+    from starlette.routing import Route
+
+    source_dir = os.path.realpath(bundle_dir())
+    out_dir = compressed_dir()
+
+    async def bundle_asset(request):
+        path = os.path.realpath(os.path.join(source_dir, request.path_params["path"]))
+        if os.path.commonpath([path, source_dir]) != source_dir or not os.path.isfile(path):
+            return Response(status_code=404)
+        rel = os.path.relpath(path, source_dir)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        accepted = request.headers.get("accept-encoding", "")
+        encoding, served = None, path
+        for candidate, ext in (("br", ".br"), ("gzip", ".gz")):
+            copy = os.path.join(out_dir, rel + ext)
+            if candidate in accepted and os.path.exists(copy):
+                encoding, served = candidate, copy
+                break
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if HASHED_NAME.search(os.path.basename(path)):
+            headers["Cache-Control"] = IMMUTABLE
+        else:  # same name in the next Gradio version: revalidate every time
+            st = os.stat(path)
+            headers.update({"Cache-Control": REVALIDATE,
+                            "ETag": f'"{st.st_mtime_ns:x}-{st.st_size:x}-{encoding or "identity"}"'})
+            if headers["ETag"] in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+                return Response(status_code=304, headers=headers)
+        return FileResponse(served, media_type=media_type, headers=headers)
+
+    return [Route("/assets/{path:path}", bundle_asset, methods=["GET", "HEAD"])]
+
+
+class ImmutableImages:
+    """ASGI middleware: Cache-Control immutable on Gradio's file URLs of the built logos
+    (their names carry our content hash, Gradio's cache folder carries its own)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        built = {os.path.basename(p) for p in _built.values()}
+        if "/file=" not in path or os.path.basename(path) not in built:
+            return await self.app(scope, receive, send)
+
+        async def send_cached(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                message["headers"] = [(k, v) for k, v in message["headers"] if k.lower() != b"cache-control"] \
+                    + [(b"cache-control", IMMUTABLE.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_cached)
+
+
+def middleware():
+    from starlette.middleware import Middleware
+    return [Middleware(ImmutableImages)]
+
+
+if __name__ == "__main__":
+    # Build step (e.g. after installing or upgrading Gradio): python webassets.py
+    built, before, after = build_images()
+    print(f"🖼️ Optimized {built} logo(s): {before:.1f} KB -> {after:.1f} KB")
+    done, seconds = precompress_bundle()
+    print(f"🗜️ Precompressed {done} Gradio bundle file(s) into {compressed_dir()} in {seconds:.1f} s")